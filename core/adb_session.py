@@ -0,0 +1,324 @@
+# core/adb_session.py
+"""
+Persistent `adb shell` session.
+
+One long-lived `adb -s <target> shell` child is kept per device and commands
+are written to its stdin, so repeated calls skip the fork/exec + adb handshake
+that every `subprocess.run(["adb", ...])` pays.
+
+spec_legend:
+  r: Return value (shape & invariants)
+  s: Side effects (project tags like [adb][log][thread])
+  e: Errors/exceptions behavior
+  p: Parameter notes beyond the signature
+  notes: Usage guidance / invariants
+
+defaults:
+  targeting: explicit device_id > env ADB_DEVICE > core.adb_utils.ADB_DEVICE_ID
+  framing: commands are bracketed by echo markers; binary replies are length-prefixed by their own header
+  timeout: 10s per request; on timeout/EOF the child is killed and respawned on next use
+  thread_safety: one request at a time per session (threading.Lock)
+  channels: "main" (screencap, queries) and "input" (taps/swipes) are separate children,
+            so a tap never waits behind an in-flight screencap
+"""
+
+import itertools
+import os
+import re
+import shlex
+import struct
+import subprocess
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+from core.adb_utils import ADB_DEVICE_ID, adb_shell
+from utils.logger import log, log_rate_limited
+
+_FRAME_BEGIN = b"__FRAME__\n"
+_FRAME_END = b"__END__\n"
+_RC_RE = re.compile(rb"^__RC_(\d+)_(\d+)__\n$")
+
+RAW_FORMATS_BPP4 = {1, 2, 5}  # RGBA_8888, RGBX_8888, BGRA_8888 (screencap raw pixel formats)
+"""
+spec:
+  name: RAW_FORMATS_BPP4
+  kind: const
+  r: PixelFormat ids screencap may emit that use 4 bytes/pixel (the only ones we decode).
+"""
+
+
+class AdbSessionError(RuntimeError):
+    """Raised when the persistent shell dies, times out, or returns malformed framing."""
+
+
+class AdbFramingError(AdbSessionError):
+    """The device answered, but its output could not be parsed (e.g., PTY-mangled binary on old adbd)."""
+
+
+class AdbShellSession:
+    """
+    spec:
+      name: AdbShellSession
+      purpose: Long-lived `adb shell` child with framed request/response over its pipes.
+      constructor:
+        signature: AdbShellSession(device_id:str|None=None, timeout:float=10.0) -> AdbShellSession
+        s: none until first request (child is spawned lazily)
+      notes:
+        - Any framing error kills the child; the next request respawns it.
+    """
+
+    def __init__(self, device_id: Optional[str] = None, timeout: float = 10.0) -> None:
+        self.target = device_id or os.getenv("ADB_DEVICE") or ADB_DEVICE_ID
+        self.timeout = timeout
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._nonce = itertools.count(1)
+
+    # ----- process lifecycle -----
+
+    def _spawn(self) -> subprocess.Popen:
+        cmd = ["adb"]
+        if self.target:
+            cmd += ["-s", self.target]
+        cmd += ["shell"]
+        return subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def _ensure(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = self._spawn()
+        return self._proc
+
+    def _kill(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=2)
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """
+        spec:
+          name: AdbShellSession.close
+          r: null
+          s: [adb]
+          notes:
+            - Safe to call repeatedly; the next request respawns the child.
+        """
+        with self._lock:
+            self._kill()
+
+    # ----- framed I/O helpers (caller holds _lock) -----
+
+    def _send(self, proc: subprocess.Popen, line: str) -> None:
+        proc.stdin.write(line.encode() + b"\n")
+        proc.stdin.flush()
+
+    def _read_exact(self, proc: subprocess.Popen, n: int) -> bytes:
+        data = proc.stdout.read(n)
+        if data is None or len(data) != n:
+            raise AdbSessionError(f"short read ({0 if data is None else len(data)}/{n} bytes)")
+        return data
+
+    def _read_line(self, proc: subprocess.Popen) -> bytes:
+        line = proc.stdout.readline()
+        if not line:
+            raise AdbSessionError("adb shell closed the pipe")
+        return line
+
+    def _request(self, fn):
+        """
+        Run fn(proc) under the lock with a kill-timer; any failure resets the session.
+        """
+        with self._lock:
+            proc = self._ensure()
+            timer = threading.Timer(self.timeout, self._kill)
+            timer.daemon = True
+            timer.start()
+            try:
+                return fn(proc)
+            except AdbSessionError:
+                self._kill()
+                raise
+            except (OSError, ValueError) as e:
+                self._kill()
+                raise AdbSessionError(str(e)) from e
+            finally:
+                timer.cancel()
+
+    # ----- requests -----
+
+    def run(self, cmd: str) -> subprocess.CompletedProcess:
+        """
+        spec:
+          name: AdbShellSession.run
+          signature: run(cmd:str) -> subprocess.CompletedProcess
+          r: CompletedProcess(args=cmd, returncode=<device exit status>, stdout=str, stderr="")
+          s: [adb]
+          e:
+            - AdbSessionError: on EOF/timeout or lost framing (session is reset)
+          p:
+            cmd: Shell command line run by the device shell (pipes/redirects allowed).
+          notes:
+            - stdin is /dev/null for cmd so it cannot swallow later requests
+            - stderr is discarded (same as adb_shell(capture_output=False))
+        """
+        def _do(proc):
+            nonce = next(self._nonce)
+            self._send(proc, f"{{ {cmd} ; }} </dev/null; __rc=$?; echo; echo __RC_{nonce}_${{__rc}}__")
+            chunks = []
+            while True:
+                line = self._read_line(proc)
+                m = _RC_RE.match(line)
+                if m and int(m.group(1)) == nonce:
+                    rc = int(m.group(2))
+                    break
+                chunks.append(line)
+            out = b"".join(chunks)
+            if out.endswith(b"\n"):
+                out = out[:-1]  # the separator echo added above
+            return subprocess.CompletedProcess(cmd, rc, out.decode(errors="replace"), "")
+
+        return self._request(_do)
+
+    def screencap_raw(self) -> Tuple[int, int, int, bytes]:
+        """
+        spec:
+          name: AdbShellSession.screencap_raw
+          signature: screencap_raw() -> (w:int, h:int, fmt:int, pixels:bytes)
+          r: Raw framebuffer (no PNG encode on device); pixels is w*h*4 bytes, row-major
+          s: [adb]
+          e:
+            - AdbFramingError: malformed header, unsupported pixel format, or lost end marker
+            - AdbSessionError: on EOF/timeout
+          notes:
+            - Handles both the 12-byte (w,h,fmt) and 16-byte (w,h,fmt,colorspace, Android 9+) headers
+        """
+        def _do(proc):
+            self._send(proc, "echo __FRAME__; screencap; echo __END__")
+            # Skip anything left over from an earlier, interrupted request
+            while self._read_line(proc) != _FRAME_BEGIN:
+                pass
+            w, h, fmt = struct.unpack("<III", self._read_exact(proc, 12))
+            if fmt not in RAW_FORMATS_BPP4 or not (0 < w <= 8192 and 0 < h <= 8192):
+                raise AdbFramingError(f"unexpected screencap header w={w} h={h} fmt={fmt}")
+            size = w * h * 4
+            body = self._read_exact(proc, size)
+            tail = self._read_exact(proc, len(_FRAME_END))
+            if tail != _FRAME_END:
+                # 16-byte header: first 4 body bytes were the colorspace field
+                tail += self._read_exact(proc, 4)
+                if tail[4:] != _FRAME_END:
+                    raise AdbFramingError("screencap framing lost (no end marker)")
+                body = body[4:] + tail[:4]
+            return w, h, fmt, body
+
+        return self._request(_do)
+
+
+_sessions: Dict[Tuple[str, str], AdbShellSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(device_id: Optional[str] = None, channel: str = "main") -> AdbShellSession:
+    """
+    spec:
+      name: get_session
+      signature: get_session(device_id:str|None=None, channel:str="main") -> AdbShellSession
+      r: Process-wide session for the resolved target and channel (created lazily, reused afterwards)
+      s: none
+      p:
+        channel: Independent child per name; requests on different channels do not serialize.
+    """
+    target = device_id or os.getenv("ADB_DEVICE") or ADB_DEVICE_ID
+    with _sessions_lock:
+        sess = _sessions.get((target, channel))
+        if sess is None:
+            sess = _sessions[(target, channel)] = AdbShellSession(target)
+        return sess
+
+
+def close_all() -> None:
+    """
+    spec:
+      name: close_all
+      signature: close_all() -> None
+      r: null
+      s: [adb]
+      notes:
+        - Kills every persistent shell (e.g., at process shutdown).
+    """
+    with _sessions_lock:
+        for sess in _sessions.values():
+            sess.close()
+        _sessions.clear()
+
+
+def run(cmd: str, device_id: Optional[str] = None) -> Optional[subprocess.CompletedProcess]:
+    """
+    spec:
+      name: run
+      signature: run(cmd:str, device_id:str|None=None) -> CompletedProcess|None
+      r: Same shape as adb_shell(..., capture_output=True, check=False); None on session failure
+      s: [adb][log]
+      e: none (AdbSessionError is caught and DEBUG-logged; the session respawns on next call)
+      notes:
+        - Drop-in for per-call adb_shell() in polling loops (watchdog); no fork/exec per command.
+    """
+    try:
+        return get_session(device_id).run(cmd)
+    except AdbSessionError as e:
+        log(f"[ADB] Persistent shell command failed ({cmd!r}): {e}", "DEBUG")
+        return None
+
+
+def screencap_raw(device_id: Optional[str] = None) -> Optional[Tuple[int, int, int, bytes]]:
+    """
+    spec:
+      name: screencap_raw
+      signature: screencap_raw(device_id:str|None=None) -> (w, h, fmt, pixels)|None
+      r: Raw framebuffer via the persistent session; None on connection failure (session reset)
+      s: [adb][log]
+      e:
+        - AdbFramingError propagates (the device's output is not a usable raw frame)
+        - Other AdbSessionError (EOF/timeout, e.g. device offline) is caught and DEBUG-logged
+    """
+    try:
+        return get_session(device_id).screencap_raw()
+    except AdbFramingError:
+        raise
+    except AdbSessionError as e:
+        log(f"[ADB] Persistent screencap failed: {e}", "DEBUG")
+        return None
+
+
+def input_shell(cmd: Union[str, List[str]], device_id: Optional[str] = None) -> Optional[subprocess.CompletedProcess]:
+    """
+    spec:
+      name: input_shell
+      signature: input_shell(cmd:str|list[str], device_id:str|None=None) -> CompletedProcess|None
+      r: CompletedProcess (returncode = device exit status); None when the command could not be run
+      s: [adb][log]
+      e: none (session failures fall back to a one-shot adb_utils.adb_shell)
+      p:
+        cmd: list[str] is shell-quoted and joined; a str is passed to the device shell as-is (scripts).
+      notes:
+        - For `input tap/swipe` and short tap scripts: runs on the "input" channel, so no adb spawn per tap.
+        - Non-zero exit is logged at ERROR (rate-limited), like adb_shell(check=True).
+    """
+    line = cmd if isinstance(cmd, str) else " ".join(shlex.quote(str(a)) for a in cmd)
+    try:
+        res = get_session(device_id, channel="input").run(line)
+    except AdbSessionError as e:
+        log(f"[ADB] Persistent input command failed ({line!r}): {e}; using one-shot adb", "DEBUG")
+        return adb_shell([line], check=False, device_id=device_id)
+    if res.returncode != 0:
+        log_rate_limited("input_shell_failed", lambda: f"[ADB] Command failed (rc={res.returncode}): {line}", "ERROR")
+    return res
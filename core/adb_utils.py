@@ -5,6 +5,8 @@ Utility functions for interacting with Android devices or emulators via ADB.
 This module provides:
 - adb_shell(): Run arbitrary shell commands on a connected device/emulator.
 - screencap_png(): Capture a raw PNG screenshot from a connected device/emulator.
+- screencap_raw_exec(): Capture the raw (unencoded) framebuffer via a one-shot exec-out.
+- adb_shell_stream(): Start a shell command and stream its stdout (caller may stop early).
 
 Device targeting:
     Functions respect the following precedence when selecting a device:
@@ -14,7 +16,8 @@ Device targeting:
 
 Dependencies:
     - Requires `adb` to be installed and on the system PATH.
-    - No heavy dependencies (e.g., OpenCV) are imported here.
+    - No heavy dependencies (e.g., OpenCV) are imported here; errors go through
+      utils.logger (rate-limited so adb jitter cannot flood the log).
       PNG decoding and image handling should be done in higher-level modules
       such as core/ss_capture.py.
 """
@@ -24,6 +27,8 @@ import shlex
 import subprocess
 from typing import List, Optional, Union
 
+from utils.logger import log_rate_limited
+
 #ADB_DEVICE_ID = "07171JEC203290"  # Or ""
 ADB_DEVICE_ID = "localhost:5555"
 
@@ -39,7 +44,7 @@ def adb_shell(
       r: "subprocess.CompletedProcess | None"
       s: ["adb"]
       e:
-        - "Returns None on CalledProcessError or unexpected Exception (error printed)"
+        - "Returns None on CalledProcessError or unexpected Exception (ERROR logged, ≤1/s)"
       params:
         cmd: "str or list[str]; string is shlex-split"
         capture_output: "bool — when True, stdout/stderr captured (text=True)"
@@ -59,7 +64,7 @@ def adb_shell(
 
     Returns:
         subprocess.CompletedProcess on success.
-        None on failure (errors printed).
+        None on failure (errors logged, rate-limited to one entry per second).
     """
     # Normalize command
     cmd_list = shlex.split(cmd) if isinstance(cmd, str) else cmd
@@ -90,12 +95,62 @@ def adb_shell(
             )
         return result
     except subprocess.CalledProcessError as e:
-        print(f"[ERROR] ADB command failed: {e}")
-        if hasattr(e, 'stderr') and e.stderr:
-            print(f"[STDERR] {e.stderr.strip()}")
+        log_rate_limited(
+            "adb_shell_failed",
+            lambda: f"[ADB] Command failed: {e}" + (f" | stderr: {e.stderr.strip()}" if e.stderr else ""),
+            "ERROR",
+        )
         return None
     except Exception as e:
-        print(f"[ERROR] Unexpected ADB exception: {e}")
+        log_rate_limited("adb_shell_exception", lambda: f"[ADB] Unexpected exception: {e}", "ERROR")
+        return None
+
+
+def adb_shell_stream(
+    cmd: Union[str, List[str]],
+    device_id: Optional[str] = None,
+) -> Optional[subprocess.Popen]:
+    """
+    ---
+    spec:
+      r: "subprocess.Popen | None — stdout is a text pipe (line-iterable); stderr discarded"
+      s: ["adb"]
+      e:
+        - "Returns None when adb cannot be spawned; ERROR logged (≤1/s)"
+      params:
+        cmd: "str|list[str] — shell command (str is split with shlex)"
+        device_id: "str|None — explicit device; else env ADB_DEVICE; else module ADB_DEVICE_ID"
+      notes:
+        - "Caller owns the process: read what it needs, then terminate()/kill() and wait()"
+        - "Stopping early means the rest of a large dump never crosses USB"
+    ---
+    Start `adb shell <cmd>` with stdout piped for incremental reading.
+
+    Args:
+        cmd: Command string or list of arguments to run in the device shell.
+        device_id: Overrides target device. Falls back to env ADB_DEVICE, then ADB_DEVICE_ID.
+
+    Returns:
+        The running Popen, or None if it could not be started.
+    """
+    cmd_list = shlex.split(cmd) if isinstance(cmd, str) else cmd
+    target = device_id or os.getenv("ADB_DEVICE") or ADB_DEVICE_ID
+
+    base_cmd = ["adb"]
+    if target:
+        base_cmd += ["-s", target]
+    full_cmd = base_cmd + ["shell"] + cmd_list
+
+    try:
+        return subprocess.Popen(
+            full_cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            errors="replace",
+        )
+    except Exception as e:
+        log_rate_limited("adb_shell_stream_exception", lambda: f"[ADB] Failed to start stream: {e}", "ERROR")
         return None
 
 
@@ -109,7 +164,7 @@ def screencap_png(
       r: "bytes | None (PNG)"
       s: ["adb"]
       e:
-        - "Returns None on non-zero exit or invalid/empty data; error printed"
+        - "Returns None on non-zero exit or invalid/empty data; ERROR logged (≤1/s)"
       params:
         device_id: "str|None — explicit device; else env ADB_DEVICE; else module ADB_DEVICE_ID"
         check: "bool — if True, non‑zero exit raises CalledProcessError (caught)"
@@ -141,14 +196,50 @@ def screencap_png(
         )
         return result.stdout
     except subprocess.CalledProcessError as e:
-        # Mirror adb_shell's lightweight reporting without pulling in logger here.
-        print(f"[ERROR] ADB screencap failed: {e}")
-        if e.stderr:
-            try:
-                print(f"[STDERR] {e.stderr.decode(errors='ignore').strip()}")
-            except Exception:
-                pass
+        log_rate_limited(
+            "adb_screencap_failed",
+            lambda: f"[ADB] Screencap failed: {e}"
+            + (f" | stderr: {e.stderr.decode(errors='ignore').strip()}" if e.stderr else ""),
+            "ERROR",
+        )
         return None
     except Exception as e:
-        print(f"[ERROR] Unexpected ADB screencap exception: {e}")
+        log_rate_limited("adb_screencap_exception", lambda: f"[ADB] Unexpected screencap exception: {e}", "ERROR")
+        return None
+
+
+def screencap_raw_exec(device_id: Optional[str] = None) -> Optional[bytes]:
+    """
+    ---
+    spec:
+      r: "bytes | None (screencap raw: 12/16-byte header + w*h*4 pixels)"
+      s: ["adb"]
+      e:
+        - "Returns None on non-zero exit or any exception; ERROR logged (≤1/s)"
+      params:
+        device_id: "str|None — explicit device; else env ADB_DEVICE; else module ADB_DEVICE_ID"
+      notes:
+        - "Uses 'adb exec-out screencap' (no -p): no PNG encode on device, no decode on host"
+        - "Header parsing lives with the decoder (core.ss_capture)"
+    ---
+    Capture the raw framebuffer via `adb exec-out screencap`.
+
+    Args:
+        device_id: Overrides target device. Falls back to env ADB_DEVICE, then ADB_DEVICE_ID.
+
+    Returns:
+        Raw screencap bytes on success, or None on failure.
+    """
+    target = device_id or os.getenv("ADB_DEVICE") or ADB_DEVICE_ID
+
+    base_cmd = ["adb"]
+    if target:
+        base_cmd += ["-s", target]
+    full_cmd = base_cmd + ["exec-out", "screencap"]
+
+    try:
+        result = subprocess.run(full_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True)
+        return result.stdout
+    except Exception as e:
+        log_rate_limited("adb_screencap_raw_failed", lambda: f"[ADB] Raw screencap failed: {e}", "ERROR")
         return None
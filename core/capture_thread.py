@@ -0,0 +1,262 @@
+# core/capture_thread.py
+"""
+Background screenshot producer.
+
+A single daemon thread captures frames and hands them to one consumer.
+
+- With an interval (e.g. mission_nuke's polling waits) it keeps capturing while the
+  consumer runs detection on the previous frame, so capture and detect overlap.
+- With interval=None (main.py) it captures only when asked: latest_screenshot(since=...)
+  waits for a frame started after that point, so capture and detect run one after the
+  other. There it only keeps the preview write (save_path) off the consumer's thread.
+
+spec_legend:
+  r: Return value (shape & invariants)
+  s: Side effects (project tags like [adb][log][thread][loop])
+  e: Errors/exceptions behavior
+  p: Parameter notes beyond the signature
+  notes: Usage guidance / invariants
+
+defaults:
+  interval: 0.0s between capture starts (back-to-back); None = capture only when a consumer asks
+  consumer: single consumer; each frame is handed out at most once
+  freshness: next_frame(since=t) wakes the producer and only accepts a frame whose capture started at/after t
+  handoff: by reference (zero-copy); every capture decodes into a fresh ndarray that the
+           producer never touches again. Frames are READ-ONLY for consumers: the same array
+           backs state_detector's identity cache (_last_screen_ref), ss_capture's last-frame
+           cache and any in-flight background write. copy() before drawing on one.
+  capture_path: core.ss_capture.capture_adb_screenshot (raw framebuffer; PNG only as fallback)
+  save: when save_path is set, the frame is published first and then written via save_image_async;
+        at most one write is in flight (a frame arriving while the previous write runs is not saved)
+"""
+
+import threading
+import time
+from typing import Optional
+
+from core.ss_capture import capture_adb_screenshot, save_image_async
+from utils.logger import log
+
+
+class CaptureThread(threading.Thread):
+    """
+    spec:
+      name: CaptureThread
+      kind: threading.Thread (daemon)
+      constructor:
+        signature: CaptureThread(interval:float|None=0.0, save_path:str|None=None) -> CaptureThread
+        p:
+          interval: Minimum seconds between capture starts (0 = back-to-back; None = on request only).
+          save_path: When set, frames are also written to this path (e.g., screenshots/latest.jpg),
+                     off the capture thread and after the frame was published.
+      s: [adb][cv2][fs?][thread][loop]
+      notes:
+        - Failed captures are published as None so the consumer can back off.
+        - The newest frame always replaces the previous one; stale frames are dropped.
+    """
+
+    def __init__(self, interval: Optional[float] = 0.0, save_path: Optional[str] = None) -> None:
+        super().__init__(name="CaptureThread", daemon=True)
+        self.set_interval(interval)
+        self._save_path = save_path
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._kick = threading.Event()  # cuts the inter-capture wait short (stop() or a since= request)
+        self._frame = None
+        self._frame_t0 = 0.0     # monotonic time the newest published frame's capture started
+        self._seq = 0            # sequence number of the newest published frame
+        self._consumed_seq = 0   # sequence number last handed out by next_frame()
+        self._interrupted = False  # set by interrupt(): the blocked next_frame() returns empty
+        self._save_future = None  # in-flight save_image_async write, if any
+
+    def _save(self, img) -> None:
+        # Only the newest frame matters on disk: skip instead of queueing behind a slow write
+        if self._save_future is not None and not self._save_future.done():
+            return
+        self._save_future = save_image_async(img, self._save_path)
+
+    def set_interval(self, interval: Optional[float]) -> None:
+        """
+        spec:
+          name: CaptureThread.set_interval
+          r: null
+          s: [thread]
+          notes:
+            - Takes effect from the next capture; lets a consumer back off while nothing changes.
+            - None: capture only when next_frame(since=...) asks for a frame.
+        """
+        self._interval = None if interval is None else max(0.0, float(interval))
+
+    def run(self) -> None:
+        """
+        spec:
+          name: CaptureThread.run
+          r: null (loops until stop() is called)
+          s: [adb][thread][loop]
+          e:
+            - Exceptions from a capture are logged and published as a None frame; the loop continues.
+        """
+        while not self._stop_event.is_set():
+            if self._interval is None:
+                self._kick.wait()  # on-request mode: idle until next_frame(since=...) or stop()
+                if self._stop_event.is_set():
+                    break
+            self._kick.clear()  # a request arriving during this capture triggers the next one
+            t0 = time.monotonic()
+            try:
+                img = capture_adb_screenshot()
+            except Exception as e:
+                log(f"[CAPTURE] Background capture failed: {e}", "ERROR")
+                img = None
+
+            with self._cond:
+                self._frame = img
+                self._frame_t0 = t0
+                self._seq += 1
+                self._cond.notify_all()
+
+            if img is not None and self._save_path:
+                self._save(img)
+
+            interval = self._interval
+            if interval is not None:
+                remaining = interval - (time.monotonic() - t0)
+                if remaining > 0:
+                    self._kick.wait(remaining)
+
+    def next_frame(self, timeout: Optional[float] = None, since: Optional[float] = None):
+        """
+        spec:
+          name: CaptureThread.next_frame
+          signature: next_frame(timeout:float|None=None, since:float|None=None) -> (bool, ndarray|None)
+          r: (True, frame) when a frame newer than the last one returned arrived; frame may be None on capture failure.
+             (False, None) on timeout, after stop(), or after interrupt().
+          s: [thread]
+          p:
+            since: time.monotonic() value; wakes the producer and skips frames whose capture started earlier
+                   (e.g., frames taken while a handler was still tapping).
+          notes:
+            - Blocks until a not-yet-consumed frame is available, so the same frame is never processed twice.
+        """
+        def _fresh():
+            return self._seq > self._consumed_seq and (since is None or self._frame_t0 >= since)
+
+        if since is not None:
+            self._kick.set()
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: _fresh() or self._stop_event.is_set() or self._interrupted,
+                timeout=timeout,
+            )
+            if self._interrupted:
+                self._interrupted = False
+                return False, None
+            if not ready or not _fresh():
+                return False, None
+            self._consumed_seq = self._seq
+            return True, self._frame
+
+    def stop(self) -> None:
+        """
+        spec:
+          name: CaptureThread.stop
+          r: null
+          s: [thread]
+          notes:
+            - Cooperative: the in-flight capture (if any) finishes before the thread exits.
+            - Wakes any consumer blocked in next_frame().
+        """
+        self._stop_event.set()
+        self._kick.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def interrupt(self) -> None:
+        """
+        spec:
+          name: CaptureThread.interrupt
+          r: null
+          s: [thread]
+          notes:
+            - Makes the blocked (or next) next_frame() call return (False, None); the producer keeps running.
+            - Safe from a signal handler on the consumer's thread (the condition's lock is reentrant).
+        """
+        with self._cond:
+            self._interrupted = True
+            self._cond.notify_all()
+
+
+_capture_thread: Optional[CaptureThread] = None
+"""
+spec:
+  name: _capture_thread
+  kind: module-global singleton
+  r: CaptureThread|None (set by start_capture_thread)
+"""
+
+
+def start_capture_thread(interval: Optional[float] = 0.0, save_path: Optional[str] = None) -> CaptureThread:
+    """
+    spec:
+      name: start_capture_thread
+      signature: start_capture_thread(interval:float|None=0.0, save_path:str|None=None) -> CaptureThread
+      r: The running module-level CaptureThread (existing one is reused if alive).
+      s: [thread]
+    """
+    global _capture_thread
+    if _capture_thread is None or not _capture_thread.is_alive():
+        _capture_thread = CaptureThread(interval=interval, save_path=save_path)
+        _capture_thread.start()
+    return _capture_thread
+
+
+def stop_capture_thread() -> None:
+    """
+    spec:
+      name: stop_capture_thread
+      signature: stop_capture_thread() -> None
+      r: null
+      s: [thread]
+      notes:
+        - No-op when the thread was never started.
+    """
+    global _capture_thread
+    if _capture_thread is not None:
+        _capture_thread.stop()
+        _capture_thread = None
+
+
+def interrupt_capture_wait() -> None:
+    """
+    spec:
+      name: interrupt_capture_wait
+      signature: interrupt_capture_wait() -> None
+      r: null
+      s: [thread]
+      notes:
+        - Wakes a consumer blocked in latest_screenshot() (it returns None), e.g. from a SIGINT handler.
+        - No-op when the thread was never started.
+    """
+    thread = _capture_thread
+    if thread is not None:
+        thread.interrupt()
+
+
+def latest_screenshot(timeout: Optional[float] = None, since: Optional[float] = None):
+    """
+    spec:
+      name: latest_screenshot
+      signature: latest_screenshot(timeout:float|None=None, since:float|None=None) -> ndarray|None
+      r: The next unconsumed BGR frame from the background thread; None on capture failure, timeout or interrupt.
+      s: [thread]
+      e:
+        - RuntimeError: when start_capture_thread() has not been called.
+      notes:
+        - Drop-in for capture_adb_screenshot() inside polling loops.
+        - Pass since=time.monotonic() to get a frame captured from now on (nothing older is returned).
+        - The frame is shared, not copied; treat it as read-only.
+    """
+    if _capture_thread is None:
+        raise RuntimeError("Capture thread not started; call start_capture_thread() first")
+    _, img = _capture_thread.next_frame(timeout=timeout, since=since)
+    return img
@@ -1,7 +1,7 @@
 import os
 import json
-from typing import Any, Dict, Optional, Tuple, List, Mapping
-from core.adb_utils import adb_shell
+from typing import Any, Dict, Optional, Tuple, List, Mapping, Union
+from core.adb_session import input_shell
 from utils.logger import log
 
 CLICKMAP_FILE = os.path.join(os.path.dirname(__file__), "../config/clickmap.json")
@@ -14,6 +14,7 @@ except Exception as e:
     _clickmap = {}
 
 _last_region_group: Optional[str] = None
+_generation = 0  # bumped on set_dot_path/save_clickmap so derived caches can invalidate
 
 def get_clickmap() -> Dict[str, Any]:
     """
@@ -46,6 +47,21 @@ def get_clickmap_path() -> str:
     """
     return CLICKMAP_FILE
 
+def clickmap_generation() -> int:
+    """
+    ---
+    spec:
+      r: "int — changes whenever the in-memory clickmap is edited through this module"
+      s: []
+      e: []
+      params: {}
+      notes:
+        - "Bumped by set_dot_path() and save_clickmap() (in-place edits are expected to be saved)"
+        - "Include it in cache keys for anything derived from clickmap entries"
+    ---
+    """
+    return _generation
+
 def resolve_dot_path(dot_path: str, data: Optional[Mapping[str, Any]] = None) -> Any:
     """
     ---
@@ -122,6 +138,8 @@ def set_dot_path(dot_path: str, value: Any, allow_overwrite: bool = False) -> No
     if final_key in cur and not allow_overwrite:
         raise KeyError(f"Key '{dot_path}' already exists. Use allow_overwrite=True to overwrite.")
     cur[final_key] = value
+    global _generation
+    _generation += 1
 
 def _valid_group_name(name: str) -> bool:
     """
@@ -360,7 +378,7 @@ def tap_now(name: str) -> None:
       r: "None"
       s: ["adb", "log"]
       e:
-        - "No exception on ADB failures; adb_shell() handles errors and returns None"
+        - "No exception on ADB failures; input_shell() handles errors and returns None"
       params:
         name: "str"
       notes:
@@ -370,11 +388,87 @@ def tap_now(name: str) -> None:
     """
     pos = get_click(name)
     if pos:
-        log(f"TAP_NOW: {name} at {pos}", "ACTION")
-        adb_shell(["input", "tap", str(pos[0]), str(pos[1])])
+        tap_coord(pos, name)
     else:
         log(f"[ERROR] tap_now: No coordinates for '{name}'", "FAIL")
 
+def tap_coord(pos: Optional[Tuple[int, int]], label: str = "") -> bool:
+    """
+    ---
+    spec:
+      r: "bool — True if the tap was sent; False when pos is None"
+      s: ["adb", "log"]
+      e: []
+      params:
+        pos: "tuple[int,int] | None — coordinates already resolved (e.g., get_click() once per round)"
+        label: "str — only used for logging"
+      notes:
+        - "No clickmap lookup: for callers that resolved their labels up front"
+    ---
+    """
+    if not pos:
+        log(f"[ERROR] tap_coord: No coordinates for '{label}'", "FAIL")
+        return False
+    log(f"TAP_NOW: {label} at {pos}", "ACTION")
+    input_shell(["input", "tap", str(pos[0]), str(pos[1])])
+    return True
+
+def batch_tap(labels: List[str], delays_ms: Union[int, List[int]] = 1000) -> bool:
+    """
+    ---
+    spec:
+      r: "bool — True if the batched adb call ran (exit 0); False if any label is unresolved or adb failed"
+      s: ["adb", "log"]
+      e: []
+      params:
+        labels: "list[str] — dot-paths tapped in order; each must resolve via get_click()"
+        delays_ms: "int|list[int] — pause after each tap except the last (list length = len(labels)-1)"
+      notes:
+        - "All coordinates are resolved before anything is sent; nothing is tapped if one is missing"
+        - "Blind: only for deterministic sequences where each step's button has fixed coordinates"
+    ---
+    Tap several clickmap entries in one ADB round-trip (see batch_tap_coords).
+    """
+    return batch_tap_coords([get_click(name) for name in labels], delays_ms, labels)
+
+def batch_tap_coords(
+    coords: List[Optional[Tuple[int, int]]],
+    delays_ms: Union[int, List[int]] = 1000,
+    labels: Optional[List[str]] = None,
+) -> bool:
+    """
+    ---
+    spec:
+      r: "bool — True if the batched adb call ran (exit 0); False if any coordinate is None or adb failed"
+      s: ["adb", "log"]
+      e: []
+      params:
+        coords: "list[(x,y)|None] — already-resolved coordinates, tapped in order"
+        delays_ms: "int|list[int] — pause after each tap except the last (list length = len(coords)-1)"
+        labels: "list[str] | None — names for logging, parallel to coords"
+      notes:
+        - "Nothing is tapped if any coordinate is missing"
+        - "One shell request for the whole sequence (device-side sleeps); no screenshots in between"
+    ---
+    """
+    labels = labels or [f"#{i}" for i in range(len(coords))]
+    for name, pos in zip(labels, coords):
+        if not pos:
+            log(f"[ERROR] batch_tap: No coordinates for '{name}'", "FAIL")
+            return False
+
+    delays = delays_ms if isinstance(delays_ms, list) else [delays_ms] * (len(coords) - 1)
+    steps = []
+    for i, (x, y) in enumerate(coords):
+        if i:
+            steps.append(f"sleep {delays[i - 1] / 1000:g}")
+        steps.append(f"input tap {int(x)} {int(y)}")
+
+    log(f"BATCH_TAP: {' -> '.join(labels)}", "ACTION")
+    # One persistent-shell request: the device shell runs the whole script
+    res = input_shell("; ".join(steps))
+    return res is not None and res.returncode == 0
+
 def swipe_now(name: str) -> None:
     """
     ---
@@ -382,7 +476,7 @@ def swipe_now(name: str) -> None:
       r: "None"
       s: ["adb", "log"]
       e:
-        - "No exception on ADB failures; adb_shell() handles errors and returns None"
+        - "No exception on ADB failures; input_shell() handles errors and returns None"
       params:
         name: "str"
       notes:
@@ -394,7 +488,7 @@ def swipe_now(name: str) -> None:
     swipe = get_swipe(name)
     if swipe:
         log(f"SWIPE_NOW: {name} ({swipe['x1']},{swipe['y1']})→({swipe['x2']},{swipe['x2']}) in {swipe['duration_ms']}ms", "ACTION")
-        adb_shell([
+        input_shell([
             "input", "swipe",
             str(swipe["x1"]), str(swipe["y1"]),
             str(swipe["x2"]), str(swipe["y2"]),
@@ -415,15 +509,20 @@ def save_clickmap(data: Optional[Dict[str, Any]] = None) -> None:
         data: "dict[str, Any] | None — defaults to global _clickmap"
       notes:
         - "Writes UTF-8 JSON atomically via temp file + os.replace"
+        - "Serialized in memory first, then written with a single write call"
     ---
     Persist the clickmap (or provided dict) to disk atomically as UTF-8 JSON.
     """
     if data is None:
         data = _clickmap
     tmp_path = CLICKMAP_FILE + ".tmp"
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # json.dump would call f.write() once per token chunk; encode once and write once instead
+    payload = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
     os.replace(tmp_path, CLICKMAP_FILE)
+    global _generation
+    _generation += 1
     print("[INFO] Saved clickmap to", CLICKMAP_FILE)
 
 def flatten_clickmap(data: Optional[Dict[str, Any]] = None, prefix: str = "") -> Dict[str, Any]:
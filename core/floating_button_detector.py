@@ -13,12 +13,11 @@ Notes:
 - Confidence thresholds are carried by clickmap entries (default handled upstream).
 """
 
-import os
-import cv2
 from utils.template_matcher import match_region
-from core.clickmap_access import get_entries_by_role
+from core.matcher import _load_template
+from core.clickmap_access import get_entries_by_role, resolve_dot_path
 from utils.logger import log
-from core.adb_utils import adb_shell
+from core.adb_session import input_shell
 
 
 def tap_floating_button(name, buttons):
@@ -29,7 +28,7 @@ def tap_floating_button(name, buttons):
       signature: core.floating_button_detector.tap_floating_button(name: str, buttons: list[dict]) -> bool
       R: bool — True if a button with matching name was tapped; False if not found.
       S: [adb][log] — Injects a tap via ADB; emits an ACTION log line.
-      E: None — adb_shell handles subprocess errors internally and returns None on failure.
+      E: None — input_shell handles session/subprocess errors internally.
 
     Args:
         name: The `name` field of the target button in `buttons`.
@@ -43,28 +42,29 @@ def tap_floating_button(name, buttons):
         if b["name"] == name:
             x, y = b["tap_point"]["x"], b["tap_point"]["y"]
             log(f"TAP_FLOATING: {name} at ({x},{y})", "ACTION")
-            adb_shell(["input", "tap", str(x), str(y)])
+            input_shell(["input", "tap", str(x), str(y)])
             return True
     return False
 
 
-def detect_floating_buttons(screen):
+def detect_floating_buttons(screen, scale=1.0):
     """
     Detect all configured floating buttons in the given screen image.
 
     AUTO-SPEC:
-      signature: core.floating_button_detector.detect_floating_buttons(screen: ndarray) -> list[dict]
+      signature: core.floating_button_detector.detect_floating_buttons(screen: ndarray, scale: float = 1.0) -> list[dict]
       R: list[dict] — Each dict has:
            {"name": str,
             "match_region": {"x": int, "y": int, "w": int, "h": int},
             "confidence": float,
             "tap_point": {"x": int, "y": int}}
          Returns an empty list if none matched.
-      S: [cv2][fs][log] — Reads template images from disk; uses OpenCV for matching; logs debug/errors.
+      S: [cv2][fs][log] — Reads template images from disk (cached per process); uses OpenCV for matching; logs debug/errors.
       E: Per-entry exceptions are caught and logged; function returns partial results when possible.
 
     Args:
         screen: BGR ndarray of the current frame.
+        scale: <1.0 matches downscaled ROIs/templates (cheap polling); positions stay in full-res coords.
 
     Returns:
         A list of detected floating button descriptors suitable for `tap_floating_button()`.
@@ -75,39 +75,55 @@ def detect_floating_buttons(screen):
         - Missing/unreadable template files are logged and skipped; detection continues for others.
     """
     results = []
-    floating_buttons = get_entries_by_role("floating_button")
-
-    for name, entry in floating_buttons.items():
-        try:
-            if not entry:
-                continue
-
-            pt, conf = match_region(screen, entry)
-            if pt is None:
-                log(f"{name} not matched (conf={conf:.2f})", "DEBUG")
-                continue
-
-            template_path = entry["match_template"]
-            template_path_full = os.path.join("assets/match_templates", template_path)
-
-            if not os.path.exists(template_path_full):
-                log(f"Template file missing: {template_path}", "ERROR")
-                continue
-
-            template = cv2.imread(template_path_full)
-            if template is None:
-                log(f"Template failed to load (cv2.imread returned None): {template_path}", "ERROR")
-                continue
-
-            h, w = template.shape[:2]
-            x, y = pt
-            results.append({
-                "name": name,
-                "match_region": {"x": x, "y": y, "w": w, "h": h},
-                "confidence": conf,
-                "tap_point": {"x": x + w // 2, "y": y + h // 2}
-            })
-        except Exception as e:
-            log(f"Exception during processing of {name}: {e}", "ERROR")
-
+    for name, entry in get_entries_by_role("floating_button").items():
+        hit = _detect_entry(screen, name, entry, scale)
+        if hit:
+            results.append(hit)
     return results
+
+
+def detect_floating_button_single(screen, name, scale=1.0):
+    """
+    Detect one floating button by clickmap key, matching only its template.
+
+    AUTO-SPEC:
+      signature: core.floating_button_detector.detect_floating_button_single(screen: ndarray, name: str, scale: float = 1.0) -> list[dict]
+      R: list[dict] — [descriptor] (same shape as detect_floating_buttons) when matched, else [].
+      S: [cv2][fs][log]
+      E: Same as detect_floating_buttons (errors are logged; [] is returned).
+
+    Notes:
+        - For wait loops that only care about one button: skips the role scan over the whole
+          clickmap and every other button's template.
+        - The list return keeps `tap_floating_button(name, buttons)` usable unchanged.
+    """
+    entry = resolve_dot_path(name)
+    if not entry:
+        log(f"Floating button not in clickmap: {name}", "ERROR")
+        return []
+    hit = _detect_entry(screen, name, entry, scale)
+    return [hit] if hit else []
+
+
+def _detect_entry(screen, name, entry, scale):
+    try:
+        if not entry:
+            return None
+
+        pt, conf = match_region(screen, entry, scale=scale)
+        if pt is None:
+            log(f"{name} not matched (conf={conf:.2f})", "DEBUG")
+            return None
+
+        # Same cached template match_region just used; only its size is needed here
+        h, w = _load_template(f"assets/match_templates/{entry['match_template']}").shape[:2]
+        x, y = pt
+        return {
+            "name": name,
+            "match_region": {"x": x, "y": y, "w": w, "h": h},
+            "confidence": conf,
+            "tap_point": {"x": x + w // 2, "y": y + h // 2}
+        }
+    except Exception as e:
+        log(f"Exception during processing of {name}: {e}", "ERROR")
+        return None
@@ -20,8 +20,9 @@ import cv2
 import numpy as np
 import functools
 from core.ss_capture import capture_adb_screenshot
-from core.clickmap_access import get_clickmap, resolve_dot_path
-from core.adb_utils import adb_shell
+from core.clickmap_access import get_clickmap, resolve_dot_path, clickmap_generation
+from core.adb_session import input_shell
+from core.matcher import _ccoeff_normed, _peak
 from utils.logger import log
 
 
@@ -99,6 +100,37 @@ def _load_template(name: str):
     return tpl
 
 
+@functools.lru_cache(maxsize=256)
+def _label_spec(label_key: str, generation: int):
+    """
+    ---
+    spec:
+      r: "tuple(entry:dict, region:dict{x,y,w,h}, tap_offset:dict{x,y}|None) | None"
+      s: []
+      e:
+        - "ValueError from resolve_region (unknown region_ref / no region)"
+      params:
+        label_key: "str — clickmap dot-path"
+        generation: "int — clickmap_generation(); part of the cache key so clickmap edits invalidate"
+      notes:
+        - "Cached via lru_cache(256): dot-path walk, region_ref and tap-offset resolution happen once per label"
+        - "tap_offset: entry.tap_offset, else {x:405,y:60} for upgrade labels (right cost box), else None (center)"
+        - "Returns None when the key is missing (re-checked after the next clickmap edit)"
+    ---
+    """
+    entry = resolve_dot_path(label_key)
+    if not entry:
+        return None
+    # Prefer explicit per-entry offset. If missing and this is an upgrade label,
+    # fall back to a sensible default that targets the right cost box.
+    offset = entry.get("tap_offset", None)
+    if offset is None:
+        roles = entry.get("roles") or []
+        if isinstance(roles, list) and "upgrade_label" in roles:
+            offset = {"x": 405, "y": 60}
+    return entry, resolve_region(entry, get_clickmap()), offset
+
+
 def get_label_match(label_key: str, screenshot=None, return_meta=False):
     """
     ---
@@ -114,7 +146,7 @@ def get_label_match(label_key: str, screenshot=None, return_meta=False):
         screenshot: "ndarray|None — BGR or gray; capture via ADB when None"
         return_meta: "bool — when True, return dict with metadata and match_score"
       notes:
-        - "Converts screenshot to grayscale for matching"
+        - "Converts only the clamped region to grayscale for matching (never the full frame)"
         - "Threshold defaults to 0.9 unless entry.match_threshold provided"
         - "Clamps region to image bounds defensively"
     ---
@@ -122,9 +154,10 @@ def get_label_match(label_key: str, screenshot=None, return_meta=False):
     Returns (x, y, w, h) by default.
     If return_meta=True, returns a dict with match + metadata.
     """
-    entry = resolve_dot_path(label_key)
-    if not entry:
+    spec = _label_spec(label_key, clickmap_generation())
+    if spec is None:
         raise ValueError(f"Label key '{label_key}' not found in clickmap")
+    entry, region, _ = spec
 
     template = _load_template(entry["match_template"])
     if template is None:
@@ -137,13 +170,6 @@ def get_label_match(label_key: str, screenshot=None, return_meta=False):
         if screenshot is None:
             raise RuntimeError("Failed to capture screenshot")
 
-    # Convert to grayscale only when needed
-    if screenshot is not None and getattr(screenshot, "ndim", None) == 3:
-        screenshot = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
-
-    cm = get_clickmap()
-    region = resolve_region(entry, cm)
-
     # Clamp region to screenshot bounds (defensive)
     H, W = screenshot.shape[:2]
     x = max(0, int(region["x"]))
@@ -160,11 +186,14 @@ def get_label_match(label_key: str, screenshot=None, return_meta=False):
         )
 
     region_img = screenshot[y : y + clamped_h, x : x + clamped_w]
+    # Grayscale only the ROI (not the full frame): callers often try several labels on one capture
+    if region_img.ndim == 3:
+        region_img = cv2.cvtColor(region_img, cv2.COLOR_BGR2GRAY)
 
-    result = cv2.matchTemplate(region_img, template, cv2.TM_CCOEFF_NORMED)
-    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    result = _ccoeff_normed(region_img, template)  # TM_CCOEFF_NORMED into a reused per-thread buffer
+    max_val, max_loc = _peak(result, entry.get("match_threshold", 0.9))
 
-    if max_val < entry.get("match_threshold", 0.9):
+    if max_loc is None:
         raise ValueError(f"Match for {label_key} failed threshold: {max_val:.2f}")
 
     match_x = x + max_loc[0]
@@ -185,7 +214,7 @@ def get_label_match(label_key: str, screenshot=None, return_meta=False):
     return (match_x, match_y, tw, th)
 
 
-def tap_label_now(label_key: str) -> bool:
+def tap_label_now(label_key: str, screenshot=None) -> bool:
     """
     ---
     spec:
@@ -194,8 +223,10 @@ def tap_label_now(label_key: str) -> bool:
       e: []
       params:
         label_key: "str"
+        screenshot: "ndarray|None — reuse an existing frame (e.g., to try several labels on one capture)"
       notes:
         - "Catches ValueError/FileNotFoundError/RuntimeError from get_label_match and returns False"
+        - "Also returns False if the entry disappeared (clickmap reload) between match and tap"
         - "Supports optional entry.tap_offset {x,y}"
         - "Taps center of matched bbox when no offset"
     ---
@@ -203,25 +234,21 @@ def tap_label_now(label_key: str) -> bool:
     Returns True if the tap succeeded, False otherwise.
     """
     try:
-        x, y, w, h = get_label_match(label_key)
+        x, y, w, h = get_label_match(label_key, screenshot=screenshot)
     except (ValueError, FileNotFoundError, RuntimeError) as e:
         log(f"[SKIP] tap_label_now failed for {label_key}: {e}", "WARN")
         return False
 
-    entry = resolve_dot_path(label_key)
-    # Prefer explicit per-entry offset. If missing and this is an upgrade label,
-    # fall back to a sensible default that targets the right cost box.
-    offset = entry.get("tap_offset", None)
-    if offset is None:
-        roles = entry.get("roles") or []
-        if isinstance(roles, list) and "upgrade_label" in roles:
-            offset = {"x": 405, "y": 60}
-
+    spec = _label_spec(label_key, clickmap_generation())  # cached; resolved by get_label_match
+    if spec is None:  # clickmap reloaded since the match and the entry is gone
+        log(f"[SKIP] tap_label_now failed for {label_key}: not in clickmap anymore", "WARN")
+        return False
+    offset = spec[2]
     tap_x = x + offset["x"] if offset else x + w // 2
     tap_y = y + offset["y"] if offset else y + h // 2
 
     log(f"TAP_LABEL_NOW: {label_key} at ({tap_x},{tap_y})", "ACTION")
-    adb_shell(["input", "tap", str(tap_x), str(tap_y)])
+    input_shell(["input", "tap", str(tap_x), str(tap_y)])
     return True
 
 
@@ -303,7 +330,7 @@ def swipe_relative_in_region(region, start_frac=(0.50, 0.82), end_frac=(0.50, 0.
     ey = int(y0 + max(0.0, min(1.0, end_frac[1])) * h2)
 
     log(f"SWIPE_REL: ({sx},{sy})→({ex},{ey}) in {duration_ms}ms", "ACTION")
-    adb_shell(["input", "swipe", str(sx), str(sy), str(ex), str(ey), str(duration_ms)])
+    input_shell(["input", "swipe", str(sx), str(sy), str(ex), str(ey), str(duration_ms)])
 
 
 def page_column(side: str, direction: str, strength: str = "page", duration_ms: int = 260):
@@ -14,20 +14,100 @@ Notes:
 - Uses OpenCV template matching (cv2.TM_CCOEFF_NORMED).
 - Reads template/region/threshold from clickmap entries (via clickmap.json).
 - Expands the search region by optional 'match_padding' (default 12px), clamped to screen bounds.
+- Optional `scale` (<1.0) matches a downscaled ROI+template for cheap polling; results are in full-res coords.
+- Templates (and their downscaled copies) are read once per process and cached read-only;
+  edited template files are picked up on restart.
 """
 
 from __future__ import annotations
 from typing import Optional, Tuple, Dict, Any
+import functools
 import os
+import threading
 import cv2
 import numpy as np  # used by detect_floating_gem_square
 from core.clickmap_access import resolve_dot_path
 
 
+SCALE_MIN_TEMPLATE_SIDE = 12  # px; below this (after scaling) a template is matched at full resolution
+SCALE_RECHECK_MARGIN = 0.10   # downscaled near-misses within this of the threshold are re-matched at full res
+
+
+_tls = threading.local()  # per-thread matchTemplate result buffers (matching may run on more than one thread)
+
+
+def _result_buffer(shape: Tuple[int, int]) -> np.ndarray:
+    """
+    Reusable float32 matchTemplate output for `shape` on the calling thread.
+
+    Each clickmap entry has a fixed ROI/template size, so the same few shapes recur every
+    frame; passing the buffer as `result=` skips one allocation per match. The contents
+    are only valid until the next match of the same shape on the same thread.
+    """
+    bufs = getattr(_tls, "result_bufs", None)
+    if bufs is None:
+        bufs = _tls.result_bufs = {}
+    buf = bufs.get(shape)
+    if buf is None:
+        buf = bufs[shape] = np.empty(shape, dtype=np.float32)
+    return buf
+
+
+def _ccoeff_normed(region_img: np.ndarray, template: np.ndarray) -> np.ndarray:
+    """cv2.matchTemplate(TM_CCOEFF_NORMED) into this thread's reusable buffer (see _result_buffer)."""
+    shape = (region_img.shape[0] - template.shape[0] + 1, region_img.shape[1] - template.shape[1] + 1)
+    if shape[0] <= 0 or shape[1] <= 0:
+        return cv2.matchTemplate(region_img, template, cv2.TM_CCOEFF_NORMED)  # template larger than ROI: cv2.error
+    return cv2.matchTemplate(region_img, template, cv2.TM_CCOEFF_NORMED, result=_result_buffer(shape))
+
+
+PEAK_NUMPY_MIN_SIZE = 20_000  # result elements; measured crossover where ndarray.max beats cv2.minMaxLoc
+
+
+def _peak(res: np.ndarray, threshold: float) -> Tuple[float, Optional[Tuple[int, int]]]:
+    """
+    (max score, (x, y) of the max or None when max < threshold).
+
+    Large results (wide shared search regions) take ndarray.max — one SIMD reduction without
+    min/loc bookkeeping — and only pay for argmax on a hit; small ones stay on cv2.minMaxLoc,
+    whose lower call overhead wins there. Both report the first maximum in row-major order.
+    """
+    if res.size < PEAK_NUMPY_MIN_SIZE:
+        _, max_val, _, max_loc = cv2.minMaxLoc(res)
+        return max_val, (max_loc if max_val >= threshold else None)
+    max_val = float(res.max())
+    if max_val < threshold:
+        return max_val, None
+    row, col = np.unravel_index(int(res.argmax()), res.shape)
+    return max_val, (int(col), int(row))
+
+
+@functools.lru_cache(maxsize=256)
+def _load_template(template_path: str, scale: float = 1.0):
+    """
+    Cached template loader: one disk read + decode per (path, scale) per process.
+
+    Returns a read-only BGR ndarray (shared between callers), downscaled with INTER_AREA
+    when scale != 1.0. Raises FileNotFoundError / ValueError like _match_entry; failures
+    are not cached, so a template added later is found on the next call.
+    """
+    template = cv2.imread(template_path)
+    if template is None:
+        # Stat only on the failure path to tell a missing file from an undecodable one
+        if not os.path.exists(template_path):
+            raise FileNotFoundError(f"Template not found: {template_path}")
+        raise ValueError(f"Failed to load template: {template_path}")
+    if scale != 1.0:
+        template = cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    template.setflags(write=False)
+    return template
+
+
 def _match_entry(
     screenshot,
     entry: Dict[str, Any],
     template_dir: str = "assets/match_templates",
+    scale: float = 1.0,
 ) -> Tuple[Optional[Tuple[int, int]], float]:
     """
     Low-level matcher using an already-resolved clickmap entry dict.
@@ -45,6 +125,11 @@ def _match_entry(
         screenshot: BGR ndarray to search.
         entry: clickmap entry dict (see above).
         template_dir: base directory for templates.
+        scale: <1.0 matches a downscaled copy of the (padded) ROI and template (INTER_AREA);
+            ~scale² fewer FLOPs for polling loops. Coordinates are mapped back to full-res
+            (±1/scale px). Templates smaller than SCALE_MIN_TEMPLATE_SIDE after scaling
+            are matched at full resolution, and so are downscaled scores that miss the
+            threshold by less than SCALE_RECHECK_MARGIN.
 
     Returns:
         ((x, y), confidence) if confidence >= threshold; otherwise (None, confidence).
@@ -58,9 +143,43 @@ def _match_entry(
         return None, 0.0
 
     template_path = os.path.join(template_dir, entry["match_template"])
-    if not os.path.exists(template_path):
-        raise FileNotFoundError(f"Template not found: {template_path}")
+    template = _load_template(template_path)
+
+    bounds = _search_bounds(screenshot, entry)
+    if bounds is None:
+        return None, 0.0
+    x1, y1, x2, y2 = bounds
+    region_img = screenshot[y1:y2, x1:x2]
+
+    th, tw = template.shape[:2]
+    if scale != 1.0 and min(th, tw) * scale >= SCALE_MIN_TEMPLATE_SIDE:
+        region_img = cv2.resize(region_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        template = _load_template(template_path, scale)
+    else:
+        scale = 1.0
+
+    res = _ccoeff_normed(region_img, template)
 
+    threshold = float(entry.get("match_threshold", 0.9))
+    max_val, max_loc = _peak(res, threshold)
+    if max_loc is None and scale != 1.0 and max_val >= threshold - SCALE_RECHECK_MARGIN:
+        # Downsampling blurs edges and shaves a few points off true matches: settle near-misses at full res
+        return _match_entry(screenshot, entry, template_dir)
+    if max_loc is not None:
+        if scale != 1.0:
+            max_loc = (int(round(max_loc[0] / scale)), int(round(max_loc[1] / scale)))
+        match_x = x1 + max_loc[0] + tw // 2
+        match_y = y1 + max_loc[1] + th // 2
+        return (match_x, match_y), max_val
+    else:
+        return None, max_val
+
+
+def _search_bounds(screenshot, entry: Dict[str, Any]) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Padded search rectangle (x1, y1, x2, y2) for an entry, clamped to the screenshot;
+    None when the entry has no resolvable region or the rectangle is empty.
+    """
     # Resolve region
     region = entry.get("match_region")
     if region is None and "region_ref" in entry:
@@ -68,7 +187,7 @@ def _match_entry(
         region = region_entry.get("match_region") if region_entry else None
 
     if not region:
-        return None, 0.0
+        return None
 
     x, y, w, h = region["x"], region["y"], region["w"], region["h"]
     padding = int(entry.get("match_padding", 12))
@@ -79,24 +198,8 @@ def _match_entry(
     x2 = min(screenshot.shape[1], x + w + padding)
     y2 = min(screenshot.shape[0], y + h + padding)
     if x1 >= x2 or y1 >= y2:
-        return None, 0.0
-
-    region_img = screenshot[y1:y2, x1:x2]
-
-    template = cv2.imread(template_path)
-    if template is None:
-        raise ValueError(f"Failed to load template: {template_path}")
-
-    res = cv2.matchTemplate(region_img, template, cv2.TM_CCOEFF_NORMED)
-    _, max_val, _, max_loc = cv2.minMaxLoc(res)
-
-    threshold = float(entry.get("match_threshold", 0.9))
-    if max_val >= threshold:
-        match_x = x1 + max_loc[0] + template.shape[1] // 2
-        match_y = y1 + max_loc[1] + template.shape[0] // 2
-        return (match_x, match_y), max_val
-    else:
-        return None, max_val
+        return None
+    return x1, y1, x2, y2
 
 
 def get_match(
@@ -1,10 +1,266 @@
 import os
+import struct
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 import numpy as np
 import cv2
-from utils.logger import log
-from core.adb_utils import screencap_png
+from utils.logger import log, log_rate_limited
+from core.adb_utils import screencap_png, screencap_raw_exec
+from core.adb_session import RAW_FORMATS_BPP4
+from core.adb_session import AdbFramingError, screencap_raw
+
+LATEST_SCREENSHOT = "screenshots/latest.jpg"
+JPEG_QUALITY = 85  # debug/preview frames only; templates must still be cropped from lossless PNGs
+PNG_COMPRESSION = 1  # zlib level for PNG writes: speed over size (files ~10% larger, pixels identical)
+RAW_SHM_DIR = "/dev/shm"  # tmpfs mirror of LATEST_SCREENSHOT as raw BGR (skipped when absent)
+RAW_MIRROR_NAME = "latest.bgr"  # single fixed file, overwritten in place; never one per saved image
+_RAW_HEADER = struct.Struct("<IIIQ")  # h, w, channels, st_mtime_ns of the encoded file it mirrors
+
+
+def _imwrite_params(path):
+    """
+    ---
+    spec:
+      r: "list[int] — cv2.imwrite params for the path's extension"
+      s: []
+      e: []
+      params:
+        path: "str — output path; .jpg/.jpeg selects JPEG at JPEG_QUALITY, .png zlib level PNG_COMPRESSION"
+      notes:
+        - ".png uses zlib level PNG_COMPRESSION (still lossless, ~4x faster than OpenCV's default 3)"
+        - "Other extensions use OpenCV defaults"
+    ---
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jpg", ".jpeg"):
+        return [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]
+    if ext == ".png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION]
+    return []
+
+
+_IO_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ImageWriter")
+_made_dirs = set()
+
+
+def _ensure_dir(path):
+    d = os.path.dirname(path)
+    if d and d not in _made_dirs:
+        os.makedirs(d, exist_ok=True)
+        _made_dirs.add(d)
+
+
+def _write_image(path, img):
+    try:
+        # Encode in memory, then one buffered write (no libpng/libjpeg file I/O per call)
+        ok, buf = cv2.imencode(os.path.splitext(path)[1], img, _imwrite_params(path))
+        if not ok:
+            raise ValueError("cv2.imencode returned False")
+        with open(path, "wb") as f:
+            f.write(buf)
+    except Exception as e:
+        log_rate_limited("save_image_failed", lambda: f"[CAPTURE] Failed to write {path}: {e}", "ERROR")
+        return False
+    _publish_raw(path, img)  # after the write: the mirror records the file's final mtime
+    return True
+
+
+def _raw_mirror_path(path):
+    """tmpfs raw mirror for LATEST_SCREENSHOT; None for any other path or when RAW_SHM_DIR is unavailable."""
+    if os.path.abspath(path) != os.path.abspath(LATEST_SCREENSHOT) or not os.path.isdir(RAW_SHM_DIR):
+        return None
+    return os.path.join(RAW_SHM_DIR, RAW_MIRROR_NAME)
+
+
+def _publish_raw(path, img):
+    # Best effort: a missing/stale mirror only means load_screenshot() decodes the file instead
+    try:
+        raw = _raw_mirror_path(path)
+        if raw is None or img.ndim != 3 or img.dtype != np.uint8:
+            return
+        h, w, c = img.shape
+        tmp = f"{raw}.{threading.get_ident()}.tmp"  # two writer threads may save the same path
+        with open(tmp, "wb") as f:
+            f.write(_RAW_HEADER.pack(h, w, c, os.stat(path).st_mtime_ns))
+            f.write(np.ascontiguousarray(img).data)
+        os.replace(tmp, raw)
+    except Exception as e:
+        log_rate_limited("publish_raw_failed", lambda: f"[CAPTURE] Raw mirror for {path} not written: {e}", "DEBUG")
+
+
+def load_screenshot(path):
+    """
+    ---
+    spec:
+      r: "np.ndarray | None (BGR) — like cv2.imread(path)"
+      s: ["fs"]
+      e:
+        - "Never raises for mirror problems; falls back to cv2.imread"
+      params:
+        path: "str — image path; only LATEST_SCREENSHOT has a raw mirror, anything else is just imread"
+      notes:
+        - "When capture_and_save_screenshot() last wrote LATEST_SCREENSHOT and the mirror still
+           matches its mtime, the frame is memory-mapped from RAW_SHM_DIR instead of decoded"
+        - "A mapped frame is read-only; copy() it before drawing on it"
+    ---
+    Load a saved screenshot, reusing the decoded pixels published when it was written.
+    """
+    raw = _raw_mirror_path(path)
+    if raw is not None:
+        try:
+            mm = np.memmap(raw, dtype=np.uint8, mode="r")
+            h, w, c, mtime_ns = _RAW_HEADER.unpack_from(mm, 0)
+            if mtime_ns == os.stat(path).st_mtime_ns and mm.size == _RAW_HEADER.size + h * w * c:
+                return np.ndarray((h, w, c), dtype=np.uint8, buffer=mm, offset=_RAW_HEADER.size)
+        except (OSError, ValueError, struct.error):
+            pass
+    return cv2.imread(path)
+
+
+def save_image_async(img, path, *, sync: bool = False) -> Future:
+    """
+    ---
+    spec:
+      r: "concurrent.futures.Future[bool] — True once the file is written"
+      s: ["cv2", "fs", "thread"]
+      e:
+        - "Never raises for encode/write errors; they are logged (rate-limited) and the future yields False"
+      params:
+        img: "np.ndarray (BGR) — must not be mutated by the caller afterwards (no copy is taken)"
+        path: "str — output path; extension selects the encoder (see _imwrite_params)"
+        sync: "bool — when True, block until the write finished (debug-critical aborts)"
+      notes:
+        - "Encodes on a 2-worker pool so handlers don't pay the encode on their critical path"
+        - "Parent directories are created once per directory per process"
+        - "Writing LATEST_SCREENSHOT also refreshes the raw tmpfs mirror read by load_screenshot()"
+    ---
+    """
+    _ensure_dir(path)
+    fut = _IO_POOL.submit(_write_image, path, img)
+    if sync:
+        fut.result()
+    return fut
+
+
+MATCHES_DIR = os.path.join("screenshots", "matches")  # handler step/abort evidence frames
+
+
+def save_match_image(img, tag, *, sync: bool = False):
+    """
+    ---
+    spec:
+      r: "None"
+      s: ["cv2", "fs", "log", "thread"]
+      e:
+        - "Never raises for encode/write errors (see save_image_async)"
+      params:
+        img: "np.ndarray | None (BGR) — None is skipped with a WARN"
+        tag: "str — filename stem under MATCHES_DIR (written as <tag>.jpg)"
+        sync: "bool — wait for the write (only when the file is read back right away)"
+      notes:
+        - "Encoded on the save_image_async writer pool; the pool is joined at interpreter exit,
+           so an abort frame still lands even if the process stops right after"
+    ---
+    Persist a handler screenshot to the matches directory with a descriptive tag.
+    """
+    if img is None:
+        log(f"[CAPTURE] No image to save for tag '{tag}' (img=None). Skipping.", "WARN")
+        return
+    path = os.path.join(MATCHES_DIR, f"{tag}.jpg")
+    save_image_async(img, path, sync=sync)
+    log(f"[CAPTURE] Saved screenshot: {path}", "INFO")
+
+
+RAW_MAX_FAILURES = 3  # consecutive unparseable raw frames before falling back to PNG for good
+_raw_failures = 0
+
+
+def _capture_raw():
+    """
+    ---
+    spec:
+      r: "np.ndarray | None (BGR)"
+      s: ["adb", "cv2", "log"]
+      e: []
+      params: {}
+      notes:
+        - "Raw framebuffer through the persistent adb shell (core.adb_session); no PNG encode/decode"
+        - "Disabled after RAW_MAX_FAILURES consecutive framing failures (e.g., PTY-mangled output on old adbd)"
+        - "Connection failures (device offline, adb server restart) return None without counting"
+    ---
+    """
+    global _raw_failures
+    if _raw_failures >= RAW_MAX_FAILURES:
+        return None
+    try:
+        frame = screencap_raw()
+    except AdbFramingError:
+        _raw_failures += 1
+        if _raw_failures >= RAW_MAX_FAILURES:
+            log(f"[ADB] Raw screencap unparseable {_raw_failures}x; using PNG capture from now on", "WARN")
+        return None
+    if frame is None:
+        return None
+    _raw_failures = 0
+    w, h, fmt, pixels = frame
+    return _raw_to_bgr(w, h, fmt, pixels)
+
+
+def _raw_to_bgr(w, h, fmt, pixels):
+    rgba = np.frombuffer(pixels, dtype=np.uint8).reshape(h, w, 4)
+    return cv2.cvtColor(rgba, cv2.COLOR_BGRA2BGR if fmt == 5 else cv2.COLOR_RGBA2BGR)
+
+
+_exec_raw_failures = 0
+
+
+def _capture_raw_exec():
+    """
+    ---
+    spec:
+      r: "np.ndarray | None (BGR)"
+      s: ["adb", "cv2", "log"]
+      e: []
+      params: {}
+      notes:
+        - "One-shot `adb exec-out screencap` (raw); used when the persistent session is unavailable"
+        - "Header is 12 bytes (w,h,fmt) or 16 (+colorspace, Android 9+); told apart by payload size"
+        - "Disabled after RAW_MAX_FAILURES consecutive parse failures (PNG path takes over)"
+    ---
+    """
+    global _exec_raw_failures
+    if _exec_raw_failures >= RAW_MAX_FAILURES:
+        return None
+    data = screencap_raw_exec()
+    if not data or len(data) < 12:
+        return None
+    w, h, fmt = struct.unpack_from("<III", data)
+    header = len(data) - w * h * 4
+    if fmt not in RAW_FORMATS_BPP4 or header not in (12, 16):
+        _exec_raw_failures += 1
+        log_rate_limited(
+            "capture_raw_exec_parse",
+            lambda: f"[ADB] Unexpected raw screencap (w={w} h={h} fmt={fmt} len={len(data)})",
+            "WARN",
+        )
+        return None
+    _exec_raw_failures = 0
+    return _raw_to_bgr(w, h, fmt, memoryview(data)[header:])
+
+
+_last_lock = threading.Lock()
+_last_frame = None
+_last_ts = 0.0
+
+
+def _remember(img):
+    global _last_frame, _last_ts
+    if img is not None:
+        with _last_lock:
+            _last_frame, _last_ts = img, time.monotonic()
+    return img
 
-LATEST_SCREENSHOT = "screenshots/latest.png"
 
 def capture_adb_screenshot():
     """
@@ -13,22 +269,31 @@ def capture_adb_screenshot():
       r: "np.ndarray | None (BGR)"
       s: ["adb", "cv2", "log"]
       e:
-        - "Returns None on capture or decode failure; logs ERROR"
+        - "Returns None on capture or decode failure; logs ERROR (rate-limited to 1/s)"
       params: {}
       notes:
-        - "Uses core.adb_utils.screencap_png() → PNG bytes"
+        - "Fast path: raw framebuffer over the persistent adb shell (no per-frame adb spawn)"
+        - "Then: one-shot raw `adb exec-out screencap` (still no PNG encode/decode)"
+        - "Fallback: core.adb_utils.screencap_png() → PNG bytes"
         - "Validates PNG signature before decode"
         - "Decodes via cv2.imdecode to BGR ndarray"
+        - "Every successful frame is remembered for capture_adb_screenshot_cached()"
     ---
     Capture a screenshot from the connected ADB device/emulator and decode to an OpenCV BGR image.
 
     Returns:
         np.ndarray (BGR) on success, or None on failure.
     """
+    img = _capture_raw()
+    if img is None:
+        img = _capture_raw_exec()
+    if img is not None:
+        return _remember(img)
+
     try:
         png_data = screencap_png()
         if not png_data:
-            log("[ADB Error] Empty screenshot data", "ERROR")
+            log_rate_limited("capture_empty", "[ADB Error] Empty screenshot data", "ERROR")
             return None
 
         if not png_data.startswith(b'\x89PNG\r\n\x1a\n'):
@@ -40,13 +305,35 @@ def capture_adb_screenshot():
         if img is None:
             raise ValueError("OpenCV failed to decode image")
 
-        return img
+        return _remember(img)
 
     except Exception as e:
-        log(f"[Error] {e}", "ERROR")
+        log_rate_limited("capture_failed", lambda: f"[Error] {e}", "ERROR")
         return None
 
 
+def capture_adb_screenshot_cached(max_age_s: float = 0.3):
+    """
+    ---
+    spec:
+      r: "np.ndarray | None (BGR) — the last captured frame if younger than max_age_s, else a fresh capture"
+      s: ["adb?", "cv2", "log"]
+      e:
+        - "Same as capture_adb_screenshot() when a fresh capture is needed"
+      params:
+        max_age_s: "float — reuse window in seconds (monotonic clock)"
+      notes:
+        - "Shares frames with every capture path (incl. the background capture thread)"
+        - "The returned array is shared, not copied; treat it as read-only"
+        - "Use only where the screen is known not to have changed since (static screens, debug saves)"
+    ---
+    """
+    with _last_lock:
+        if _last_frame is not None and time.monotonic() - _last_ts < max_age_s:
+            return _last_frame
+    return capture_adb_screenshot()
+
+
 def capture_and_save_screenshot(path=LATEST_SCREENSHOT, *, log_capture: bool = True):
     """
     ---
@@ -55,18 +342,21 @@ def capture_and_save_screenshot(path=LATEST_SCREENSHOT, *, log_capture: bool = T
       s: ["adb", "cv2", "fs", "log"]
       e:
         - "Returns None if capture fails"
-        - "OSError may propagate from os.makedirs/cv2.imwrite on filesystem errors"
+        - "OSError may propagate from os.makedirs; encode/write errors are logged (rate-limited), not raised"
       params:
-        path: "str — output PNG path (parents created)"
+        path: "str — output path (parents created); .jpg/.jpeg → JPEG q=JPEG_QUALITY, else PNG"
         log_capture: "bool — when False, suppress DEBUG log after save"
       notes:
         - "Delegates capture to capture_adb_screenshot()"
-        - "Writes PNG to disk if capture succeeds"
+        - "Writes the image to disk if capture succeeds (JPEG by default; ~10x cheaper than PNG)"
+        - "Synchronous (the file exists on return) but shares _write_image's imencode + single write"
+        - "Saving to LATEST_SCREENSHOT also refreshes the raw tmpfs mirror read by load_screenshot()"
     ---
     Capture a screenshot and save it to disk.
 
     Args:
-        path: Output PNG path; parent directories will be created if needed.
+        path: Output path; parent directories will be created if needed. The extension
+            selects the encoder (.jpg/.jpeg → JPEG, otherwise PNG).
         log_capture (bool): When False, suppress the debug log after saving.
 
     Returns:
@@ -74,8 +364,8 @@ def capture_and_save_screenshot(path=LATEST_SCREENSHOT, *, log_capture: bool = T
     """
     img = capture_adb_screenshot()
     if img is not None:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        cv2.imwrite(path, img)
+        _ensure_dir(path)
+        _write_image(path, img)
         if log_capture:
             log(f"Captured and saved screenshot: shape={img.shape}, path={path}", level="DEBUG")
     return img
@@ -21,16 +21,24 @@ defaults:
   matcher: OpenCV TM_CCOEFF_NORMED via utils.template_matcher/core.matcher
   clickmap: config/clickmap.json (resolved via core.clickmap_access)
   state_yaml: config/state_definitions.yaml (safe_load)
+  frame_identity: the same ndarray object (and scale) as the previous call → cached result, no TTL
+  frame_gate: 16x9 INTER_AREA thumbnail; identical thumbnail within 2.0s → cached result
+  roi_gate: per clickmap key, a byte-identical search ROI reuses that key's last match (no TTL needed)
   invariants:
     - Exactly one primary state per frame; multiple → RuntimeError
     - Menus are mutually exclusive; choose first match in YAML order
     - Overlays: 0..N may co-exist
 """
 
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+import cv2
 from utils.template_matcher import match_region
+from core.matcher import _search_bounds
 from utils.logger import log
-from core.clickmap_access import resolve_dot_path, get_clickmap
-from core.matcher import get_match
+from core.clickmap_access import resolve_dot_path, get_clickmap, clickmap_generation
 import yaml
 import os
 
@@ -54,18 +62,169 @@ def load_state_definitions():
         return yaml.safe_load(f)
 
 
+@dataclass(frozen=True, slots=True)
+class StateRule:
+    """
+    spec:
+      name: StateRule
+      kind: frozen dataclass (slots)
+      r: Normalized state/overlay rule built once from the YAML
+      notes:
+        - type is "overlay" for entries under `overlays:`; YAML default for states is "unknown"
+        - match_keys holds (dot_path, resolved clickmap entry) pairs; unresolved keys are dropped at build time
+    """
+    name: str
+    type: str
+    match_keys: Tuple[Tuple[str, Dict[str, Any]], ...]
+
+
+def _build_rules(defs, section: str, default_type: str) -> Tuple[StateRule, ...]:
+    """
+    spec:
+      name: _build_rules
+      signature: _build_rules(defs:dict, section:str, default_type:str) -> tuple[StateRule, ...]
+      r: One StateRule per YAML item under `section`, in YAML order (order = priority)
+      s: [log]
+      e: none (unresolved keys / entries without match_template are WARN-logged once and skipped)
+    """
+    rules = []
+    for item in (defs or {}).get(section) or []:
+        resolved = []
+        for key in item.get("match_keys") or []:
+            entry = resolve_dot_path(key)
+            if not entry:
+                log(f"[WARN] Unresolved key: {key}", "WARN")
+                continue
+            if "match_template" not in entry:
+                log(f"[WARN] No match_template for {key}; template matcher will always fail", "WARN")
+                continue
+            resolved.append((key, entry))
+        rules.append(StateRule(
+            name=item["name"],
+            type=item.get("type", default_type),
+            match_keys=tuple(resolved),
+        ))
+    return tuple(rules)
+
+
 state_definitions = load_state_definitions()
 clickmap = get_clickmap()
+_STATES: Tuple[StateRule, ...] = ()
+_OVERLAYS: Tuple[StateRule, ...] = ()
+_STATES_BY_NAME: Dict[str, StateRule] = {}
+_rules_generation: Optional[int] = None  # clickmap_generation() the rule tables were built for
+
+FRAME_GATE_SIZE = (16, 9)   # (w, h) thumbnail used as a cheap frame fingerprint
+FRAME_GATE_TTL_S = 2.0      # re-run full detection at least this often (animated/subtle states)
 
+_last_frame_key: Optional[bytes] = None
+_last_result: Optional[dict] = None
+_last_result_ts: float = 0.0
+_last_screen_ref: Optional[weakref.ref] = None  # weak ref to the frame _last_result was computed on
+_last_scale: Optional[float] = None
 
-def detect_state_and_overlays(screen, *, log_matches: bool = False):
+# (clickmap key, scale) -> (ROI fingerprint, (pt, conf)) from the last frame that matched the key
+_roi_matches: Dict[Tuple[str, float], Tuple[int, Tuple[Any, float]]] = {}
+
+
+def _frame_key(screen) -> bytes:
+    """
+    spec:
+      name: _frame_key
+      signature: _frame_key(screen) -> bytes
+      r: Bytes of a FRAME_GATE_SIZE area-downsampled thumbnail (shape is part of the key)
+      s: [cv2]
+      notes:
+        - Tiny changes can average out inside a cell; FRAME_GATE_TTL_S bounds how long that can hide them
+    """
+    thumb = cv2.resize(screen, FRAME_GATE_SIZE, interpolation=cv2.INTER_AREA)
+    return repr(screen.shape).encode() + thumb.tobytes()
+
+
+def _refresh_rules() -> None:
+    """
+    spec:
+      name: _refresh_rules
+      signature: _refresh_rules() -> None
+      r: null
+      s: [state][log]
+      notes:
+        - (Re)builds _STATES/_OVERLAYS/_STATES_BY_NAME when clickmap_generation() changed since the last build
+        - A rebuild also drops the per-key ROI matches and the cached frame result, which were
+          computed with the old regions/templates/thresholds
+        - O(1) when nothing changed (one int compare per detection call)
+    """
+    global _STATES, _OVERLAYS, _STATES_BY_NAME, _rules_generation, _last_result, _last_frame_key
+    generation = clickmap_generation()
+    if generation == _rules_generation:
+        return
+    _STATES = _build_rules(state_definitions, "states", "unknown")
+    _OVERLAYS = _build_rules(state_definitions, "overlays", "overlay")
+    _STATES_BY_NAME = {rule.name: rule for rule in _STATES}
+    _roi_matches.clear()
+    _last_result = _last_frame_key = None
+    _rules_generation = generation
+
+
+_refresh_rules()  # build at import so unresolved keys are reported at startup
+
+
+def _roi_fingerprint(screen, entry) -> Optional[int]:
+    """
+    spec:
+      name: _roi_fingerprint
+      signature: _roi_fingerprint(screen, entry) -> int|None
+      r: Hash of the entry's padded search ROI bytes (+ bounds); None when the entry has no region
+      notes:
+        - Exact, not perceptual: the template match is deterministic, so equal bytes ⇒ equal result
+        - Static UI regions (indicators, menu buttons) stay byte-identical while the battlefield animates,
+          which the whole-frame gate cannot exploit
+    """
+    bounds = _search_bounds(screen, entry)
+    if bounds is None:
+        return None
+    x1, y1, x2, y2 = bounds
+    return hash((bounds, screen[y1:y2, x1:x2].tobytes()))
+
+
+def _gated_match(screen, key: str, entry, scale: float):
+    """
+    spec:
+      name: _gated_match
+      signature: _gated_match(screen, key:str, entry:dict, scale:float) -> ((x,y)|None, float)
+      r: match_region() result for the entry, or the key's stored result when its ROI is unchanged
+      s: [cv2]
+      notes:
+        - ROI gate: skip matchTemplate when this key's search area is byte-identical to its last match
+    """
+    fingerprint = _roi_fingerprint(screen, entry)
+    cached = _roi_matches.get((key, scale))
+    if fingerprint is not None and cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    hit = match_region(screen, entry, scale=scale)
+    if fingerprint is not None:
+        _roi_matches[(key, scale)] = (fingerprint, hit)
+    return hit
+
+
+def _copy_result(result: dict) -> dict:
+    return {
+        "state": result["state"],
+        "secondary_states": list(result["secondary_states"]),
+        "overlays": list(result["overlays"]),
+        "menu": result["menu"],
+    }
+
+
+def detect_state_and_overlays(screen, *, log_matches: bool = False, scale: float = 1.0):
     """
     spec:
       name: detect_state_and_overlays
-      signature: detect_state_and_overlays(screen, *, log_matches: bool = False) -> dict
+      signature: detect_state_and_overlays(screen, *, log_matches: bool = False, scale: float = 1.0) -> dict
       p:
         screen: BGR ndarray (full screen capture)
         log_matches: emit MATCH logs for debugging if True
+        scale: <1.0 matches downscaled ROIs/templates (polling loops); see core.matcher._match_entry
       r:
         dict with keys:
           state: str  # one of primary names or "UNKNOWN"
@@ -76,11 +235,40 @@ def detect_state_and_overlays(screen, *, log_matches: bool = False):
       e:
         - RuntimeError: when multiple primary states match in the same frame
       notes:
-        - Uses core.matcher.get_match for primary/menu checks (clickmap-backed)
-        - Uses utils.template_matcher.match_region for overlay checks
-        - Unresolved clickmap keys are WARN-logged and skipped
+        - Iterates pre-built StateRule tuples (_STATES/_OVERLAYS); entries are resolved once per clickmap generation
+        - Uses utils.template_matcher.match_region (core.matcher._match_entry) for all checks
+        - Unresolved clickmap keys are WARN-logged once per (re)build and skipped
+        - Each clickmap key is matched at most once per frame, even when several rules list it
         - If no primary matches, state remains "UNKNOWN"
+        - Calling again with the very same ndarray (and scale) returns a copy of the cached result in O(1)
+        - Frames whose 16x9 thumbnail equals the previous one (within FRAME_GATE_TTL_S) return a copy
+          of the cached result without any template matching; MATCH logs are not re-emitted then
+        - Otherwise each key whose padded ROI is byte-identical to its last matched ROI reuses that match
     """
+    global _last_frame_key, _last_result, _last_result_ts, _last_screen_ref, _last_scale
+
+    _refresh_rules()  # clickmap edited since the last call → rebuild rules, drop stale caches
+
+    # Same frame object as last time (e.g., a poll loop then a handler on one capture): nothing to redo.
+    # Frames are never mutated after capture, so identity implies identical pixels.
+    if (
+        _last_result is not None
+        and _last_screen_ref is not None
+        and _last_screen_ref() is screen
+        and _last_scale == scale
+    ):
+        return _copy_result(_last_result)
+
+    # Frame-diff gate: an unchanged frame reuses the previous classification (bounded by TTL)
+    frame_key = _frame_key(screen) + repr(scale).encode()
+    now = time.monotonic()
+    if (
+        _last_result is not None
+        and frame_key == _last_frame_key
+        and now - _last_result_ts < FRAME_GATE_TTL_S
+    ):
+        return _copy_result(_last_result)
+
     result = {
         "state": "UNKNOWN",
         "secondary_states": [],
@@ -90,42 +278,37 @@ def detect_state_and_overlays(screen, *, log_matches: bool = False):
 
     matched_states = []
 
-    # Match all states
-    for state in state_definitions.get("states", []):
-        state_name = state["name"]
-        match_keys = state.get("match_keys", [])
-        for key in match_keys:
-            entry = resolve_dot_path(key)
-            if not entry:
-                log(f"[WARN] Unresolved key: {key}", "WARN")
-                continue
-            pt, conf = get_match(key, screenshot=screen)
-            if "match_template" not in entry:
-                log(f"[WARN] No match_template for {key}; template matcher will always fail", "WARN")
-                continue
+    # Several rules share a key (e.g., indicators.tournament drives RUNNING and TOURNAMENT);
+    # match each key at most once per frame.
+    frame_matches: Dict[str, Tuple[Any, float]] = {}
+
+    def _match(key, entry):
+        hit = frame_matches.get(key)
+        if hit is None:
+            hit = frame_matches[key] = _gated_match(screen, key, entry, scale)
+        return hit
+
+    # Match all states (rules and clickmap entries are pre-resolved per clickmap generation)
+    for rule in _STATES:
+        for key, entry in rule.match_keys:
+            pt, conf = _match(key, entry)
             if pt:
                 if log_matches:
-                    log(f"[MATCH] State {state_name} via {key} at {pt} ({conf:.3f})", "MATCH")
-                matched_states.append(state_name)
+                    log(f"[MATCH] State {rule.name} via {key} at {pt} ({conf:.3f})", "MATCH")
+                matched_states.append(rule)
                 break
 
     # Classify into primary, secondary, and menu (mutually exclusive selection)
     menu_candidates_in_order = []  # preserve YAML order for priority
-    for name in matched_states:
-        # find the state entry (by name) in YAML
-        state_entry = next((s for s in state_definitions["states"] if s["name"] == name), None)
-        if not state_entry:
-            continue
-        state_type = state_entry.get("type", "unknown")
-
-        if state_type == "primary":
+    for rule in matched_states:
+        if rule.type == "primary":
             if result["state"] != "UNKNOWN":
-                raise RuntimeError(f"[ERROR] Multiple primary states matched: {result['state']} and {name}")
-            result["state"] = name
-        elif state_type == "menu":
-            menu_candidates_in_order.append(name)
+                raise RuntimeError(f"[ERROR] Multiple primary states matched: {result['state']} and {rule.name}")
+            result["state"] = rule.name
+        elif rule.type == "menu":
+            menu_candidates_in_order.append(rule.name)
         else:
-            result["secondary_states"].append(name)
+            result["secondary_states"].append(rule.name)
 
     if menu_candidates_in_order:
         # pick the first matched in YAML order (order = priority)
@@ -134,18 +317,34 @@ def detect_state_and_overlays(screen, *, log_matches: bool = False):
             log(f"[WARN] Multiple menus matched {menu_candidates_in_order} -> chose '{result['menu']}' (YAML order priority)", "WARN")
 
     # Match overlays (can be multiple)
-    for overlay in state_definitions.get("overlays", []):
-        overlay_name = overlay["name"]
-        for key in overlay.get("match_keys", []):
-            entry = resolve_dot_path(key)
-            if not entry:
-                log(f"[WARN]     Could not resolve: {key}", "WARN")
-                continue
-            pt, conf = match_region(screen, entry)
+    for rule in _OVERLAYS:
+        for key, entry in rule.match_keys:
+            pt, conf = _match(key, entry)
             if pt:
                 if log_matches:
-                    log(f"[MATCH] Overlay {overlay_name} via {key} at {pt} ({conf:.3f})", "MATCH")
-                result["overlays"].append(overlay_name)
+                    log(f"[MATCH] Overlay {rule.name} via {key} at {pt} ({conf:.3f})", "MATCH")
+                result["overlays"].append(rule.name)
                 break
 
+    _last_frame_key, _last_result, _last_result_ts = frame_key, _copy_result(result), now
+    _last_screen_ref, _last_scale = weakref.ref(screen), scale
     return result
+
+
+def matches_state(screen, name: str, *, scale: float = 1.0) -> bool:
+    """
+    spec:
+      name: matches_state
+      signature: matches_state(screen, name:str, *, scale:float=1.0) -> bool
+      r: True when any match key of the state rule `name` matches the frame
+      s: [cv2]
+      e:
+        - KeyError: when `name` is not a state in config/state_definitions.yaml
+      notes:
+        - For wait loops that need one state (e.g., "is it RUNNING yet?"): only that rule's templates
+          run, instead of the full state + overlay cascade of detect_state_and_overlays
+        - Shares the per-key ROI gate with detect_state_and_overlays; no primary-conflict check
+    """
+    _refresh_rules()
+    rule = _STATES_BY_NAME[name]
+    return any(_gated_match(screen, key, entry, scale)[0] for key, entry in rule.match_keys)
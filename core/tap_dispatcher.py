@@ -12,16 +12,20 @@ spec_legend:
 defaults:
   queue_semantics: FIFO ordering preserved per process
   worker: A daemon thread is started on import and processes TAP_QUEUE
-  tap_path: Uses core.adb_utils.adb_shell → "input tap x y"
+  tap_path: Uses core.adb_session.input_shell → "input tap x y" on the persistent input shell
+  repeater_path: start_tap_repeater() runs a device-side "input tap; sleep" loop stopped by a sentinel file
   logging: Per-tap logging goes through utils.logger.log when log_it=True
 """
 
+import os
 import threading
 import queue
+import subprocess
 import time
 import random
 from utils.logger import log
-from core.adb_utils import adb_shell
+from core.adb_utils import adb_shell, ADB_DEVICE_ID
+from core.adb_session import input_shell
 
 TAP_QUEUE = queue.Queue()
 """
@@ -75,7 +79,7 @@ def _tap_worker():
       s: [tap][log]
       e:
         - queue.Empty is handled internally with a short idle wait.
-        - Other exceptions from adb_shell are not re-raised here (same-process resilience).
+        - Other exceptions from input_shell are not re-raised here (same-process resilience).
       notes:
         - Accepts both 4-tuple and legacy 3-tuple items from TAP_QUEUE.
     """
@@ -90,12 +94,71 @@ def _tap_worker():
                 log_it = True
             else:
                 x, y, label, log_it = item
-            adb_shell(["input", "tap", str(x), str(y)])
+            input_shell(["input", "tap", str(x), str(y)])
             if log_it:
                 log_tap(x, y, label)
         except queue.Empty:
             pass  # nothing to do
 
+
+def start_tap_repeater(x, y, interval, stop_file, max_taps):
+    """
+    Start a device-side loop that taps (x, y) every `interval` seconds until `stop_file` exists.
+
+    spec:
+      name: start_tap_repeater
+      signature: start_tap_repeater(x:int, y:int, interval:float, stop_file:str, max_taps:int) -> subprocess.Popen|None
+      r: The running `adb shell` Popen (host side of the loop); None if adb could not be spawned.
+      s: [tap][adb]
+      e: none (spawn failures are logged and reported as None)
+      p:
+        stop_file: Device path used as kill switch; removed (synchronously) before the loop is spawned.
+        max_taps: Device-side upper bound so the loop ends even if the host never writes stop_file.
+      notes:
+        - NOT queued: bypasses TAP_QUEUE ordering; timing runs on the device (no host wakeups per tap).
+        - Stop with stop_tap_repeater().
+    """
+    target = os.getenv("ADB_DEVICE") or ADB_DEVICE_ID
+    cmd = ["adb"]
+    if target:
+        cmd += ["-s", target]
+    # Clear a stale kill switch before spawning: removing it inside the script could erase a
+    # stop_tap_repeater() that ran before the remote shell got that far.
+    adb_shell(["rm", "-f", stop_file], check=False)
+    script = (
+        "i=0; "
+        f"while [ ! -f {stop_file} ] && [ $i -lt {int(max_taps)} ]; do "
+        f"input tap {int(x)} {int(y)}; i=$((i+1)); sleep {interval:g}; done"
+    )
+    try:
+        # One argv element: adb joins shell args with spaces and the device shell parses the script
+        return subprocess.Popen(cmd + ["shell", script], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except Exception as e:
+        log(f"[ERROR] Failed to start tap repeater: {e!r}", "ERROR")
+        return None
+
+
+def stop_tap_repeater(proc, stop_file, timeout=5.0):
+    """
+    spec:
+      name: stop_tap_repeater
+      signature: stop_tap_repeater(proc:subprocess.Popen|None, stop_file:str, timeout:float=5.0) -> None
+      r: null
+      s: [adb]
+      e: none (best-effort; the host process is killed if the loop does not exit in time)
+      notes:
+        - Writes the kill switch on the device, then waits for the loop's `adb shell` to exit.
+    """
+    adb_shell(["touch", stop_file], check=False)
+    if proc is None:
+        return
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
 # Start worker thread (on import)
 threading.Thread(target=_tap_worker, daemon=True).start()
 
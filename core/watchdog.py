@@ -12,20 +12,28 @@ spec_legend:
 defaults:
   game_package: com.TechTreeGames.TheTower
   detection:
-    - Foreground app inferred via dumpsys window/windows → activity/activities
+    - Foreground app inferred via dumpsys activity top (head) → window (device-side grep) → activity/activities
     - Multiple textual patterns supported for broad Android/emu coverage
-  targeting: Uses core.adb_utils.adb_shell; device selection follows adb_utils precedence
+  targeting: Polling queries go through the persistent core.adb_session shell (adb_shell fallback);
+             device selection follows adb_utils precedence
+  events: adb logcat (ActivityManager/ActivityTaskManager) wakes the check; adaptive 30→120s poll as backstop
   logging: Foreground package changes are INFO/DEBUG; failures WARN/ERROR
   sleep_delays:
     - bring_to_foreground: ~5s, restart_game: ~6s
   globals:
     - _last_foreground_pkg caches last seen foreground for change logging only
+    - _fg_cached_pkg/_fg_cached_ts cache the last lookup for FOREGROUND_CACHE_TTL_S
 """
 
+import os
 import re
+import shlex
+import subprocess
+import threading
 import time
 from core.automation_state import AUTOMATION, RunState
-from core.adb_utils import adb_shell
+from core.adb_utils import adb_shell, adb_shell_stream, ADB_DEVICE_ID
+from core import adb_session
 from utils.logger import log
 
 GAME_PACKAGE = "com.TechTreeGames.TheTower"
@@ -38,6 +46,8 @@ spec:
     - Override only if the target app id changes; other functions depend on it.
 """
 
+_GAME_PACKAGE_LOWER = GAME_PACKAGE.lower()  # case-insensitive foreground comparison
+
 _last_foreground_pkg = None
 """
 spec:
@@ -47,6 +57,73 @@ spec:
 """
 
 
+_FG_LINE_FILTER = re.compile(r"Focus|Resumed")
+_FG_PKG_RE = re.compile(
+    r"mCurrentFocus=Window\{.*?\s+(\S+)/\S+\}"   # 1: window mCurrentFocus (common on emu & older devices)
+    r"|topResumedActivity.*?\s+(\S+)/\S+"        # 2: topResumedActivity (newer AOSP)
+    r"|mResumedActivity.*?\s+(\S+)/\S+"          # 3: mResumedActivity (older/newer mixes)
+    r"|mFocusedApp=.*\s+(\S+)/\S+"               # 4: focused app (very old fallbacks)
+)
+"""
+spec:
+  name: _FG_PKG_RE
+  kind: const
+  r: One alternation over the foreground patterns; the matching group index is the pattern's priority.
+  notes:
+    - Only run on lines that pass _FG_LINE_FILTER (every alternative contains "Focus" or "Resumed").
+"""
+
+_TOP_ACTIVITY_RE = re.compile(r"ACTIVITY\s+([\w.]+)/")
+
+TOP_HEAD_LINES = 4  # lines of `dumpsys activity top` kept on device; shared by _probe and _get_foreground_package
+_TOP_QUERY = f"dumpsys activity top 2>/dev/null | head -n {TOP_HEAD_LINES}"
+
+STREAM_TIMEOUT_S = 2.0  # upper bound for a streamed dumpsys read (_stream_pkg); a cut-off read is discarded
+
+TOP_FAST_PATH_MAX_MISSES = 3  # consecutive structural misses before the top-activity fast path is skipped
+_top_fast_path_misses = 0
+"""
+spec:
+  name: _top_fast_path_misses
+  kind: module-global counter
+  r: int; consecutive `dumpsys activity top` replies with no ACTIVITY line at all (unsupported format).
+  notes:
+    - At TOP_FAST_PATH_MAX_MISSES the fast path is dropped for the process lifetime so devices that
+      never answer it stop paying that round-trip (and the bytes) on every poll.
+"""
+
+FOREGROUND_CACHE_TTL_S = 2.0
+"""
+spec:
+  name: FOREGROUND_CACHE_TTL_S
+  kind: const
+  r: Seconds a foreground lookup is reused by is_game_foregrounded().
+  notes:
+    - Kept well below the watchdog interval so each supervisory cycle still sees a fresh value;
+      it only collapses back-to-back queries from multiple callers.
+"""
+
+_fg_cached_pkg = None
+_fg_cached_ts = 0.0
+
+
+def _query(cmd: str):
+    """
+    spec:
+      name: _query
+      signature: _query(cmd:str) -> subprocess.CompletedProcess|None
+      r: Result of cmd (stdout captured, check=False semantics); None if both paths fail.
+      s: [adb]
+      e: none
+      notes:
+        - Uses the persistent adb shell session (no adb spawn per poll); falls back to a one-shot adb_shell.
+    """
+    res = adb_session.run(cmd)
+    if res is None:
+        res = adb_shell(cmd, capture_output=True, check=False)
+    return res
+
+
 def _parse_pkg_from_text(text: str):
     """
     spec:
@@ -57,55 +134,145 @@ def _parse_pkg_from_text(text: str):
       e: none (pure function)
       notes:
         - Supports multiple dumpsys formats (mCurrentFocus, topResumedActivity, mResumedActivity, mFocusedApp).
+        - Lines are pre-filtered (_FG_LINE_FILTER), then matched with one compiled alternation (_FG_PKG_RE);
+          pattern priority is preserved across lines.
     """
     if not text:
         return None
+    return _scan_pkg_lines(text.splitlines())
 
-    # Pattern 1: window mCurrentFocus (common on emu & older devices)
-    m = re.search(r"mCurrentFocus=Window\{.*?\s+(\S+)/\S+\}", text)
-    if m:
-        return m.group(1)
 
-    # Pattern 2: topResumedActivity (newer AOSP)
-    m = re.search(r"topResumedActivity.*?\s+(\S+)/\S+", text)
-    if m:
-        return m.group(1)
+def _scan_pkg_lines(lines):
+    """
+    spec:
+      name: _scan_pkg_lines
+      signature: _scan_pkg_lines(lines:Iterable[str]) -> str|None
+      r: Highest-priority package match over the lines; None if nothing matches.
+      s: none
+      notes:
+        - Stops consuming `lines` at the first mCurrentFocus match (top priority); any other match
+          is only final once every line was seen.
+    """
+    # One cheap substring pass over the dump; the regex only sees the shortlist
+    best_idx, best_pkg = None, None
+    for line in lines:
+        if not _FG_LINE_FILTER.search(line):
+            continue
+        m = _FG_PKG_RE.search(line)
+        if not m:
+            continue
+        idx = m.lastindex
+        if idx == 1:
+            return m.group(1)
+        if best_idx is None or idx < best_idx:
+            best_idx, best_pkg = idx, m.group(idx)
+
+    return best_pkg
+
+
+def _stream_pkg(cmd: str, timeout: float = STREAM_TIMEOUT_S):
+    """
+    spec:
+      name: _stream_pkg
+      signature: _stream_pkg(cmd:str, timeout:float=STREAM_TIMEOUT_S) -> str|None
+      r: Foreground package parsed from the streamed output of cmd; None on failure/timeout.
+      s: [adb]
+      e: none
+      notes:
+        - Parses the whole dump line by line without buffering it; adb is only stopped early once
+          mCurrentFocus (top priority) is seen. It usually sits near the end of `dumpsys window`.
+        - A kill-timer bounds the whole read to `timeout` seconds. A read cut off by it returns None
+          (the caller falls back to the activity dump) rather than a lower-priority partial match.
+    """
+    proc = adb_shell_stream(cmd)
+    if proc is None:
+        return None
+    expired = threading.Event()
+
+    def _expire():
+        expired.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, _expire)
+    timer.daemon = True
+    timer.start()
+    try:
+        pkg = _scan_pkg_lines(proc.stdout)
+        if expired.is_set():
+            log(f"[WATCHDOG] Streaming '{cmd}' timed out after {timeout:g}s; ignoring partial dump", "DEBUG")
+            return None
+        return pkg
+    except Exception as e:
+        log(f"[WATCHDOG] Streaming '{cmd}' failed: {e}", "DEBUG")
+        return None
+    finally:
+        timer.cancel()
+        try:
+            proc.kill()
+            proc.wait(timeout=2)
+        except Exception:
+            pass
 
-    # Pattern 3: mResumedActivity (older/newer mixes)
-    m = re.search(r"mResumedActivity.*?\s+(\S+)/\S+", text)
-    if m:
-        return m.group(1)
 
-    # Pattern 4: focused app (very old fallbacks)
-    m = re.search(r"mFocusedApp=.*\s+(\S+)/\S+", text)
-    if m:
-        return m.group(1)
+def _top_fast_path_enabled() -> bool:
+    return _top_fast_path_misses < TOP_FAST_PATH_MAX_MISSES
 
-    return None
 
+def _note_top_fast_path(answered: bool) -> None:
+    global _top_fast_path_misses
+    if answered:
+        _top_fast_path_misses = 0
+        return
+    _top_fast_path_misses += 1
+    if _top_fast_path_misses == TOP_FAST_PATH_MAX_MISSES:
+        log("[WATCHDOG] `dumpsys activity top` gives no ACTIVITY line here; using window dump only", "DEBUG")
 
-def _get_foreground_package():
+
+def _get_foreground_package(top_text=None):
     """
     spec:
       name: _get_foreground_package
-      signature: _get_foreground_package() -> str|None
+      signature: _get_foreground_package(top_text:str|None=None) -> str|None
       r: The currently foregrounded package name, or None if undetermined.
       s: [adb]
       e:
-        - Suppresses CalledProcessError by using check=False in adb_shell.
+        - Never raises; queries run via _query (persistent shell, check=False semantics).
         - Returns None on any non-zero exit or unparsable output.
+      p:
+        top_text: Already-fetched `dumpsys activity top | head` output (from _probe); skips that query.
       notes:
-        - Tries dumpsys window windows first, then dumpsys activity activities.
+        - Fast path: `dumpsys activity top | head -n TOP_HEAD_LINES` (a few hundred bytes instead of the full window dump);
+          dropped after TOP_FAST_PATH_MAX_MISSES replies without any ACTIVITY line (unsupported device).
+        - Then `dumpsys window | grep -E ...` filtered on device (if grep is empty, `dumpsys window windows` is
+          streamed and parsed in full unless mCurrentFocus turns up first),
+          then dumpsys activity activities.
     """
-    # First try window service (often most reliable under emu)
-    res = adb_shell(["dumpsys", "window", "windows"], capture_output=True, check=False)
-    if res and res.returncode == 0:
+    # Fast path: only the first lines of the top-activity dump (device-side head)
+    if top_text is None and _top_fast_path_enabled():
+        res = _query(_TOP_QUERY)
+        top_text = res.stdout if res and res.returncode == 0 else ""
+    if top_text is not None:
+        m = _TOP_ACTIVITY_RE.search(top_text)
+        _note_top_fast_path(m is not None or "ACTIVITY" in top_text)
+        if m:
+            return m.group(1)
+
+    # Window service (often most reliable under emu); grep on device so only matching lines cross USB
+    res = _query(
+        "dumpsys window | grep -E 'mCurrentFocus|mFocusedApp|topResumedActivity' | head -n 4"
+    )
+    if res and res.stdout.strip():
         pkg = _parse_pkg_from_text(res.stdout)
         if pkg:
             return pkg
+    else:
+        # grep unavailable/empty (minimal busybox): stream the window dump, stop only at mCurrentFocus
+        pkg = _stream_pkg("dumpsys window windows")
+        if pkg:
+            return pkg
 
     # Fallback to activity service (formats vary by release)
-    res = adb_shell(["dumpsys", "activity", "activities"], capture_output=True, check=False)
+    res = _query("dumpsys activity activities")
     if res and res.returncode == 0:
         pkg = _parse_pkg_from_text(res.stdout)
         if pkg:
@@ -114,19 +281,17 @@ def _get_foreground_package():
     return None
 
 
-def is_game_foregrounded():
+def _note_foreground(package):
     """
     spec:
-      name: is_game_foregrounded
-      signature: is_game_foregrounded() -> bool
-      r: True if GAME_PACKAGE is foreground; False otherwise.
-      s: [adb][log]
-      e: none (logs WARN when foreground cannot be determined)
+      name: _note_foreground
+      signature: _note_foreground(package:str|None) -> bool
+      r: True if package is GAME_PACKAGE (case-insensitive); False otherwise.
+      s: [log]
       notes:
-        - Logs any change in the detected foreground package since the last call.
+        - Logs foreground changes (DEBUG) and undetermined foreground (WARN).
     """
     global _last_foreground_pkg
-    package = _get_foreground_package()
     if package:
         if package != _last_foreground_pkg:
             if _last_foreground_pkg is None:
@@ -134,12 +299,35 @@ def is_game_foregrounded():
             else:
                 log(f"[WATCHDOG] Foreground changed: {package}", level="DEBUG")
             _last_foreground_pkg = package
-        return package.lower() == GAME_PACKAGE.lower()
+        return package.lower() == _GAME_PACKAGE_LOWER
     else:
         log("[WATCHDOG] Could not determine foreground app", level="WARN")
         return False
 
 
+def is_game_foregrounded(max_age_s: float = FOREGROUND_CACHE_TTL_S):
+    """
+    spec:
+      name: is_game_foregrounded
+      signature: is_game_foregrounded(max_age_s:float=FOREGROUND_CACHE_TTL_S) -> bool
+      r: True if GAME_PACKAGE is foreground; False otherwise.
+      s: [adb][log]
+      e: none (logs WARN when foreground cannot be determined)
+      p:
+        max_age_s: Reuse a foreground lookup younger than this (0 forces a fresh adb query).
+      notes:
+        - Logs any change in the detected foreground package since the last call.
+    """
+    global _fg_cached_pkg, _fg_cached_ts
+    now = time.monotonic()
+    if _fg_cached_pkg is not None and now - _fg_cached_ts < max_age_s:
+        package = _fg_cached_pkg
+    else:
+        package = _get_foreground_package()
+        _fg_cached_pkg, _fg_cached_ts = package, now
+    return _note_foreground(package)
+
+
 def bring_to_foreground():
     """
     spec:
@@ -190,23 +378,65 @@ def restart_game():
     log("[WATCHDOG] Game launched — deferring to main loop for state detection", "INFO")
 
 
-def _pid_running(package: str) -> bool:
+_PROBE_SEP = "---SEP---"
+
+PS_FALLBACK_ENV = "TOWER_WATCHDOG_PS_FALLBACK"  # set (any value) to allow the `ps -A` scan in _pid_running
+
+
+def _probe(package: str):
+    """
+    spec:
+      name: _probe
+      signature: _probe(package:str) -> (pidof_out:str|None, top_text:str|None)
+      r: pidof stdout and `dumpsys activity top | head` stdout from ONE device round-trip; (None, None) on failure.
+      s: [adb]
+      e: none
+      notes:
+        - Exit status is not meaningful for the batch; callers judge by stdout content.
+        - Once the top-activity fast path is dropped, only pidof is sent (top_text is None).
+    """
+    if not _top_fast_path_enabled():
+        res = _query(f"pidof {package}")
+        return (res.stdout if res else None), None
+    res = _query(f"pidof {package}; echo '{_PROBE_SEP}'; {_TOP_QUERY}")
+    if not res or _PROBE_SEP not in (res.stdout or ""):
+        return None, None
+    pidof_out, top_text = res.stdout.split(_PROBE_SEP, 1)
+    return pidof_out, top_text
+
+
+def _pid_running(package: str, pidof_out=None) -> bool:
     """
     spec:
       name: _pid_running
-      signature: _pid_running(package:str) -> bool
+      signature: _pid_running(package:str, pidof_out:str|None=None) -> bool
       r: True if a process with exact package name is running; else False.
       s: [adb]
       e: none (returns False on any adb failure)
+      p:
+        pidof_out: Already-fetched pidof stdout (from _probe); skips the pidof query.
       notes:
-        - Uses pidof first; falls back to parsing `ps -A` and matching the final column exactly.
+        - Uses pidof first; falls back to device-side `pgrep -x -f` / `busybox pidof` (exact match).
+        - The `ps -A` scan only runs when env PS_FALLBACK_ENV (TOWER_WATCHDOG_PS_FALLBACK) is set.
+        - Queries go through the persistent shell session (_query).
     """
-    res = adb_shell(["pidof", package], capture_output=True, check=False)
-    if res and res.returncode == 0 and res.stdout.strip():
+    if pidof_out is None:
+        res = _query(f"pidof {package}")
+        pidof_out = res.stdout if res and res.returncode == 0 else ""
+    if pidof_out.strip():
+        return True
+
+    # Fallback: exact match filtered on device (pgrep -f: comm is truncated to 15 chars on Linux)
+    q = shlex.quote(package)
+    res = _query(f"pgrep -x -f {q} 2>/dev/null || busybox pidof {q} 2>/dev/null")
+    if res and res.stdout.strip():
         return True
 
-    # Fallback: ps scan (avoid false positives by splitting columns)
-    res = adb_shell(["ps", "-A"], capture_output=True, check=False)
+    if not os.environ.get(PS_FALLBACK_ENV):
+        return False
+
+    # Last resort for exotic ROMs: ps scan (avoid false positives by splitting columns)
+    res = _query("ps -A")
     if not res or res.returncode != 0 or not res.stdout:
         return False
     for line in res.stdout.splitlines():
@@ -216,33 +446,150 @@ def _pid_running(package: str) -> bool:
     return False
 
 
-def watchdog_process_check(interval=30):
+HEARTBEAT_INTERVAL_S = 120
+"""
+spec:
+  name: HEARTBEAT_INTERVAL_S
+  kind: const
+  r: Upper bound (seconds) on the adaptive poll interval when no logcat event arrives.
+  notes:
+    - Covers a dead/unsupported logcat stream and state changes logcat does not announce.
+"""
+
+LOGCAT_RESPAWN_DELAY_S = 5.0
+
+_LOGCAT_DIED_RE = re.compile(rb"Process (\S+) \(pid \d+\) has died")
+_LOGCAT_START_RE = re.compile(rb"cmp=([\w.]+)/")
+
+
+def _check_once():
+    """
+    spec:
+      name: _check_once
+      signature: _check_once() -> tuple
+      r: (pid_running:bool, foregrounded:bool, foreground_pkg:str|None) as observed before acting.
+      s: [adb][state][log][sleep]
+      e: propagates unexpected exceptions (caller logs)
+      notes:
+        - pidof and the foreground query share one device round-trip (_probe).
+        - Calls restart_game or bring_to_foreground as needed.
+    """
+    # One round-trip for pidof + top activity; fallbacks only run when a half is empty
+    pidof_out, top_text = _probe(GAME_PACKAGE)
+    pid_running = _pid_running(GAME_PACKAGE, pidof_out=pidof_out)
+    package = _get_foreground_package(top_text=top_text)
+    foregrounded = _note_foreground(package)
+
+    if not pid_running:
+        log("[WATCHDOG] Game process not running. Restarting.", "WARN")
+        restart_game()
+    elif not foregrounded:
+        log("[WATCHDOG] Game is backgrounded. Bringing to foreground.", "WARN")
+        bring_to_foreground()
+    return pid_running, foregrounded, package
+
+
+def _logcat_cmd():
+    target = os.getenv("ADB_DEVICE") or ADB_DEVICE_ID
+    cmd = ["adb"]
+    if target:
+        cmd += ["-s", target]
+    return cmd + ["logcat", "-T", "1", "-s", "ActivityManager:I", "ActivityTaskManager:I"]
+
+
+def _logcat_event(line: bytes):
+    """
+    spec:
+      name: _logcat_event
+      signature: _logcat_event(line:bytes) -> str|None
+      r: "died" when GAME_PACKAGE's process died; "left" when another package was started; else None.
+      s: none
+    """
+    game = GAME_PACKAGE.encode()
+    m = _LOGCAT_DIED_RE.search(line)
+    if m and m.group(1) == game:
+        return "died"
+    if b"START" in line:
+        m = _LOGCAT_START_RE.search(line)
+        if m and m.group(1) != game:
+            return "left"
+    return None
+
+
+def _logcat_watch(wake: threading.Event):
+    """
+    spec:
+      name: _logcat_watch
+      signature: _logcat_watch(wake:threading.Event) -> None
+      r: null (infinite loop; run in a daemon thread)
+      s: [adb][log][loop][sleep]
+      e: none (stream errors are logged; logcat is respawned after LOGCAT_RESPAWN_DELAY_S)
+      notes:
+        - Streams ActivityManager/ActivityTaskManager lines from now on (-T 1) and sets `wake`
+          on game death or a foreign activity start; the checker thread does the acting.
+    """
+    while True:
+        proc = None
+        try:
+            proc = subprocess.Popen(_logcat_cmd(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            for line in proc.stdout:
+                event = _logcat_event(line)
+                if event:
+                    log(f"[WATCHDOG] logcat event: {event}", "DEBUG")
+                    wake.set()
+            log("[WATCHDOG] logcat stream ended; respawning", "DEBUG")
+        except Exception as e:
+            log(f"[WATCHDOG] logcat stream failed: {e}", "WARN")
+        finally:
+            if proc is not None:
+                try:
+                    proc.kill()
+                    proc.wait(timeout=2)
+                except Exception:
+                    pass
+        time.sleep(LOGCAT_RESPAWN_DELAY_S)
+
+
+def watchdog_process_check(interval=30, on_recover=None):
     """
     spec:
       name: watchdog_process_check
-      signature: watchdog_process_check(interval:int=30) -> None
+      signature: watchdog_process_check(interval:int=30, on_recover:Callable[[],None]|None=None) -> None
       r: null (infinite supervisory loop)
-      s: [adb][state][log][loop][sleep]
+      s: [adb][state][log][loop][sleep][thread]
       e:
         - Catches and logs all Exceptions each cycle; continues looping.
       p:
-        interval: Seconds between checks (≥1 recommended).
+        interval: Minimum seconds between checks (≥1 recommended).
+        on_recover: Called (on this thread) after a restart or bring-to-foreground, e.g. to wake the main loop.
       notes:
-        - Ensures the process is running and foregrounded; calls restart_game or bring_to_foreground as needed.
+        - Event-driven: a logcat reader thread (_logcat_watch) wakes the check on game death or a
+          foreign activity start, so detection is near-instant without steady-state polling.
+        - Adaptive backstop: the wait doubles per unchanged check (interval·2^n, capped at
+          HEARTBEAT_INTERVAL_S) and resets to `interval` on any change or logcat wake.
+        - Ensures the process is running and foregrounded (_check_once); all acting stays on this thread.
     """
+    wake = threading.Event()
+    threading.Thread(target=_logcat_watch, args=(wake,), name="WatchdogLogcat", daemon=True).start()
+
+    last_obs = None
+    stable_count = 0
     while True:
+        t0 = time.monotonic()
         try:
-            pid_running = _pid_running(GAME_PACKAGE)
-            foregrounded = is_game_foregrounded()
-
-            if not pid_running:
-                log("[WATCHDOG] Game process not running. Restarting.", "WARN")
-                restart_game()
-            elif not foregrounded:
-                log("[WATCHDOG] Game is backgrounded. Bringing to foreground.", "WARN")
-                bring_to_foreground()
-
+            obs = _check_once()
+            if on_recover is not None and not (obs[0] and obs[1]):
+                on_recover()
+            if obs == last_obs and obs[0] and obs[1]:
+                stable_count = min(stable_count + 1, 8)  # 30·2^8 is far past the cap
+            else:
+                stable_count = 0
+            last_obs = obs
         except Exception as e:
             log(f"[WATCHDOG ERROR] {e}", "ERROR")
+            stable_count = 0
 
-        time.sleep(interval)
+        sleep_s = min(interval * (2 ** stable_count), HEARTBEAT_INTERVAL_S)
+        if wake.wait(max(0.0, t0 + sleep_s - time.monotonic())):
+            stable_count = 0
+        wake.clear()
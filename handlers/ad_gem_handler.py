@@ -1,8 +1,9 @@
 # handlers/ad_gem_handler.py
 
+import queue
 import threading
 import time
-from core.tap_dispatcher import tap
+from core.tap_dispatcher import start_tap_repeater, stop_tap_repeater
 from core.clickmap_access import get_click
 from core.label_tapper import tap_label_now
 from utils.logger import log
@@ -10,6 +11,10 @@ from utils.logger import log
 _blind_tapper_active = threading.Event()
 _blind_tapper_stop = threading.Event()  # cooperative cancel
 
+BLIND_TAP_STOP_FILE = "/data/local/tmp/stop_gem"  # device-side kill switch for the tap loop
+
+_TAPPER_JOBS = queue.Queue()  # (duration, interval, stop_event) for the single tapper worker
+
 
 def _blind_floating_gem_tapper(duration=20, interval=1, stop_event=None):
     """
@@ -35,6 +40,8 @@ def _blind_floating_gem_tapper(duration=20, interval=1, stop_event=None):
         - Clamps interval to 0.1s minimum if <= 0.
         - Exits early if no floating gem tap location is defined.
         - Always clears the `_blind_tapper_active` flag on exit.
+        - Tap cadence runs on the device (start_tap_repeater); the host just waits on stop_event
+          for `duration`, then writes BLIND_TAP_STOP_FILE to end the loop.
     """
     if stop_event is None:
         stop_event = _blind_tapper_stop
@@ -54,33 +61,50 @@ def _blind_floating_gem_tapper(duration=20, interval=1, stop_event=None):
         return
 
     x, y = coords
-    label = "floating_gem_blind_tap"
 
-    start_ts = time.time()
-    taps = 0
+    start_ts = time.monotonic()
     log(f"Floating gem tapping initiated (duration={duration}s, interval={interval}s)", "ACTION")
 
-    end_time = time.time() + duration
+    # Device bound: the loop ends on its own even if the host never writes the stop file
+    max_taps = int(duration / interval) + 1
+    proc = start_tap_repeater(x, y, interval, BLIND_TAP_STOP_FILE, max_taps)
     try:
-        while time.time() < end_time and not stop_event.is_set():
-            try:
-                # Quiet path: suppress per-tap logging at the dispatcher
-                tap(x, y, label=label, log_it=False)
-                taps += 1
-            except Exception as e:
-                log(f"[ERROR] Blind gem tapper tap() failed: {e!r}", "ERROR")
-                break
-            # Sleep in small chunks to respond quickly to stop_event
-            target = time.time() + interval
-            while not stop_event.is_set() and time.time() < target:
-                time.sleep(min(0.05, target - time.time()))
+        if proc is None:
+            return
+        # Single wakeup: duration elapsed or stop requested
+        stop_event.wait(duration)
     finally:
-        elapsed = int(time.time() - start_ts)
-        log(f"Floating gem tapping finished (taps={taps}, elapsed≈{elapsed}s)", "ACTION")
+        stop_tap_repeater(proc, BLIND_TAP_STOP_FILE, timeout=interval + 5)
+        elapsed = time.monotonic() - start_ts
+        taps = min(max_taps, int(elapsed / interval) + 1) if proc is not None else 0
+        log(f"Floating gem tapping finished (taps≈{taps}, elapsed≈{int(elapsed)}s)", "ACTION")
         _blind_tapper_active.clear()
         stop_event.clear()
 
 
+def _tapper_worker():
+    """
+    Long-lived daemon worker: runs queued blind-tapper jobs one at a time.
+
+    Side effects:
+        [thread][loop] Never returns; started once at import.
+
+    Notes:
+        - Exceptions from a job are logged; the active flag is cleared so later jobs can start.
+    """
+    while True:
+        duration, interval, stop_event = _TAPPER_JOBS.get()
+        try:
+            _blind_floating_gem_tapper(duration=duration, interval=interval, stop_event=stop_event)
+        except Exception as e:
+            log(f"[ERROR] Blind gem tapper job failed: {e!r}", "ERROR")
+            _blind_tapper_active.clear()
+
+
+# Start worker thread (on import); daemon so it never holds up process exit
+threading.Thread(target=_tapper_worker, name="BlindGemTapper", daemon=True).start()
+
+
 def start_blind_gem_tapper(duration=20, interval=1, blocking=False):
     """
     Start the blind floating gem tapper for a given duration and interval.
@@ -92,7 +116,7 @@ def start_blind_gem_tapper(duration=20, interval=1, blocking=False):
             Delay between taps in seconds. Must be > 0. Default is 1.
         blocking (bool, optional):
             If True, runs in the current thread until complete.
-            If False (default), runs in a background thread and returns immediately.
+            If False (default), hands the job to the module's tapper worker thread and returns immediately.
 
     Returns:
         None
@@ -133,11 +157,7 @@ def start_blind_gem_tapper(duration=20, interval=1, blocking=False):
             pass
     else:
         log(f"[ACTION] Starting blind gem tapper (background) for {duration}s @ {interval}s", "ACTION")
-        threading.Thread(
-            target=_blind_floating_gem_tapper,
-            kwargs={"duration": duration, "interval": interval, "stop_event": _blind_tapper_stop},
-            daemon=False  # keep alive inside the process
-        ).start()
+        _TAPPER_JOBS.put((duration, interval, _blind_tapper_stop))
 
 
 def stop_blind_gem_tapper():
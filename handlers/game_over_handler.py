@@ -1,15 +1,18 @@
 # handlers/game_over_handler.py
 from utils.logger import log
-from core.ss_capture import capture_adb_screenshot
+from core.ss_capture import capture_adb_screenshot_cached, save_match_image
 from core.automation_state import AUTOMATION, ExecMode
 from core.clickmap_access import tap_now, swipe_now
 from core.adb_utils import adb_shell
 from core.label_tapper import tap_label_now
 from utils.wave_detector import set_wave_hint
+from utils.ui_wait import wait_until_stable
 # Note: OCR fallback for More Stats is currently disabled; keeping imports out.
 import time
 import os
-import cv2
+
+GAME_OVER_FRAME_MAX_AGE_S = 2.0  # capture thread runs at ~1s cadence; the Game Over screen is static
+
 
 def handle_game_over():
     """
@@ -37,7 +40,7 @@ def handle_game_over():
         [loop] May wait/sleep and/or loop while in WAIT mode.
 
     Defaults:
-        Uses several sleeps between actions (≈1.2–1.5s), and a final 2s sleep.
+        Waits for the UI to settle between actions (wait_until_stable, capped at ≈1.2–1.5s), and a final 2s sleep.
 
     Errors:
         Tap failures cause an early abort via _abort_handler(), which sets AUTOMATION.mode=WAIT.
@@ -45,30 +48,31 @@ def handle_game_over():
     session_id = _make_session_id()
     log(f"Handling GAME OVER — Session: {session_id}", "INFO")
 
-    # Save first screen
-    img_game_stats = capture_adb_screenshot()
-    save_image(img_game_stats, f"{session_id}_game_stats")
+    # Save first screen (static; reuse the frame the main loop classified as GAME_OVER when recent)
+    img_game_stats = capture_adb_screenshot_cached(max_age_s=GAME_OVER_FRAME_MAX_AGE_S)
+    save_match_image(img_game_stats, f"{session_id}_game_stats")
 
     # Step 1: Tap "More Stats"
     if not tap_label_now("buttons.more_stats:game_over"):
         return _abort_handler("Tap More Stats", session_id)
 
-    time.sleep(1.5)
+    wait_until_stable(max_wait=1.5)
 
     # Step 2: Swipe to top and capture
+    # (debug saves only: wait_until_stable's last frame is < 0.3s old, so the cache reuses it)
     swipe_now("gesture_targets.goto_top:more_stats")
-    time.sleep(1.5)
-    save_image(capture_adb_screenshot(), f"{session_id}_more_stats_1")
+    wait_until_stable(max_wait=1.5)
+    save_match_image(capture_adb_screenshot_cached(), f"{session_id}_more_stats_1")
 
     # Step 3: Swipe to page 2 and capture
     swipe_now("gesture_targets.goto_pg2:more_stats")
-    time.sleep(1.2)
-    save_image(capture_adb_screenshot(), f"{session_id}_more_stats_2")
+    wait_until_stable(max_wait=1.2)
+    save_match_image(capture_adb_screenshot_cached(), f"{session_id}_more_stats_2")
 
     # Step 4: Swipe to bottom and capture
     swipe_now("gesture_targets.goto_bottom:more_stats")
-    time.sleep(1.2)
-    save_image(capture_adb_screenshot(), f"{session_id}_more_stats_3")
+    wait_until_stable(max_wait=1.2)
+    save_match_image(capture_adb_screenshot_cached(), f"{session_id}_more_stats_3")
 
     # Step 5: Attempt to capture stats text (clipboard first, then OCR fallback)
     _save_stats_text(session_id)
@@ -77,7 +81,7 @@ def handle_game_over():
     if not tap_label_now("buttons.close:more_stats"):
         return _abort_handler("Close More Stats", session_id)
 
-    time.sleep(1.2)
+    wait_until_stable(max_wait=1.2)
 
     # Step 7: Decide next action based on mode
     mode = AUTOMATION.mode
@@ -143,30 +147,6 @@ def _make_session_id():
     """
     return "Game" + time.strftime("%Y%m%d_%H%M")
 
-def save_image(img, tag):
-    """
-    Persist a screenshot to the matches directory with a descriptive tag.
-
-    Args:
-        img (ndarray | None): BGR image to write (cv2). If None, skip with a warning.
-        tag (str): Filename tag (without extension).
-
-    Returns:
-        None
-
-    Side effects:
-        [fs] Ensures parent directories exist and writes a PNG file.
-        [cv2] Uses cv2.imwrite to serialize the image.
-        [log] Logs path and warns if img is None.
-    """
-    if img is None:
-        log(f"[CAPTURE] No image to save for tag '{tag}' (img=None). Skipping.", "WARN")
-        return
-    path = os.path.join("screenshots", "matches", f"{tag}.png")
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    cv2.imwrite(path, img)
-    log(f"[CAPTURE] Saved screenshot: {path}", "INFO")
-
 def _abort_handler(step, session_id):
     """
     Abort helper for the GAME OVER handler.
@@ -186,7 +166,7 @@ def _abort_handler(step, session_id):
         [state] Sets AUTOMATION.mode = ExecMode.WAIT to pause automation.
     """
     log(f"[ABORT] Game Over handler failed at: {step}", "ERROR")
-    debug_img = capture_adb_screenshot()
-    save_image(debug_img, f"{session_id}_ABORT_{step.replace(' ', '_')}")
+    debug_img = capture_adb_screenshot_cached(max_age_s=1.0)
+    save_match_image(debug_img, f"{session_id}_ABORT_{step.replace(' ', '_')}")
     AUTOMATION.mode = ExecMode.WAIT
     return
@@ -1,12 +1,10 @@
 # handlers/game_over_handler.py
 from utils.logger import log
-from core.ss_capture import capture_adb_screenshot
+from core.ss_capture import capture_adb_screenshot_cached, save_match_image
 from core.automation_state import AUTOMATION, ExecMode
 from core.clickmap_access import tap_now, swipe_now
 from core.label_tapper import tap_label_now
 import time
-import os
-import cv2
 
 def handle_game_over():
     """
@@ -56,30 +54,6 @@ def _make_session_id():
     """
     return "Game" + time.strftime("%Y%m%d_%H%M")
 
-def save_image(img, tag):
-    """
-    Persist a screenshot to the matches directory with a descriptive tag.
-
-    Args:
-        img (ndarray | None): BGR image to write (cv2). If None, skip with a warning.
-        tag (str): Filename tag (without extension).
-
-    Returns:
-        None
-
-    Side effects:
-        [fs] Ensures parent directories exist and writes a PNG file.
-        [cv2] Uses cv2.imwrite to serialize the image.
-        [log] Logs path and warns if img is None.
-    """
-    if img is None:
-        log(f"[CAPTURE] No image to save for tag '{tag}' (img=None). Skipping.", "WARN")
-        return
-    path = os.path.join("screenshots", "matches", f"{tag}.png")
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    cv2.imwrite(path, img)
-    log(f"[CAPTURE] Saved screenshot: {path}", "INFO")
-
 def _abort_handler(step, session_id):
     """
     Abort helper for the GAME OVER handler.
@@ -99,7 +73,7 @@ def _abort_handler(step, session_id):
         [state] Sets AUTOMATION.mode = ExecMode.WAIT to pause automation.
     """
     log(f"[ABORT] Game Over handler failed at: {step}", "ERROR")
-    debug_img = capture_adb_screenshot()
-    save_image(debug_img, f"{session_id}_ABORT_{step.replace(' ', '_')}")
+    debug_img = capture_adb_screenshot_cached(max_age_s=1.0)
+    save_match_image(debug_img, f"{session_id}_ABORT_{step.replace(' ', '_')}")
     AUTOMATION.mode = ExecMode.WAIT
     return
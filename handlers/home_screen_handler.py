@@ -4,6 +4,7 @@ import time
 from utils.logger import log
 from core.clickmap_access import tap_now
 from core.label_tapper import tap_label_now
+from core.ss_capture import capture_adb_screenshot_cached
 
 
 def handle_home_screen(restart_enabled=True):
@@ -12,14 +13,16 @@ def handle_home_screen(restart_enabled=True):
 
     Args:
         restart_enabled (bool, optional):
-            When True (default), taps the 'Battle' button to auto-start gameplay.
+            When True (default), taps 'Battle' (or 'Resume Battle' when Battle is not
+            visible) to auto-start gameplay.
             When False, does nothing beyond logging (awaits manual start).
 
     Returns:
         None — handler effects only.
 
     Side effects:
-        [tap] Taps the Battle button when restart_enabled=True.
+        [adb][cv2] One frame (reused from the main loop when <1s old) matched for both labels.
+        [tap] Taps Battle, falling back to Resume Battle, when restart_enabled=True.
         [log] Emits INFO logs.
         (Also sleeps ≈2s after tapping to allow UI to transition.)
 
@@ -27,14 +30,16 @@ def handle_home_screen(restart_enabled=True):
         restart_enabled=True; adds a ~2s pause after tapping when enabled.
 
     Errors:
-        None material; tap failures (if any) are not explicitly handled here.
+        None material; tap_label_now logs and returns False when neither label matches.
     """
     log("[HOME] Handling HOME_SCREEN state", "INFO")
 
     if restart_enabled:
         log("[HOME] Auto-start enabled — tapping 'Battle' button", "INFO")
-        if not tap_label_now("buttons.battle:home"):
-            tap_label_now("buttons.resume_battle:home")
+        # One frame for both candidates (the main loop's HOME_SCREEN frame when still recent)
+        screen = capture_adb_screenshot_cached(max_age_s=1.0)
+        if not tap_label_now("buttons.battle:home", screenshot=screen):
+            tap_label_now("buttons.resume_battle:home", screenshot=screen)
         time.sleep(2)
     else:
         log("[HOME] Auto-start disabled — waiting for manual start.", "INFO")
@@ -19,25 +19,42 @@ This module provides:
 3) Back-compat wrapper: `run_demon_mode(wait_seconds=75)`
    - Preserves the original API; delegates to `run_demon_mode_strategy` and returns None.
 
+4) The shared end-game step: `run_end_game_sequence(errors=None)`
+   - Menu → End Round → Yes → Retry; also used by mission_nuke and mission_demon_nuke.
+
 Notes
-- Side effects: ADB screenshots, OpenCV detection, on-device taps, file I/O for screenshots, and logging.
+- Side effects: ADB screenshots, OpenCV detection, on-device taps, file I/O for screenshots (only frames
+  of a failed tap verify / Retry match; polling and end-game frames stay in memory), and logging.
 - Error policy: normal UI/detection issues are reflected in the result; programmer errors still raise.
 """
 
 from __future__ import annotations
 
+import math
 import os
+import sys
 import time
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Callable, Dict, Any, Optional
 
-from core.ss_capture import capture_and_save_screenshot
-from core.clickmap_access import tap_now
-from core.floating_button_detector import detect_floating_buttons, tap_floating_button
+from core.ss_capture import capture_adb_screenshot, save_image_async
+from core.clickmap_access import get_click, tap_coord, batch_tap_coords
+from core.floating_button_detector import detect_floating_button_single, tap_floating_button
 from core.state_detector import detect_state_and_overlays
 from core.label_tapper import tap_label_now
-from utils.logger import log
+from utils.logger import log, log_rate_limited
+from utils.ui_wait import ChangeGate
+
+
+# Fixed-coordinate end-game labels, resolved once per end-game sequence (Retry stays a visual match)
+END_ROUND_SEQUENCE = ["overlays.end_round", "buttons.yes:end_round"]
+MENU_TOGGLE = "overlays.toggle_menu"  # resolved only when the menu is closed; absent from the stock clickmap
+VERIFY_FAIL_SCREENSHOT = "screenshots/mission_verify_failed.jpg"  # last frame of a failed tap verify
+END_GAME_FAIL_SCREENSHOT = "screenshots/mission_retry_failed.jpg"  # frame where Retry was not found
+WAIT_LOG_INTERVAL_S = 10.0  # "Waiting for ..." heartbeat instead of one DEBUG line per poll
+POLL_DETECT_SCALE = 0.5  # polling loops match at half resolution; the end-game sequence stays full-res
+COUNTDOWN_TICK_S = 5  # terminal countdown refresh; the wait itself is one sleep per tick
 
 
 # ===== Mission types =====
@@ -50,20 +67,30 @@ class MissionOutcome(Enum):
     ABORTED_BY_USER = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class MissionResult:
     outcome: MissionOutcome
     details: str = ""
     elapsed_s: float = 0.0
-    phases: Dict[str, float] = field(default_factory=dict)  # phase_name -> seconds
+    # Parallel lists (in execution order): phase_names[i] took phase_durations[i] seconds
+    phase_names: list[str] = field(default_factory=list)
+    phase_durations: list[float] = field(default_factory=list)
     errors: list[str] = field(default_factory=list)
 
+    @property
+    def phases(self) -> Dict[str, float]:
+        """phase_name -> seconds (built on demand; kept for callers of the old dict field)."""
+        return dict(zip(self.phase_names, self.phase_durations))
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class MissionConfig:
+    # Frozen: one config is shared by every round of a campaign (use dataclasses.replace to vary it)
     # Poll intervals
     poll_running_interval_s: float = 2.0
     poll_buttons_interval_s: float = 1.0
+    # Polling loops match at this fraction of full resolution; taps/verification stay full-res
+    poll_detect_scale: float = POLL_DETECT_SCALE
 
     # Post-activation wait (match legacy default 75s)
     post_demon_wait_s: float = 75.0
@@ -75,10 +102,11 @@ class MissionConfig:
 
     # Verification & retries for taps that should change UI
     verify_tap: bool = True
+    verify_delay_s: float = 0.4  # button fade-out before the single verify capture
     max_tap_retries: int = 2
 
 
-@dataclass
+@dataclass(slots=True)
 class CampaignResult:
     runs: int
     successes: int
@@ -91,6 +119,81 @@ class CampaignResult:
     progress: Dict[str, Any] | None = None
 
 
+# ===== Event callbacks =====
+
+def _noop_event(event: str, data: Dict[str, Any]) -> None:
+    return None
+
+
+def _make_emitter(on_event: Callable[[str, Dict[str, Any]], None] | None, tag: str):
+    """
+    Resolve the emit function once per call: a no-op without a callback, otherwise the
+    callback wrapped so its exceptions are logged instead of breaking the mission flow.
+    """
+    if on_event is None:
+        return _noop_event
+
+    def emit(event: str, data: Dict[str, Any]) -> None:
+        try:
+            on_event(event, data)
+        except Exception as e:
+            log(f"[{tag}] on_event error @ {event}: {e}", "WARN")
+
+    return emit
+
+
+# ===== End-game sequence (shared by every mission) =====
+
+def run_end_game_sequence(errors: list[str] | None = None) -> None:
+    """
+    Open the menu if needed, then End Round → Yes → Retry (best-effort with logging).
+
+    End Round/Yes are batched blind taps at fixed coordinates when MENU_OPEN is confirmed,
+    otherwise visual taps. Failures are WARN-logged (and appended to `errors` when given);
+    the Retry frame is written to END_GAME_FAIL_SCREENSHOT only when Retry is not found.
+
+    Side Effects
+    - [adb][cv2][fs][state][tap][log]
+    """
+    def _warn(msg: str) -> None:
+        log(f"[MISSION] {msg}", "WARN")
+        if errors is not None:
+            errors.append(msg)
+
+    clicks = {name: get_click(name) for name in END_ROUND_SEQUENCE}
+    screen = capture_adb_screenshot()
+    menu_open = "MENU_OPEN" in detect_state_and_overlays(screen).get("overlays", [])
+    if not menu_open:
+        log("[MISSION] Menu is closed — opening it", "DEBUG")
+        if tap_coord(get_click(MENU_TOGGLE), MENU_TOGGLE):
+            time.sleep(1)
+            screen = capture_adb_screenshot()
+            menu_open = "MENU_OPEN" in detect_state_and_overlays(screen).get("overlays", [])
+
+    # End Round → Yes sit at fixed coordinates: one adb call, no screenshots in between.
+    # Blind taps are only safe on a confirmed menu; otherwise they would land on live gameplay.
+    if not (menu_open and batch_tap_coords([clicks[k] for k in END_ROUND_SEQUENCE], delays_ms=1000, labels=END_ROUND_SEQUENCE)):
+        log("[MISSION] Menu not confirmed open (or batched End Round/Yes failed); falling back to visual taps", "WARN")
+        try:
+            tap_label_now("overlays.end_round", screenshot=screen)
+        except Exception as e:
+            _warn(f"Failed to tap End Round: {e}")
+        time.sleep(1)
+        try:
+            tap_label_now("buttons.yes:end_round")
+        except Exception as e:
+            _warn(f"Confirm Yes not visible: {e}")
+    time.sleep(1)
+
+    try:
+        # Retry needs one frame for its visual match; it is written to disk only when the match fails
+        screen = capture_adb_screenshot()
+        if not tap_label_now("buttons.retry:game_over", screenshot=screen) and screen is not None:
+            save_image_async(screen, END_GAME_FAIL_SCREENSHOT)
+    except Exception as e:
+        _warn(f"Retry button not visible: {e}")
+
+
 # ===== Strategy (single bounded round) =====
 
 def run_demon_mode_strategy(
@@ -116,93 +219,100 @@ def run_demon_mode_strategy(
     cfg = config or MissionConfig()
     t0 = time.monotonic()
     deadline = t0 + cfg.overall_deadline_s
-    phases: Dict[str, float] = {}
+    phase_names: list[str] = []
+    phase_durations: list[float] = []
     errors: list[str] = []
 
-    def emit(event: str, data: Dict[str, Any]):
-        if on_event:
-            try:
-                on_event(event, data)
-            except Exception as e:
-                # Don’t let callbacks break mission flow
-                log(f"[MISSION] on_event error @ {event}: {e}", "WARN")
+    emit = _make_emitter(on_event, "MISSION")
 
     def _now() -> float:
         return time.monotonic()
 
-    def _before_deadline() -> bool:
-        return _now() < deadline
+    def _sleep_until(end_by: float, interval: float) -> None:
+        # Never sleep past end_by: the loop condition then fails without one more capture
+        time.sleep(max(0.0, min(interval, end_by - _now())))
 
     def _phase(name: str, fn: Callable[[], MissionOutcome | None]) -> MissionOutcome | None:
+        phase_names.append(name)
         p0 = _now()
         try:
             emit("PHASE_START", {"name": name})
             return fn()
         finally:
-            phases[name] = _now() - p0
-            emit("PHASE_END", {"name": name, "duration_s": phases[name]})
+            duration = _now() - p0
+            phase_durations.append(duration)
+            emit("PHASE_END", {"name": name, "duration_s": duration})
+
+    running_screen = None  # frame that showed RUNNING; reused as the first button poll
 
     def _wait_for_state_running() -> MissionOutcome | None:
-        end_by = _now() + cfg.timeout_running_s
-        while _now() < end_by and _before_deadline():
+        nonlocal running_screen
+        end_by = min(_now() + cfg.timeout_running_s, deadline)  # phase timeout, capped by the round deadline
+        gate = ChangeGate()
+        while _now() < end_by:
             if dry_run:
                 return None
-            screen = capture_and_save_screenshot()
-            result = detect_state_and_overlays(screen)
-            if result.get("state") == "RUNNING":
-                log("[MISSION] Game is in RUNNING state", "INFO")
-                return None
-            log("[MISSION] Waiting for RUNNING state...", "DEBUG")
-            time.sleep(cfg.poll_running_interval_s)
+            screen = capture_adb_screenshot()  # poll frames stay in memory
+            # Full detection only when the frame moved since the last detected one
+            if gate.changed(screen):
+                result = detect_state_and_overlays(screen, scale=cfg.poll_detect_scale)
+                if result.get("state") == "RUNNING":
+                    log("[MISSION] Game is in RUNNING state", "INFO")
+                    running_screen = screen
+                    return None
+            log_rate_limited("mission_wait_running", "[MISSION] Waiting for RUNNING state...", "DEBUG", WAIT_LOG_INTERVAL_S)
+            _sleep_until(end_by, cfg.poll_running_interval_s)
         return MissionOutcome.TIMEOUT_WAITING_FOR_RUNNING
 
-    def _tap_floating_button_with_verify(button_key: str) -> bool:
+    def _tap_floating_button_with_verify(button_key: str, buttons: list) -> bool:
         """
-        Tap a floating button (already detected via polling) and verify it no longer appears,
-        retrying up to cfg.max_tap_retries. Returns True on verified success (or dry_run).
+        Tap a floating button the caller just detected (its `buttons`), wait verify_delay_s, and
+        check one fresh frame that it no longer appears. A failed check re-taps from that same
+        frame, up to cfg.max_tap_retries. Returns True on verified success (or dry_run).
         """
+        if dry_run:
+            return True
         attempts = 0
         while True:
             attempts += 1
-            if not dry_run:
-                screen = capture_and_save_screenshot()
-                buttons = detect_floating_buttons(screen)
-                if any(b["name"] == button_key for b in buttons):
-                    tap_floating_button(button_key, buttons)
-                else:
-                    if not cfg.verify_tap:
-                        return True
-
-            if not cfg.verify_tap or dry_run:
+            tap_floating_button(button_key, buttons)
+            if not cfg.verify_tap:
                 return True
 
-            # Verify disappearance (or state change) by re-detecting
-            screen = capture_and_save_screenshot()
-            buttons = detect_floating_buttons(screen)
-            gone = not any(b["name"] == button_key for b in buttons)
-            if gone:
+            # Verify disappearance (or state change) on one delayed frame; persisted only if verification fails
+            time.sleep(cfg.verify_delay_s)
+            screen = capture_adb_screenshot()
+            buttons = detect_floating_button_single(screen, button_key)
+            if not any(b["name"] == button_key for b in buttons):
                 return True
             if attempts > cfg.max_tap_retries:
+                if screen is not None:
+                    save_image_async(screen, VERIFY_FAIL_SCREENSHOT)
                 return False
             log(f"[MISSION] '{button_key}' still visible — retrying tap ({attempts}/{cfg.max_tap_retries})", "WARN")
-            time.sleep(cfg.poll_buttons_interval_s)
 
-    def _wait_for_and_tap(button_key: str, timeout_s: float) -> MissionOutcome | None:
-        end_by = _now() + timeout_s
-        while _now() < end_by and _before_deadline():
+    def _wait_for_and_tap(button_key: str, timeout_s: float, initial_screen=None) -> MissionOutcome | None:
+        end_by = min(_now() + timeout_s, deadline)  # phase timeout, capped by the round deadline
+        gate = ChangeGate()
+        screen = initial_screen  # a frame the previous phase captured just now (saves one capture)
+        while _now() < end_by:
             if dry_run:
                 return None
-            screen = capture_and_save_screenshot()
-            buttons = detect_floating_buttons(screen)
-            if any(b["name"] == button_key for b in buttons):
-                log(f"[MISSION] {button_key.split('.')[-1].title()} button detected!", "INFO")
-                ok = _tap_floating_button_with_verify(button_key)
-                if not ok:
-                    errors.append(f"Verify failed for {button_key}")
-                    return MissionOutcome.UI_FLOW_FAILURE
-                return None
-            log(f"[MISSION] Waiting for {button_key}...", "DEBUG")
-            time.sleep(cfg.poll_buttons_interval_s)
+            if screen is None:
+                screen = capture_adb_screenshot()  # poll frames stay in memory
+            # Skip template matching while the frame looks like the last one checked
+            if gate.changed(screen):
+                buttons = detect_floating_button_single(screen, button_key, scale=cfg.poll_detect_scale)
+                if any(b["name"] == button_key for b in buttons):
+                    log(f"[MISSION] {button_key.split('.')[-1].title()} button detected!", "INFO")
+                    ok = _tap_floating_button_with_verify(button_key, buttons)
+                    if not ok:
+                        errors.append(f"Verify failed for {button_key}")
+                        return MissionOutcome.UI_FLOW_FAILURE
+                    return None
+            log_rate_limited(f"mission_wait_{button_key}", f"[MISSION] Waiting for {button_key}...", "DEBUG", WAIT_LOG_INTERVAL_S)
+            _sleep_until(end_by, cfg.poll_buttons_interval_s)
+            screen = None
         return MissionOutcome.TIMEOUT_WAITING_FOR_DEMON
 
     try:
@@ -215,30 +325,39 @@ def run_demon_mode_strategy(
                 outcome=outcome,
                 details="RUNNING state not reached within timeout",
                 elapsed_s=time.monotonic() - t0,
-                phases=phases,
+                phase_names=phase_names,
+                phase_durations=phase_durations,
                 errors=errors,
             )
 
         # Phase: WAIT_TAP_DEMON
-        outcome = _phase("WAIT_TAP_DEMON", lambda: _wait_for_and_tap("floating_buttons.demon_mode", cfg.timeout_demon_s))
+        outcome = _phase("WAIT_TAP_DEMON", lambda: _wait_for_and_tap("floating_buttons.demon_mode", cfg.timeout_demon_s, running_screen))
         if outcome:
             return MissionResult(
                 outcome=outcome,
                 details="Demon Mode button not available (or verify failed)",
                 elapsed_s=time.monotonic() - t0,
-                phases=phases,
+                phase_names=phase_names,
+                phase_durations=phase_durations,
                 errors=errors,
             )
 
-        # Phase: POST_DEMON_WAIT (preserve legacy countdown print)
+        # Phase: POST_DEMON_WAIT (countdown only on a terminal, ticking every COUNTDOWN_TICK_S)
         def _post_demon() -> MissionOutcome | None:
-            wait_seconds = int(cfg.post_demon_wait_s)
-            log(f"[MISSION] Demon Mode activated. Waiting {wait_seconds}s...", "INFO")
-            if not dry_run:
-                for remaining in range(wait_seconds, 0, -1):
-                    print(f"\r[WAIT] {remaining} seconds remaining...", end="", flush=True)
-                    time.sleep(1)
-                print("\r[WAIT] Done.                                                  ")
+            wait_s = cfg.post_demon_wait_s
+            log(f"[MISSION] Demon Mode activated. Waiting {int(wait_s)}s...", "INFO")
+            if dry_run:
+                return None
+            if not sys.stdout.isatty():
+                time.sleep(wait_s)
+                return None
+            end_by = _now() + wait_s
+            remaining = wait_s
+            while remaining > 0:
+                print(f"\r[WAIT] {math.ceil(remaining)} seconds remaining...", end="", flush=True)
+                time.sleep(min(COUNTDOWN_TICK_S, remaining))
+                remaining = end_by - _now()
+            print("\r[WAIT] Done.                                                  ")
             return None
 
         _phase("POST_DEMON_WAIT", _post_demon)
@@ -247,39 +366,7 @@ def run_demon_mode_strategy(
         def _end_game() -> MissionOutcome | None:
             if dry_run:
                 return None
-
-            screen = capture_and_save_screenshot()
-            result = detect_state_and_overlays(screen)
-            if "MENU_OPEN" not in result.get("overlays", []):
-                log("[MISSION] Menu is closed — opening it", "DEBUG")
-                tap_now("overlays.toggle_menu")
-                time.sleep(1)
-
-            try:
-                tap_label_now("overlays.end_round")
-            except Exception as e:
-                msg = f"Failed to tap End Round: {e}"
-                log(f"[MISSION] {msg}", "WARN")
-                errors.append(msg)
-            time.sleep(1)
-
-            try:
-                screen = capture_and_save_screenshot()
-                tap_label_now("buttons.yes:end_round")
-            except Exception as e:
-                msg = f"Confirm Yes not visible: {e}"
-                log(f"[MISSION] {msg}", "WARN")
-                errors.append(msg)
-            time.sleep(1)
-
-            try:
-                screen = capture_and_save_screenshot()
-                tap_label_now("buttons.retry:game_over")
-            except Exception as e:
-                msg = f"Retry button not visible: {e}"
-                log(f"[MISSION] {msg}", "WARN")
-                errors.append(msg)
-
+            run_end_game_sequence(errors)
             return None
 
         _phase("END_GAME_SEQUENCE", _end_game)
@@ -289,7 +376,8 @@ def run_demon_mode_strategy(
             outcome=MissionOutcome.SUCCESS,
             details="Round completed",
             elapsed_s=time.monotonic() - t0,
-            phases=phases,
+            phase_names=phase_names,
+            phase_durations=phase_durations,
             errors=errors,
         )
 
@@ -299,7 +387,8 @@ def run_demon_mode_strategy(
             outcome=MissionOutcome.ABORTED_BY_USER,
             details="User interrupted",
             elapsed_s=time.monotonic() - t0,
-            phases=phases,
+            phase_names=phase_names,
+            phase_durations=phase_durations,
             errors=errors,
         )
 
@@ -341,12 +430,7 @@ def run_demon_mode_campaign(
     last_result: Optional[MissionResult] = None
     last_progress: Dict[str, Any] | None = None
 
-    def emit(event: str, data: Dict[str, Any]):
-        if on_event:
-            try:
-                on_event(event, data)
-            except Exception as e:
-                log(f"[CAMPAIGN] on_event error @ {event}: {e}", "WARN")
+    emit = _make_emitter(on_event, "CAMPAIGN")
 
     try:
         emit("CAMPAIGN_START", {"max_runs": max_runs, "max_duration_s": max_duration_s})
@@ -386,7 +470,7 @@ def run_demon_mode_campaign(
             # Optional progress detection + termination predicate
             if progress_detector:
                 try:
-                    screen = None if dry_run else capture_and_save_screenshot()
+                    screen = None if dry_run else capture_adb_screenshot()  # in memory; nothing reads it from disk
                     last_progress = progress_detector(screen)
                     emit("PROGRESS", {"round_index": runs, "progress": last_progress})
                     if until and until(last_progress):
@@ -12,17 +12,17 @@ This module runs a mission sequence intended for testing or scripted play:
 
 Notes
 - Blocking loops: waits poll the screen until conditions are met; there are no timeouts.
-- Side effects: ADB screenshots, OpenCV detection, on-device taps, and logging.
+- Side effects: ADB screenshots (kept in memory; saved only when Retry is not found), OpenCV detection, on-device taps, and logging.
 - Errors: Tap attempts inside the end-game sequence are guarded; failures are logged and the flow continues.
 """
 
 import time
-from core.ss_capture import capture_and_save_screenshot
-from core.clickmap_access import tap_now
-from core.floating_button_detector import detect_floating_buttons, tap_floating_button
+from core.ss_capture import capture_adb_screenshot
+from core.floating_button_detector import detect_floating_button_single, tap_floating_button
 from core.state_detector import detect_state_and_overlays
-from core.label_tapper import tap_label_now
-from utils.logger import log
+from utils.logger import log, log_rate_limited
+from utils.ui_wait import ChangeGate
+from handlers.mission_demon_mode import POLL_DETECT_SCALE, WAIT_LOG_INTERVAL_S, run_end_game_sequence
 
 
 def run_demon_nuke_strategy():
@@ -44,39 +44,47 @@ def run_demon_nuke_strategy():
     log("[MISSION] Starting Demon Mode -> Nuke -> Restart mission", "ACTION")
 
     # Step 1: Wait for RUNNING state
+    gate = ChangeGate()
     while True:
-        screen = capture_and_save_screenshot()
-        result = detect_state_and_overlays(screen)
-        if result["state"] == "RUNNING":
+        screen = capture_adb_screenshot()  # poll frames stay in memory
+        if gate.changed(screen) and detect_state_and_overlays(screen, scale=POLL_DETECT_SCALE)["state"] == "RUNNING":
             log("[MISSION] Game is in RUNNING state", "INFO")
             break
-        log("[MISSION] Waiting for RUNNING state...", "DEBUG")
+        log_rate_limited("mission_wait_running", "[MISSION] Waiting for RUNNING state...", "DEBUG", WAIT_LOG_INTERVAL_S)
         time.sleep(2)
 
-    # Step 2: Wait for demon_mode button
+    # Step 2: Wait for demon_mode button (first check reuses the RUNNING frame from step 1)
+    gate = ChangeGate()
     while True:
-        screen = capture_and_save_screenshot()
-        buttons = detect_floating_buttons(screen)
-        if any(b["name"] == "floating_buttons.demon_mode" for b in buttons):
-            log("[MISSION] Demon Mode button detected!", "INFO")
-            tap_floating_button("floating_buttons.demon_mode", buttons)
-            break
-        log("[MISSION] Waiting for Demon Mode button...", "DEBUG")
+        if screen is None:
+            screen = capture_adb_screenshot()  # poll frames stay in memory
+        # Skip template matching while the frame looks like the last one checked
+        if gate.changed(screen):
+            buttons = detect_floating_button_single(screen, "floating_buttons.demon_mode", scale=POLL_DETECT_SCALE)
+            if buttons:  # single-template match: non-empty means this button
+                log("[MISSION] Demon Mode button detected!", "INFO")
+                tap_floating_button("floating_buttons.demon_mode", buttons)
+                break
+        log_rate_limited("mission_wait_demon", "[MISSION] Waiting for Demon Mode button...", "DEBUG", WAIT_LOG_INTERVAL_S)
         time.sleep(1)
+        screen = None
 
     # Step 3: Wait ~10 seconds
     log("[MISSION] Demon Mode activated. Waiting 10s...", "INFO")
     time.sleep(10)
 
     # Step 4: Wait for Nuke button
+    gate = ChangeGate()
     while True:
-        screen = capture_and_save_screenshot()
-        buttons = detect_floating_buttons(screen)
-        if any(b["name"] == "floating_buttons.nuke" for b in buttons):
-            log("[MISSION] Nuke button detected!", "INFO")
-            tap_floating_button("floating_buttons.nuke", buttons)
-            break
-        log("[MISSION] Waiting for Nuke button...", "DEBUG")
+        screen = capture_adb_screenshot()  # poll frames stay in memory
+        # Skip template matching while the frame looks like the last one checked
+        if gate.changed(screen):
+            buttons = detect_floating_button_single(screen, "floating_buttons.nuke", scale=POLL_DETECT_SCALE)
+            if buttons:  # single-template match: non-empty means this button
+                log("[MISSION] Nuke button detected!", "INFO")
+                tap_floating_button("floating_buttons.nuke", buttons)
+                break
+        log_rate_limited("mission_wait_nuke", "[MISSION] Waiting for Nuke button...", "DEBUG", WAIT_LOG_INTERVAL_S)
         time.sleep(1)
 
     # Step 5: Wait a bit more
@@ -84,30 +92,6 @@ def run_demon_nuke_strategy():
     time.sleep(5)
 
     # Step 6: End game sequence
-    screen = capture_and_save_screenshot()
-    result = detect_state_and_overlays(screen)
-    if "MENU_OPEN" not in result["overlays"]:
-        log("[MISSION] Menu is closed — opening it", "DEBUG")
-        tap_now("overlays.toggle_menu")
-        time.sleep(1)
-
-    try:
-        tap_label_now("overlays.end_round")
-    except Exception as e:
-        log(f"[MISSION] Failed to tap End Round: {e}", "WARN")
-    time.sleep(1)
-
-    try:
-        screen = capture_and_save_screenshot()
-        tap_label_now("buttons.yes:end_round")
-    except Exception as e:
-        log(f"[MISSION] Confirm Yes not visible: {e}", "WARN")
-    time.sleep(1)
-
-    try:
-        screen = capture_and_save_screenshot()
-        tap_label_now("buttons.retry:game_over")
-    except Exception as e:
-        log(f"[MISSION] Retry button not visible: {e}", "WARN")
+    run_end_game_sequence()
 
     log("[MISSION] Demon-Nuke strategy complete", "SUCCESS")
@@ -11,18 +11,23 @@ This module runs a mission sequence intended for testing or scripted play:
 5) Open the menu if needed, tap End Round, confirm, and tap Retry.
 
 Notes
-- Blocking loops: waits poll the screen until conditions are met; there are no timeouts.
-- Side effects: ADB screenshots, OpenCV detection, on-device taps, and logging.
+- Blocking loops: waits consume frames from the background CaptureThread until conditions are met;
+  there are no timeouts. The producer runs only while a poll is active (not during the fixed waits).
+- Side effects: ADB screenshots (kept in memory; saved only when Retry is not found), OpenCV detection, on-device taps, and logging.
 - Errors: Tap attempts inside the end-game sequence are guarded; failures are logged and the flow continues.
 """
 
 import time
-from core.ss_capture import capture_and_save_screenshot
-from core.clickmap_access import tap_now
-from core.floating_button_detector import detect_floating_buttons, tap_floating_button
-from core.state_detector import detect_state_and_overlays
-from core.label_tapper import tap_label_now
-from utils.logger import log
+from core.capture_thread import start_capture_thread, stop_capture_thread, latest_screenshot
+from core.floating_button_detector import detect_floating_button_single, tap_floating_button
+from core.state_detector import matches_state
+from utils.logger import log, log_rate_limited
+from utils.ui_wait import ChangeGate
+from handlers.mission_demon_mode import POLL_DETECT_SCALE, WAIT_LOG_INTERVAL_S, run_end_game_sequence
+
+POLL_RUNNING_BACKOFF_S = (2.0, 3.0, 5.0, 10.0)  # RUNNING-wait capture cadence; steps up while the screen is static
+POLL_BUTTON_INTERVAL_S = 1.0   # capture cadence while waiting for the Nuke button
+CAPTURE_TIMEOUT_S = 15.0       # give up waiting for a frame (adb hang) and wait again
 
 
 def run_nuke_strategy():
@@ -30,9 +35,8 @@ def run_nuke_strategy():
     Run the Demon-Mode-then-Nuke mission sequence and attempt an immediate restart.
 
     Flow
-    - Poll for RUNNING state (2s interval).
-    - Poll for Demon Mode button, tap it (1s interval), then wait 10s.
-    - Poll for Nuke button, tap it (1s interval), then wait 5s.
+    - Consume background frames until RUNNING (2s capture cadence, backing off to 10s on a static screen), then wait 20s.
+    - Consume background frames until the Nuke button shows, tap it (1s cadence), then wait 5s.
     - Ensure menu is open, tap End Round, confirm Yes, then tap Retry.
 
     Returns
@@ -43,58 +47,53 @@ def run_nuke_strategy():
     """
     log("[MISSION] Starting Nuke -> Restart mission", "ACTION")
 
-    # Step 1: Wait for RUNNING state
-    while True:
-        screen = capture_and_save_screenshot()
-        result = detect_state_and_overlays(screen)
-        if result["state"] == "RUNNING":
-            log("[MISSION] Game is in RUNNING state", "INFO")
-            break
-        log("[MISSION] Waiting for RUNNING state...", "DEBUG")
-        time.sleep(2)
+    # Step 1: Wait for RUNNING state (acts as soon as the producer publishes a frame).
+    # Only the RUNNING rule is matched, and only on visually changed frames (plus the gate's periodic
+    # re-check, so one missed match cannot stall the wait); while the screen stays static the capture
+    # cadence backs off, and any real change snaps it back to the fastest step.
+    gate = ChangeGate()
+    backoff = 0
+    producer = start_capture_thread(interval=POLL_RUNNING_BACKOFF_S[0])
+    try:
+        while True:
+            screen = latest_screenshot(timeout=CAPTURE_TIMEOUT_S)  # poll frames stay in memory
+            if gate.changed(screen):
+                if screen is not None and matches_state(screen, "RUNNING", scale=POLL_DETECT_SCALE):
+                    log("[MISSION] Game is in RUNNING state", "INFO")
+                    break
+                if not gate.timed_out:
+                    backoff = 0
+            else:
+                backoff = min(backoff + 1, len(POLL_RUNNING_BACKOFF_S) - 1)
+            producer.set_interval(POLL_RUNNING_BACKOFF_S[backoff])
+            log_rate_limited("mission_wait_running", "[MISSION] Waiting for RUNNING state...", "DEBUG", WAIT_LOG_INTERVAL_S)
+    finally:
+        stop_capture_thread()
 
     time.sleep(20)
 
     # Step 4: Wait for Nuke button
-    while True:
-        screen = capture_and_save_screenshot()
-        buttons = detect_floating_buttons(screen)
-        if any(b["name"] == "floating_buttons.nuke" for b in buttons):
-            log("[MISSION] Nuke button detected!", "INFO")
-            tap_floating_button("floating_buttons.nuke", buttons)
-            break
-        log("[MISSION] Waiting for Nuke button...", "DEBUG")
-        time.sleep(1)
+    gate = ChangeGate()
+    start_capture_thread(interval=POLL_BUTTON_INTERVAL_S)
+    try:
+        while True:
+            screen = latest_screenshot(timeout=CAPTURE_TIMEOUT_S)  # poll frames stay in memory
+            # Skip template matching while the frame looks like the last one checked
+            if gate.changed(screen):
+                buttons = detect_floating_button_single(screen, "floating_buttons.nuke", scale=POLL_DETECT_SCALE)
+                if buttons:  # single-template match: non-empty means this button
+                    log("[MISSION] Nuke button detected!", "INFO")
+                    tap_floating_button("floating_buttons.nuke", buttons)
+                    break
+            log_rate_limited("mission_wait_nuke", "[MISSION] Waiting for Nuke button...", "DEBUG", WAIT_LOG_INTERVAL_S)
+    finally:
+        stop_capture_thread()
 
     # Step 5: Wait a bit more
     log("[MISSION] Nuke launched. Waiting 5s before restart...", "INFO")
     time.sleep(5)
 
     # Step 6: End game sequence
-    screen = capture_and_save_screenshot()
-    result = detect_state_and_overlays(screen)
-    if "MENU_OPEN" not in result["overlays"]:
-        log("[MISSION] Menu is closed — opening it", "DEBUG")
-        tap_now("overlays.toggle_menu")
-        time.sleep(1)
-
-    try:
-        tap_label_now("overlays.end_round")
-    except Exception as e:
-        log(f"[MISSION] Failed to tap End Round: {e}", "WARN")
-    time.sleep(1)
-
-    try:
-        screen = capture_and_save_screenshot()
-        tap_label_now("buttons.yes:end_round")
-    except Exception as e:
-        log(f"[MISSION] Confirm Yes not visible: {e}", "WARN")
-    time.sleep(1)
-
-    try:
-        screen = capture_and_save_screenshot()
-        tap_label_now("buttons.retry:game_over")
-    except Exception as e:
-        log(f"[MISSION] Retry button not visible: {e}", "WARN")
+    run_end_game_sequence()
 
     log("[MISSION] Demon-Nuke strategy complete", "SUCCESS")
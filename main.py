@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 # main.py
 
+import functools
+import importlib
+import signal
+import sys
 import threading
 import time
 from datetime import datetime
@@ -9,19 +13,25 @@ import cv2
 import argparse
 
 from core.watchdog import watchdog_process_check
-from core.ss_capture import capture_and_save_screenshot
+from core.capture_thread import start_capture_thread, stop_capture_thread, latest_screenshot, interrupt_capture_wait
+from core.ss_capture import save_image_async
 from core.automation_state import AUTOMATION
 from core.state_detector import detect_state_and_overlays
 from handlers.game_over_handler import handle_game_over
 from handlers.home_screen_handler import handle_home_screen
-from handlers.ad_gem_handler import handle_ad_gem, stop_blind_gem_tapper
-from handlers.daily_gem_handler import handle_daily_gem
 from utils.logger import log
-from utils.wave_detector import detect_wave_number_from_image, set_wave_hint  # use detect_* for conf + debug
-from utils.coin_detector import get_coins_from_image, format_compact_decimal
-from core.clickmap_access import get_clickmap, resolve_dot_path
+from utils.csv_appender import CsvAppender
+from core.clickmap_access import resolve_dot_path, clickmap_generation
 
-SCREENSHOT_PATH = "screenshots/latest.png"
+SCREENSHOT_PATH = "screenshots/latest.jpg"
+CAPTURE_TIMEOUT_S = 15.0   # give up waiting for a frame (adb hang) and retry
+LOOP_INTERVAL_S = 5.0      # pause between iterations unless woken early
+CAPTURE_INTERVAL_S = None  # capture only when the loop asks: each frame starts after the pause (and any handler)
+CAPTURE_RETRY_S = 2.0      # back-off after a failed capture
+COINS_LOG_HEADER = "time_iso,epoch,wave,coins_decimal,conf,pretty"
+
+SHUTDOWN = threading.Event()  # set by the first Ctrl+C: finish the current step, then exit
+WAKE = threading.Event()      # set to cut the inter-iteration pause short (e.g., watchdog restarted the game)
 
 parser = argparse.ArgumentParser()
 parser.add_argument("--no-restart", action="store_true", help="Disable auto restart on home screen")
@@ -33,40 +43,78 @@ parser.add_argument("--save-wave-samples", default=None,
                     help="Directory to save per-status wave samples: raw frame (and bin winner). Filename encodes wave.")
 parser.add_argument("--coins-log", default=None,
                     help="Optional CSV to append coins/min samples: time_iso,epoch,wave,coins_decimal,conf,pretty")
+parser.add_argument("--no-save-latest", action="store_true",
+                    help=f"Keep frames in memory only (skip the {SCREENSHOT_PATH} debug preview write)")
 args = parser.parse_args()
+
+# Gem handlers and the OCR stack (wave/coin detectors → pytesseract) load on first use:
+# runs that never see those overlays or use --status-interval 0 don't pay for them.
+_lazy_attrs = {}
+
+
+def _lazy(module: str, attr: str):
+    fn = _lazy_attrs.get((module, attr))
+    if fn is None:
+        fn = _lazy_attrs[(module, attr)] = getattr(importlib.import_module(module), attr)
+    return fn
+
+
 AUTO_START_ENABLED = not args.no_restart
 STATUS_INTERVAL = max(0, args.status_interval)
 log(f"AUTO_START_ENABLED = {AUTO_START_ENABLED}", "DEBUG")
 
 # If requested, clear the wave hint so new runs start fresh (monotonic scorer won't reject small values)
 if args.reset_wave_hint:
-    set_wave_hint(None)
+    _lazy("utils.wave_detector", "set_wave_hint")(None)
     log("[WAVE] Reset wave hint at startup", "DEBUG")
 
 
+@functools.lru_cache(maxsize=1)
+def _wave_number_region(generation: int):
+    # Resolved once; `generation` (clickmap_generation()) re-resolves only after a clickmap edit
+    entry = resolve_dot_path("_shared_match_regions.wave_number") or {}
+    return entry.get("match_region") if isinstance(entry, dict) else None
+
+
+def _request_shutdown(signum, frame):
+    # First Ctrl+C exits at the next wait point; a second one raises KeyboardInterrupt immediately
+    log("Shutdown requested — exiting after the current step (Ctrl+C again to force).", "INFO")
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    SHUTDOWN.set()
+    WAKE.set()
+    interrupt_capture_wait()  # don't sit out CAPTURE_TIMEOUT_S in latest_screenshot()
+
+
 def main():
     log("Starting main heartbeat loop.", level="INFO")
-    threading.Thread(target=watchdog_process_check, daemon=True).start()
+    signal.signal(signal.SIGINT, _request_shutdown)
+    threading.Thread(target=watchdog_process_check, kwargs={"on_recover": WAKE.set}, daemon=True).start()
+    start_capture_thread(interval=CAPTURE_INTERVAL_S, save_path=None if args.no_save_latest else SCREENSHOT_PATH)
 
     last_ui_state = None
-    last_secondary_states = None  # set[str] (non-menu only)
+    last_secondary_states = None  # frozenset[str] (non-menu only)
     last_menu = None              # str|None (mutually exclusive)
-    last_overlays = None          # set[str]
+    last_overlays = None          # frozenset[str]
     last_status_ts = 0.0
+    # Opened once; rows are written and flushed by a background thread
+    coins_log = CsvAppender(args.coins_log, COINS_LOG_HEADER) if args.coins_log else None
     try:
-        while True:
-            img = capture_and_save_screenshot(log_capture=False)
+        while not SHUTDOWN.is_set():
+            # Never act on a frame captured before this point (e.g., while a handler was still tapping)
+            img = latest_screenshot(timeout=CAPTURE_TIMEOUT_S, since=time.monotonic())
             if img is None:
+                if SHUTDOWN.is_set():
+                    break
                 log("Failed to capture screenshot.", level="FAIL")
-                time.sleep(2)
+                SHUTDOWN.wait(CAPTURE_RETRY_S)
                 continue
 
             # Detect current state from image
             detection = detect_state_and_overlays(img, log_matches=args.match_trace)
             new_state = detection["state"]           # e.g., "GAME_OVER", "HOME_SCREEN"
             menu = detection.get("menu") or None     # 'ATTACK_MENU', etc., or None
-            secondary = set(detection.get("secondary_states") or [])  # already excludes menu
-            overlays = set(detection.get("overlays") or [])
+            secondary = frozenset(detection.get("secondary_states") or ())  # already excludes menu
+            overlays = frozenset(detection.get("overlays") or ())
 
             # Primary state change
             if new_state != last_ui_state:
@@ -87,7 +135,7 @@ def main():
             if last_secondary_states is None:
                 if secondary:
                     log(f"Secondary states now: {sorted(secondary)}", "MATCH")
-            else:
+            elif secondary != last_secondary_states:  # steady state: no diff/sort work
                 sec_added = sorted(secondary - last_secondary_states)
                 sec_removed = sorted(last_secondary_states - secondary)
                 if sec_added:
@@ -100,7 +148,7 @@ def main():
             if last_overlays is None:
                 if overlays:
                     log(f"Overlays now: {sorted(overlays)}", "MATCH")
-            else:
+            elif overlays != last_overlays:
                 added = sorted(overlays - last_overlays)
                 removed = sorted(last_overlays - overlays)
                 if added:
@@ -123,14 +171,15 @@ def main():
                         os.makedirs(args.save_wave_samples, exist_ok=True)
                         # debug_out path finalized after wave_str; use a temp first
                         debug_out = os.path.join(args.save_wave_samples, "_tmp_bin.png")
-                    wave, wave_conf = detect_wave_number_from_image(img, debug_out=debug_out)
+                    # use detect_* for conf + debug
+                    wave, wave_conf = _lazy("utils.wave_detector", "detect_wave_number_from_image")(img, debug_out=debug_out)
                     # Coins/min OCR
                     try:
-                        coins_val, coins_conf = get_coins_from_image(img)
+                        coins_val, coins_conf = _lazy("utils.coin_detector", "get_coins_from_image")(img)
                     except Exception:
                         coins_val, coins_conf = None, -1.0
                 wave_str = str(wave) if wave is not None else "—"
-                coins_str = format_compact_decimal(coins_val) if coins_val is not None else "—"
+                coins_str = _lazy("utils.coin_detector", "format_compact_decimal")(coins_val) if coins_val is not None else "—"
                 menu_str = menu or "—"
                 sec_str = ", ".join(sorted(secondary)) if secondary else "—"
                 ovl_str = ", ".join(sorted(overlays)) if overlays else "—"
@@ -141,35 +190,25 @@ def main():
                     base = f"{ts}_wave-{wave_str}"
                     img_path = os.path.join(args.save_wave_samples, base + ".png")
                     note_path = os.path.join(args.save_wave_samples, base + ".txt")
-                    cv2.imwrite(img_path, img)
+                    save_image_async(img, img_path)  # lossless PNG; encoded off the main loop
                     try:
                         with open(note_path, "w", encoding="utf-8") as f:
                             f.write(f"state={new_state}\nmenu={menu_str}\nsecondary={sec_str}\noverlays={ovl_str}\nwave={wave_str}\nconf={wave_conf:.1f}\ncoins={coins_str}\ncoins_conf={coins_conf:.1f}\n")
                     except Exception:
                         pass
                 # Append coins sample for graphing
-                if args.coins_log:
-                    try:
-                        os.makedirs(os.path.dirname(args.coins_log) or '.', exist_ok=True)
-                        ts_iso = datetime.now().isoformat(timespec='seconds')
-                        epoch = int(now)
-                        with open(args.coins_log, 'a', encoding='utf-8') as f:
-                            if f.tell() == 0:
-                                f.write("time_iso,epoch,wave,coins_decimal,conf,pretty\n")
-                            coins_decimal = str(coins_val) if coins_val is not None else ""
-                            f.write(f"{ts_iso},{epoch},{wave_str},{coins_decimal},{coins_conf:.1f},{coins_str}\n")
-                    except Exception:
-                        pass
+                if coins_log is not None:
+                    ts_iso = datetime.now().isoformat(timespec='seconds')
+                    coins_decimal = str(coins_val) if coins_val is not None else ""
+                    coins_log.append(f"{ts_iso},{int(now)},{wave_str},{coins_decimal},{coins_conf:.1f},{coins_str}")
                     # Save ROI overlay for the wave-number region (red box)
                     try:
                         overlay = img.copy()
-                        cm = get_clickmap()
-                        entry = resolve_dot_path("_shared_match_regions.wave_number", cm) or {}
-                        mr = entry.get("match_region") if isinstance(entry, dict) else None
+                        mr = _wave_number_region(clickmap_generation())
                         if mr:
                             x, y, w, h = int(mr.get("x",0)), int(mr.get("y",0)), int(mr.get("w",0)), int(mr.get("h",0))
                             cv2.rectangle(overlay, (x,y), (x+w, y+h), (0,0,255), 2)
-                        cv2.imwrite(os.path.join(args.save_wave_samples, base + "_overlay.png"), overlay)
+                        save_image_async(overlay, os.path.join(args.save_wave_samples, base + "_overlay.png"))
                     except Exception:
                         pass
                     # If we wrote a temp bin image above, rename it to align with this sample
@@ -187,15 +226,20 @@ def main():
                 handle_home_screen(restart_enabled=AUTO_START_ENABLED)
 
             if "AD_GEMS_AVAILABLE" in overlays:
-                handle_ad_gem()
+                _lazy("handlers.ad_gem_handler", "handle_ad_gem")()
             if "DAILY_GEMS_AVAILABLE" in overlays:
-                handle_daily_gem()
+                _lazy("handlers.daily_gem_handler", "handle_daily_gem")()
 
-            time.sleep(5)  # Ctrl+C interrupts here immediately
+            if WAKE.wait(LOOP_INTERVAL_S):  # returns early on shutdown or watchdog recovery
+                WAKE.clear()
     except KeyboardInterrupt:
         log("KeyboardInterrupt — shutting down.", "INFO")
     finally:
-        stop_blind_gem_tapper()
+        stop_capture_thread()
+        if coins_log is not None:
+            coins_log.close()
+        if "handlers.ad_gem_handler" in sys.modules:  # nothing to stop if it was never loaded
+            _lazy("handlers.ad_gem_handler", "stop_blind_gem_tapper")()
         log("Exited cleanly.", "INFO")
 
 
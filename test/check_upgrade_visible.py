@@ -5,7 +5,8 @@ CLI tool: Check if an upgrade label is currently visible on screen.
 Behavior:
 - Optionally refresh screenshot.
 - Verify the expected menu indicator is present (attack/defense/utility).
-- Attempt to match the upgrade label within its visible region (left/right).
+- Attempt to match the upgrade label within its visible region (left/right);
+  skipped when the menu indicator is absent unless --force-match is given.
 
 Usage examples:
 - python3 test/check_upgrade_visible.py --key upgrades.attack.left.damage
@@ -19,11 +20,11 @@ import argparse
 import sys
 import os
 import json
-import cv2
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(".")
 
-from core.ss_capture import capture_and_save_screenshot
+from core.ss_capture import LATEST_SCREENSHOT, capture_adb_screenshot, save_image_async, load_screenshot
 from core.matcher import get_match
 from core.clickmap_access import resolve_dot_path
 
@@ -57,26 +58,20 @@ def is_on_expected_menu(screen, category: str):
 
 def main():
     p = argparse.ArgumentParser(description="Check if an upgrade label is visible on screen.")
-    p.add_argument("--image", default="screenshots/latest.png", help="Screenshot path to use")
+    p.add_argument("--image", default=LATEST_SCREENSHOT, help="Screenshot path to use")
     p.add_argument("--refresh", action="store_true", help="Capture a fresh screenshot first")
     p.add_argument("--key", help="Full upgrades dot-path (e.g., upgrades.attack.left.damage)")
     p.add_argument("--category", choices=["attack", "defense", "utility"], help="Upgrade category")
     p.add_argument("--side", choices=["left", "right"], help="Upgrade list side")
     p.add_argument("--name", help="Upgrade name key (e.g., damage)")
+    p.add_argument("--force-match", action="store_true",
+                   help="Match the label even when the expected menu indicator is not visible")
 
     args = p.parse_args()
 
-    if args.refresh:
-        capture_and_save_screenshot(args.image)
-
-    if not os.path.exists(args.image):
-        print(json.dumps({"error": f"image not found: {args.image}"}))
-        return 1
-
-    screen = cv2.imread(args.image)
-    if screen is None:
-        print(json.dumps({"error": "failed to load image"}))
-        return 1
+    # --refresh: the ADB capture runs while the key is validated and resolved
+    pool = ThreadPoolExecutor(max_workers=1) if args.refresh else None
+    pending = pool.submit(capture_adb_screenshot) if pool else None
 
     if args.key:
         category, side, name = parse_key_to_parts(args.key)
@@ -100,8 +95,27 @@ def main():
         }))
         return 0
 
+    # A refreshed frame is used as captured; otherwise read the file (no separate exists() probe)
+    if pending is not None:
+        screen = pending.result()
+        pool.shutdown()
+        if screen is not None:
+            save_image_async(screen, args.image)  # written while matching runs
+    else:
+        screen = load_screenshot(args.image)  # tmpfs raw mirror when fresh, else imread
+    if screen is None:
+        if not args.refresh and not os.path.exists(args.image):
+            print(json.dumps({"error": f"image not found: {args.image}"}))
+        else:
+            print(json.dumps({"error": "failed to load image"}))
+        return 1
+
     on_menu, menu_conf = is_on_expected_menu(screen, category)
-    match_point, conf = get_match(key, screenshot=screen)
+    # Off-menu the label cannot be on screen; skip its template match unless asked
+    if on_menu or args.force_match:
+        match_point, conf = get_match(key, screenshot=screen)
+    else:
+        match_point, conf = None, 0.0
 
     result = {
         "key": key,
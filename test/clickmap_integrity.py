@@ -1,27 +1,44 @@
 # test/clickmap_integrity.py
 
 import os
-import json
 from core.clickmap_access import get_clickmap
 
 clickmap = get_clickmap()
 TEMPLATE_DIR = "assets/match_templates"
 
 
-def validate_entry(name, entry):
+REGION_KEYS = ("x", "y", "w", "h")
+
+
+def list_templates(template_dir=TEMPLATE_DIR):
+    """Return the set of template paths (relative to template_dir, '/'-separated) from one directory walk."""
+    available = set()
+    for root, _, files in os.walk(template_dir):
+        rel = os.path.relpath(root, template_dir)
+        prefix = "" if rel == "." else rel.replace(os.sep, "/") + "/"
+        available.update(prefix + f for f in files)
+    return available
+
+
+def validate_entry(name, entry, available=None):
     errors = []
     if "match_template" in entry:
-        path = os.path.join(TEMPLATE_DIR, entry["match_template"])
-        if not os.path.exists(path):
+        if available is None:
+            missing = not os.path.exists(os.path.join(TEMPLATE_DIR, entry["match_template"]))
+        else:
+            missing = entry["match_template"] not in available
+        if missing:
             errors.append(f"Missing template image: {entry['match_template']}")
 
     if "match_region" in entry:
         region = entry["match_region"]
-        for key in ["x", "y", "w", "h"]:
-            if key not in region:
-                errors.append(f"Missing match_region key '{key}'")
-            elif not isinstance(region[key], int):
-                errors.append(f"match_region.{key} is not an integer")
+        # Fast path: all keys present and integer-valued
+        if not all(isinstance(region.get(key), int) for key in REGION_KEYS):
+            for key in REGION_KEYS:
+                if key not in region:
+                    errors.append(f"Missing match_region key '{key}'")
+                elif not isinstance(region[key], int):
+                    errors.append(f"match_region.{key} is not an integer")
 
     if "tap" in entry:
         for k in ["x", "y"]:
@@ -38,8 +55,9 @@ def validate_entry(name, entry):
 
 def main():
     total_errors = 0
+    available = list_templates()  # one directory walk instead of a stat per entry
     for name, entry in clickmap.items():
-        errs = validate_entry(name, entry)
+        errs = validate_entry(name, entry, available)
         if errs:
             total_errors += len(errs)
             print(f"[FAIL] {name}:")
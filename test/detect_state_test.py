@@ -3,18 +3,18 @@
 
 import argparse
 import os
-import cv2
 from core.state_detector import detect_state_and_overlays
-from core.ss_capture import capture_and_save_screenshot
+from core.ss_capture import LATEST_SCREENSHOT, capture_adb_screenshot, save_image_async, load_screenshot
 
 def main():
     """
     CLI test harness for state detection.
 
     Flags:
-      --image PATH       Path to screenshot image (default: screenshots/latest.png).
+      --image PATH       Path to screenshot image (default: LATEST_SCREENSHOT).
       --highlight        Save an annotated copy alongside the input (drawing must be implemented in detector).
       --refresh          Capture a fresh screenshot to PATH before detection.
+      --scale S          Match at scale S (<1.0 mirrors the half-res polling loops).
 
     Returns:
       Action result (prints detected state/overlays; optionally writes annotated image).
@@ -23,26 +23,31 @@ def main():
       Exits early if image file is missing or cannot be loaded.
     """
     parser = argparse.ArgumentParser(description="Test state detection from screenshot")
-    parser.add_argument("--image", default="screenshots/latest.png", help="Path to screenshot image")
+    parser.add_argument("--image", default=LATEST_SCREENSHOT, help="Path to screenshot image")
     parser.add_argument("--highlight", action="store_true", help="Draw match region on output")
     parser.add_argument("--refresh", action="store_true", help="Capture new screenshot before running")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Match downscaled ROIs/templates (e.g., 0.5 like the polling loops); default 1.0")
     args = parser.parse_args()
 
     # Refresh first so it works even if the image doesn't exist yet.
     if args.refresh:
         print("[INFO] Capturing new screenshot...")
-        capture_and_save_screenshot(args.image)
+        screen = capture_adb_screenshot()
+        if screen is not None:
+            save_image_async(screen, args.image)  # written while detection runs
+    else:
+        screen = load_screenshot(args.image)  # tmpfs raw mirror when fresh, else imread
 
-    if not os.path.exists(args.image):
-        print(f("[ERROR] Image not found: {args.image}"))
-        return
-
-    screen = cv2.imread(args.image)
     if screen is None:
-        print("[ERROR] Failed to load image.")
+        if not os.path.exists(args.image):
+            print(f"[ERROR] Image not found: {args.image}")
+        else:
+            print("[ERROR] Failed to load image.")
         return
 
-    result = detect_state_and_overlays(screen)
+    # The frame stays full-res (clickmap regions are full-res coords); only ROIs are downscaled
+    result = detect_state_and_overlays(screen, scale=args.scale)
     print(f"[TEST] Detected state: {result['state']}")
     print(f"[TEST] Detected secondary states: {result['secondary_states']}")
     print(f"[TEST] Detected overlays: {result['overlays']}")
@@ -50,7 +55,7 @@ def main():
     # Optional: save a highlighted version (match drawing must be added inside detect_state for now)
     if args.highlight:
         output_path = os.path.splitext(args.image)[0] + "_annotated.png"
-        cv2.imwrite(output_path, screen)
+        save_image_async(screen, output_path, sync=True)  # in-memory encode (PNG level 1) + one write
         print(f"[INFO] Saved annotated image to: {output_path}")
 
 
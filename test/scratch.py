@@ -1,11 +1,11 @@
 # quick_match_probe.py
-import cv2
 from core.clickmap_access import get_clickmap, resolve_dot_path
 from core.matcher import _match_entry
+from core.ss_capture import LATEST_SCREENSHOT, load_screenshot
 
 get_clickmap()  # ensure cache is warm
 
-screen = cv2.imread("screenshots/latest.png")
+screen = load_screenshot(LATEST_SCREENSHOT)
 entry = resolve_dot_path("indicators.game_over")
 print("Resolved?", bool(entry))
 if entry:
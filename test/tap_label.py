@@ -9,7 +9,11 @@ Usage:
 Notes:
   - Uses core.label_tapper.tap_label_now(key) which performs matching
     inside the configured region and issues an ADB tap on success.
-  - Optionally captures a fresh screenshot first with --refresh.
+  - Optionally captures a fresh screenshot first with --refresh (kept in memory
+    and used for the first attempt; retries capture their own frame).
+  - Taps go through the persistent adb shell session, so retries only pay --sleep.
+  - Between retries the screen is polled: the next attempt starts as soon as the frame
+    changes, and --sleep is only the upper bound.
   - Returns JSON-like output describing the attempt.
 """
 
@@ -19,8 +23,30 @@ import sys
 import time
 
 from core.clickmap_access import resolve_dot_path
-from core.ss_capture import capture_and_save_screenshot
+from core.ss_capture import capture_adb_screenshot
 from core.label_tapper import tap_label_now
+from utils.ui_wait import ChangeGate
+
+RETRY_POLL_S = 0.1  # pause between captures while waiting for the screen to change
+
+
+def wait_for_change(gate, timeout):
+    """
+    Capture until gate reports a changed frame or timeout elapses.
+    Returns the last frame captured (None if every capture failed); the caller matches on it.
+    """
+    deadline = time.monotonic() + max(0.0, timeout)
+    frame = None
+    while True:
+        img = capture_adb_screenshot()
+        if img is not None:
+            frame = img
+            if gate.changed(img):
+                return frame
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return frame
+        time.sleep(min(RETRY_POLL_S, remaining))
 
 
 def main() -> int:
@@ -28,7 +54,8 @@ def main() -> int:
     p.add_argument("key", help="Clickmap dot-path (e.g., upgrades.attack.left.damage)")
     p.add_argument("--refresh", action="store_true", help="Capture a fresh screenshot before matching")
     p.add_argument("--retries", type=int, default=1, help="Max attempts if initial match fails")
-    p.add_argument("--sleep", type=float, default=0.5, help="Seconds to wait between retries")
+    p.add_argument("--sleep", type=float, default=0.5,
+                   help="Max seconds to wait between retries (cut short when the screen changes)")
     args = p.parse_args()
 
     # Validate clickmap entry exists
@@ -40,18 +67,21 @@ def main() -> int:
         }))
         return 1
 
-    if args.refresh:
-        capture_and_save_screenshot()
+    screen = capture_adb_screenshot() if args.refresh else None
 
+    gate = ChangeGate(max_skip_s=float("inf"))  # only a visual change ends the wait early
     attempts = 0
     success = False
-    while attempts < max(1, args.retries) and not success:
+    while attempts < max(1, args.retries):
         attempts += 1
-        success = tap_label_now(args.key)
-        if success:
+        if screen is None:
+            screen = capture_adb_screenshot()
+        gate.changed(screen)  # reference frame for the wait below
+        success = tap_label_now(args.key, screenshot=screen)
+        if success or attempts >= args.retries:
             break
-        if attempts < args.retries:
-            time.sleep(max(0.0, args.sleep))
+        # Matching the same pixels again cannot succeed: retry once the UI redrew
+        screen = wait_for_change(gate, args.sleep)
 
     print(json.dumps({
         "key": args.key,
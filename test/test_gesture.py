@@ -2,7 +2,7 @@
 
 import argparse
 import sys
-from core.clickmap_access import resolve_dot_path, tap_now, swipe_now
+from core.clickmap_access import resolve_dot_path, tap_coord, swipe_now
 from core.label_tapper import tap_label_now
 from utils.logger import log
 
@@ -13,7 +13,7 @@ def run_gesture(dot_path):
 
     Resolution order:
       1) If entry has "match_template": use visual tap via tap_label_now(dot_path).
-      2) Else if entry has "tap": perform static tap via tap_now(dot_path).
+      2) Else if entry has "tap": perform static tap via tap_coord() on the resolved entry.
       3) Else if entry has "swipe": perform swipe via swipe_now(dot_path).
       4) Otherwise: log an error.
 
@@ -50,7 +50,7 @@ def run_gesture(dot_path):
     # 2. Try static tap
     if "tap" in entry:
         log(f"[INFO] Executing static tap gesture: {dot_path}", "DEBUG")
-        tap_now(dot_path)
+        tap_coord((entry["tap"]["x"], entry["tap"]["y"]), dot_path)  # entry already resolved above
         return True
 
     # 3. Try swipe
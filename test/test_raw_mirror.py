@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# test/test_raw_mirror.py
+
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(".")  # so core/, utils/ etc. work if run from root
+
+import core.ss_capture as ss
+
+
+def test_latest_write_publishes_raw_mirror(tmp_path, monkeypatch):
+    """
+    Saving LATEST_SCREENSHOT through the async writer refreshes the tmpfs raw mirror,
+    and load_screenshot() then maps it instead of decoding the JPEG.
+    """
+    latest = str(tmp_path / "latest.jpg")
+    shm = tmp_path / "shm"
+    shm.mkdir()
+    monkeypatch.setattr(ss, "LATEST_SCREENSHOT", latest)
+    monkeypatch.setattr(ss, "RAW_SHM_DIR", str(shm))
+
+    img = np.random.default_rng(0).integers(0, 256, (48, 64, 3), dtype=np.uint8)
+    assert ss.save_image_async(img, latest, sync=True).result()
+    assert (shm / ss.RAW_MIRROR_NAME).exists()
+
+    monkeypatch.setattr(ss.cv2, "imread", lambda path: pytest.fail(f"decoded {path} instead of mapping the mirror"))
+    loaded = ss.load_screenshot(latest)
+    np.testing.assert_array_equal(loaded, img)  # exact pixels: JPEG-decoded ones would differ
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -10,7 +10,7 @@ sys.path.append(".")  # so core/, utils/ etc. work if run from root
 
 from utils.template_matcher import match_region
 from core.clickmap_access import resolve_dot_path
-from core.ss_capture import capture_and_save_screenshot
+from core.ss_capture import LATEST_SCREENSHOT, capture_and_save_screenshot
 
 
 # ---- Behavior-critical constants (were magic numbers) ----
@@ -21,6 +21,30 @@ MAXED_RANGE = (45, 50)         # inclusive BGR average range considered "maxed"
 UPGRADEABLE_RANGE = (57, 60)   # inclusive BGR average range considered "upgradeable"
 
 
+DEBUG = False  # per-key sample/brightness prints
+
+
+def classify_brightness(avg):
+    """
+    Vectorized classification of average brightness values.
+
+    Args:
+        avg (array-like): Per-sample mean of (B + G + R) / 3, shape (K,).
+
+    Returns:
+        np.ndarray[str]: "maxed" / "upgradeable" / "unaffordable" per sample (inclusive ranges).
+    """
+    avg = np.asarray(avg, dtype=np.float64)
+    return np.select(
+        [
+            (avg >= MAXED_RANGE[0]) & (avg <= MAXED_RANGE[1]),
+            (avg >= UPGRADEABLE_RANGE[0]) & (avg <= UPGRADEABLE_RANGE[1]),
+        ],
+        ["maxed", "upgradeable"],
+        default="unaffordable",
+    )
+
+
 def classify_color(bgr):
     """
     Classify upgrade affordance by average BGR brightness.
@@ -33,14 +57,9 @@ def classify_color(bgr):
     """
     b, g, r = bgr
     avg = (b + g + r) / 3
-    print(f"[CLASSIFY] avg={avg:.1f} from BGR={bgr}")
-
-    if MAXED_RANGE[0] <= avg <= MAXED_RANGE[1]:
-        return "maxed"
-    elif UPGRADEABLE_RANGE[0] <= avg <= UPGRADEABLE_RANGE[1]:
-        return "upgradeable"
-    else:
-        return "unaffordable"
+    if DEBUG:
+        print(f"[CLASSIFY] avg={avg:.1f} from BGR={bgr}")
+    return str(classify_brightness([avg])[0])
 
 
 def detect_upgrades(screen, keys):
@@ -51,15 +70,19 @@ def detect_upgrades(screen, keys):
       - Resolve clickmap entry.
       - Template match to find the UI element.
       - Sample a small color region at (match_point + OFFSET_X/Y).
-      - Classify via `classify_color`.
-      - Draw a small green rectangle over the sampled area (in-place on `screen`).
+    Then, for all sampled keys at once:
+      - Average every sample patch in one NumPy reduction and classify via `classify_brightness`.
+      - Draw a small green rectangle over each sampled area (in-place on `screen`).
+
+    All matching and sampling happens before any marker is drawn, so markers never
+    leak into a later key's match or sample.
 
     Args:
         screen (np.ndarray): BGR screenshot image.
         keys (list[str]): Dot-path keys to check.
 
     Returns:
-        dict: key -> status dict. Example on visible:
+        dict: key -> status dict (in `keys` order). Example on visible:
               {
                 "status": "upgradeable" | "maxed" | "unaffordable",
                 "confidence": float,
@@ -73,6 +96,7 @@ def detect_upgrades(screen, keys):
               }
     """
     results = {}
+    samples = []  # (key, match_point, confidence, sample_center)
     h, w = screen.shape[:2]
 
     for key in keys:
@@ -82,54 +106,56 @@ def detect_upgrades(screen, keys):
             continue
 
         match_point, confidence = match_region(screen, entry)
-        if match_point:
-            x, y = match_point
-
-            color_x = x + OFFSET_X
-            color_y = y + OFFSET_Y
-
-            # Bounds-check the sampled region to avoid IndexError
-            x0 = color_x - SAMPLE_HALF
-            x1 = color_x + SAMPLE_HALF
-            y0 = color_y - SAMPLE_HALF
-            y1 = color_y + SAMPLE_HALF
-
-            if x0 < 0 or y0 < 0 or x1 > w or y1 > h:
-                # Do not crash; report out-of-bounds to caller
-                results[key] = {
-                    "status": "sample_oob",
-                    "confidence": round(confidence, 3),
-                    "tap_point": (x, y)
-                }
-                continue
-
-            color_region = screen[y0:y1, x0:x1]
-            avg = color_region.mean(axis=(0, 1))
-
-            # Visual marker for debugging
-            cv2.rectangle(
-                screen,  # image
-                (color_x - 5, color_y - 5),
-                (color_x + 5, color_y + 5),
-                (0, 255, 0),  # green box
-                2  # thickness
-            )
-
-            avg_color = avg.astype(int).tolist()
-            status = classify_color(avg)
-            print(f"[DEBUG] {key} → avg={(avg_color[0] + avg_color[1] + avg_color[2]) / 3:.1f}  raw={avg_color} → {status}")
-
-            results[key] = {
-                "status": status,
-                "confidence": round(confidence, 3),
-                "tap_point": (x, y),
-                "avg_color": avg_color
-            }
-        else:
+        if not match_point:
             results[key] = {
                 "status": "not visible",
                 "confidence": round(confidence, 3)
             }
+            continue
+
+        x, y = match_point
+        color_x = x + OFFSET_X
+        color_y = y + OFFSET_Y
+
+        # Bounds-check the sampled region to avoid IndexError
+        if (color_x - SAMPLE_HALF < 0 or color_y - SAMPLE_HALF < 0
+                or color_x + SAMPLE_HALF > w or color_y + SAMPLE_HALF > h):
+            # Do not crash; report out-of-bounds to caller
+            results[key] = {
+                "status": "sample_oob",
+                "confidence": round(confidence, 3),
+                "tap_point": (x, y)
+            }
+            continue
+
+        results[key] = None  # filled below; keeps the result order of `keys`
+        samples.append((key, (x, y), confidence, (color_x, color_y)))
+
+    if not samples:
+        return results
+
+    # One (K, 2*SAMPLE_HALF, 2*SAMPLE_HALF, 3) stack, one reduction for all per-channel means
+    patches = np.stack([
+        screen[cy - SAMPLE_HALF:cy + SAMPLE_HALF, cx - SAMPLE_HALF:cx + SAMPLE_HALF]
+        for _, _, _, (cx, cy) in samples
+    ])
+    means = patches.reshape(len(samples), -1, 3).mean(axis=1)
+    statuses = classify_brightness(means.mean(axis=1))
+
+    for (key, tap_point, confidence, (cx, cy)), avg, status in zip(samples, means, statuses):
+        # Visual marker for debugging
+        cv2.rectangle(screen, (cx - 5, cy - 5), (cx + 5, cy + 5), (0, 255, 0), 2)
+
+        avg_color = avg.astype(int).tolist()
+        if DEBUG:
+            print(f"[DEBUG] {key} → avg={avg.mean():.1f}  raw={avg_color} → {status}")
+
+        results[key] = {
+            "status": str(status),
+            "confidence": round(confidence, 3),
+            "tap_point": tap_point,
+            "avg_color": avg_color
+        }
 
     return results
 
@@ -139,7 +165,7 @@ def main(argv=None):
     Script entrypoint.
 
     Behavior:
-      - Loads image from CLI arg or defaults to 'screenshots/latest.png'.
+      - Loads image from CLI arg or defaults to LATEST_SCREENSHOT.
       - Runs detect_upgrades on four hardcoded upgrade keys.
       - Prints results and shows an OpenCV window with the debug overlay.
 
@@ -149,7 +175,7 @@ def main(argv=None):
     argv = argv if argv is not None else sys.argv[1:]
 
     # Default image path
-    img_path = argv[0] if len(argv) >= 1 else "screenshots/latest.png"
+    img_path = argv[0] if len(argv) >= 1 else LATEST_SCREENSHOT
     screen = cv2.imread(img_path)
     if screen is None:
         print(f"[ERROR] Failed to load image: {img_path}")
@@ -13,7 +13,7 @@ Features:
 
 Usage examples:
   # Visualize shared floating_buttons slice and draw floating_button entries
-  test/visualize_regions.py --image screenshots/latest.png \
+  test/visualize_regions.py --image screenshots/latest.jpg \
     --shared floating_buttons --roles floating_button --out out/regions.png
 
   # Capture via ADB, run floating button detector, write heatmaps
@@ -21,12 +21,13 @@ Usage examples:
     --detector floating_buttons --heatmaps --out out/fb_overlay.png
 
   # Visualize arbitrary dot paths
-  test/visualize_regions.py --image screenshots/latest.png \
+  test/visualize_regions.py --image screenshots/latest.jpg \
     --dot-paths "floating_buttons.missile_barrage" "indicators.wall_icon" \
     --out out/selected_boxes.png
 """
 
 import argparse, os, sys, json, pathlib
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 
@@ -37,7 +38,8 @@ sys.path.insert(0, REPO)
 from utils.logger import log
 from core.clickmap_access import get_clickmap, resolve_dot_path, get_entries_by_role
 from core.label_tapper import resolve_region
-from core.ss_capture import capture_adb_screenshot, capture_and_save_screenshot
+from core.ss_capture import LATEST_SCREENSHOT, capture_adb_screenshot, capture_and_save_screenshot, save_image_async
+from core.matcher import _load_template  # lru-cached, read-only decoded templates
 
 # Optional detector imports (kept local to avoid import cycles when unused)
 def _import_detector(name: str):
@@ -140,6 +142,64 @@ def draw_overlay(img, groups, scale=1.0, thickness=2):
         out = cv2.resize(out, (int(w*scale), int(h*scale)), interpolation=cv2.INTER_AREA)
     return out
 
+def _window_sums(ii, th, tw):
+    # Sum of every th x tw window from an integral image; shape (H-th+1, W-tw+1)
+    return ii[th:, tw:] - ii[:-th, tw:] - ii[th:, :-tw] + ii[:-th, :-tw]
+
+def _ncc_batch(roi, templates):
+    """
+    TM_CCOEFF_NORMED response maps for several templates over the same ROI.
+
+    The ROI-side work is done once for all templates: one forward DFT and one
+    integral image (sum, sqsum) per channel. Each template then costs its own DFT,
+    a spectrum multiply per channel and a single inverse DFT (channels are summed
+    in the frequency domain). Channels, then templates, run in parallel on a thread pool.
+    Matches cv2.matchTemplate to ~1e-6; zero-variance windows score 0. Returns
+    float32 maps in input order, or None where a template exceeds the ROI.
+    """
+    H, W = roi.shape[:2]
+    img = roi.reshape(H, W, -1).astype(np.float64)
+    channels = img.shape[2]
+    dh, dw = cv2.getOptimalDFTSize(H), cv2.getOptimalDFTSize(W)
+    pad = lambda a: cv2.copyMakeBorder(a, 0, dh - a.shape[0], 0, dw - a.shape[1], cv2.BORDER_CONSTANT, value=0)
+
+    def _plane(c):
+        ch = np.ascontiguousarray(img[:, :, c])
+        s, s2 = cv2.integral2(ch, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        return cv2.dft(pad(ch), flags=cv2.DFT_COMPLEX_OUTPUT), s, s2
+
+    def _score(templ):
+        th, tw = templ.shape[:2]
+        if th > H or tw > W or templ.size // (th * tw) != channels:
+            return None
+        tz = templ.reshape(th, tw, channels).astype(np.float64)
+        tz -= tz.reshape(-1, channels).mean(axis=0)
+        n = th * tw
+        spectrum = None
+        var = 0.0
+        for c, (roi_spec, s, s2) in enumerate(planes):
+            t_spec = cv2.dft(pad(np.ascontiguousarray(tz[:, :, c])), flags=cv2.DFT_COMPLEX_OUTPUT)
+            prod = cv2.mulSpectrums(roi_spec, t_spec, 0, conjB=True)
+            spectrum = prod if spectrum is None else spectrum + prod
+            ws = _window_sums(s, th, tw)
+            var = var + (_window_sums(s2, th, tw) - ws * ws / n)
+        cross = cv2.idft(spectrum, flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT)[:H - th + 1, :W - tw + 1]
+        denom = np.sqrt(np.maximum(var, 0.0)) * float(np.sqrt((tz * tz).sum()))
+        res = np.zeros_like(cross)
+        np.divide(cross, denom, out=res, where=denom > 1e-6)
+        return np.clip(res, -1.0, 1.0).astype(np.float32)
+
+    # Both stages fan out: ROI planes per channel (the bulk of the work for a large region
+    # and few templates), then templates, which only read the shared planes.
+    # cv2 DFTs and NumPy reductions release the GIL.
+    workers = min(max(channels, len(templates)), os.cpu_count() or 1)
+    if workers < 2:
+        planes = [_plane(c) for c in range(channels)]
+        return [_score(t) for t in templates]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        planes = list(pool.map(_plane, range(channels)))
+        return list(pool.map(_score, templates))
+
 def run_floating_button_scoring(img, clickmap, out_dir, thresh_bump=0.0, draw_best=True, heatmaps=False):
     # Enforce shared slice for scoring to reflect intended behavior
     shared = (clickmap.get("_shared_match_regions") or {}).get("floating_buttons", {})
@@ -147,42 +207,54 @@ def run_floating_button_scoring(img, clickmap, out_dir, thresh_bump=0.0, draw_be
     if not reg:
         log("Shared region for floating_buttons missing", "ERROR"); return []
     xs, ys, ws, hs = [int(reg[k]) for k in ("x","y","w","h")]
-    roi = img[ys:ys+hs, xs:xs+ws].copy()
+    roi = img[ys:ys+hs, xs:xs+ws]
 
     entries = get_entries_by_role("floating_button")
-    results = []
+    loaded = []
     for name, e in entries.items():
         t_rel = e.get("match_template")
         if not t_rel:
             continue
-        t_path = os.path.join(REPO, "assets", "match_templates", t_rel)
-        templ = cv2.imread(t_path, cv2.IMREAD_COLOR)
-        if templ is None:
+        # Normalized absolute path: one cache entry per file whatever the caller's cwd
+        t_path = os.path.normpath(os.path.join(REPO, "assets", "match_templates", t_rel))
+        try:
+            templ = _load_template(t_path)
+        except (FileNotFoundError, ValueError):
             log(f"Missing template: {t_rel}", "ERROR")
             continue
-        res = cv2.matchTemplate(roi, templ, cv2.TM_CCOEFF_NORMED)
+        loaded.append((name, e, templ))
+
+    # Score every template against the untouched ROI; annotations go on a separate copy
+    maps = _ncc_batch(roi, [templ for _, _, templ in loaded])
+    annotated = roi.copy()
+    results = []
+    for (name, e, templ), res in zip(loaded, maps):
+        if res is None:
+            log(f"Template larger than shared region (or channel mismatch): {e['match_template']}", "ERROR")
+            continue
         _, maxVal, _, maxLoc = cv2.minMaxLoc(res)
         thr = float(e.get("match_threshold", 0.9)) - float(thresh_bump)
         thr = max(0.0, min(1.0, thr))
         th_, tw_ = templ.shape[:2]
         if draw_best:
             tl = (maxLoc[0], maxLoc[1]); br = (tl[0]+tw_, tl[1]+th_)
-            cv2.rectangle(roi, tl, br, (0,200,0) if maxVal>=thr else (0,0,255), 2)
-            cv2.putText(roi, f"{name.split('.')[-1]}:{maxVal:.2f}",
+            cv2.rectangle(annotated, tl, br, (0,200,0) if maxVal>=thr else (0,0,255), 2)
+            cv2.putText(annotated, f"{name.split('.')[-1]}:{maxVal:.2f}",
                         (tl[0]+2, max(0, tl[1]-6)), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
                         (0,200,0) if maxVal>=thr else (0,0,255), 1, cv2.LINE_AA)
         if heatmaps:
             hm = _heatmap(res)
-            cv2.imwrite(os.path.join(out_dir, f"fb_{name.split('.')[-1]}_heatmap.png"), hm)
+            # Encoded on the writer pool while the next template is scored
+            save_image_async(hm, os.path.join(out_dir, f"fb_{name.split('.')[-1]}_heatmap.png"))
         results.append({"name": name, "max": float(maxVal), "thr": float(thr), "template_wh": [int(tw_), int(th_)]})
     # paste back annotated ROI for context (caller draws the outer box via groups)
-    return results, (xs, ys, ws, hs), roi
+    return results, (xs, ys, ws, hs), annotated
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--adb", action="store_true", help="Capture via ADB before processing")
-    ap.add_argument("--image", default="screenshots/latest.png", help="Input image path if not using --adb")
-    ap.add_argument("--save-capture", default="screenshots/latest.png", help="Where to save the ADB capture")
+    ap.add_argument("--image", default=LATEST_SCREENSHOT, help="Input image path if not using --adb")
+    ap.add_argument("--save-capture", default=LATEST_SCREENSHOT, help="Where to save the ADB capture")
     ap.add_argument("--out", default="out/regions_overlay.png", help="Output overlay image")
     ap.add_argument("--dump", default=None, help="Optional JSON dump of drawn boxes")
     ap.add_argument("--scale", type=float, default=1.0, help="Overlay scale")
@@ -210,7 +282,7 @@ def main():
             log("ADB capture returned None", "ERROR"); sys.exit(2)
         if args.save_capture:
             _ensure_dir(args.save_capture)
-            cv2.imwrite(args.save_capture, img)
+            save_image_async(img, args.save_capture, sync=True)
             log(f"ADB capture saved: {args.save_capture}", "INFO")
     else:
         img = cv2.imread(args.image, cv2.IMREAD_COLOR)
@@ -262,7 +334,7 @@ def main():
     if args.scale != 1.0:
         h, w = overlay.shape[:2]
         overlay = cv2.resize(overlay, (int(w*args.scale), int(h*args.scale)), interpolation=cv2.INTER_AREA)
-    cv2.imwrite(args.out, overlay)
+    save_image_async(overlay, args.out, sync=True)
     print(f"[OK] wrote {args.out}")
 
     # Dump JSON if requested
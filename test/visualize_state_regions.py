@@ -33,6 +33,7 @@ from core.clickmap_access import get_clickmap, dot_path_exists, resolve_dot_path
 from core.label_tapper import resolve_region  # type: ignore
 from core.state_detector import load_state_definitions  # type: ignore
 from utils.logger import log  # type: ignore
+from core.ss_capture import LATEST_SCREENSHOT, save_image_async  # type: ignore
 
 
 TRIM_SUFFIXES = (
@@ -144,7 +145,7 @@ def _draw(img, groups, scale=1.0, thickness=2, title=None):
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--image", default="screenshots/latest.png")
+    ap.add_argument("--image", default=LATEST_SCREENSHOT)
     ap.add_argument("--out", default="out/visual_state_regions.png")
     ap.add_argument("--states", nargs="*", help="Limit to specific state names")
     ap.add_argument("--include-overlays", action="store_true")
@@ -221,7 +222,7 @@ def main():
             print("   -", s)
 
     composed = _draw(img, groups, scale=args.scale, thickness=args.thickness, title="visualize_state_regions")
-    cv2.imwrite(args.out, composed)
+    save_image_async(composed, args.out, sync=True)  # in-memory encode + one write
     print(f"[INFO] Wrote: {args.out}")
 
     if args.dump:
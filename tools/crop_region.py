@@ -18,7 +18,7 @@ from core.clickmap_access import (
 )
 
 # Constants
-SOURCE_PATH = "screenshots/latest.png"
+SOURCE_PATH = "screenshots/crop_source.png"  # lossless; templates are cropped from this, never from the JPEG LATEST_SCREENSHOT
 TEMPLATE_DIR = "assets/match_templates"
 GESTURE_LOGGER_PATH = "tools/gesture_logger.py"
 SCRCPY_TITLE = "scrcpy-bridge"
@@ -36,7 +36,7 @@ viewport_height = 0  # set in main()
 viewport_width = 0   # set in main()
 LAUNCHER_WINDOW_ID = None  # window id of the terminal/launcher captured at startup
 OVERWRITE_ALWAYS = False   # set via CLI flag --overwrite / -y
-IMAGE_PATH_OVERRIDE = None  # set via CLI --image; if None, falls back to SOURCE_PATH
+IMAGE_PATH_OVERRIDE = None  # set via CLI --image; if None, a fresh capture is saved to SOURCE_PATH
 
 # Regions that are coordinates-only (no template image saved)
 COORDS_ONLY_GROUPS = {"_shared_match_regions"}   # e.g., shared helpers for region_ref consumers
@@ -58,23 +58,21 @@ def reload_image():
     """Capture a fresh screenshot, initialize globals (image/clone/img_w/h), reset scroll, and focus the window.
 
     Inputs: none (uses ADB via capture_and_save_screenshot()).
-    Writes: updates globals image, clone, img_height, img_width; resets scroll_offset; saves screenshots/latest.png on disk.
+    Writes: updates globals image, clone, img_height, img_width; resets scroll_offset; saves SOURCE_PATH (PNG) on disk.
     Prompts: none (silent, except printed INFO).
     """
     global image, clone, img_height, img_width, scroll_offset
-    # If an image path is provided (or default latest.png), load from disk.
-    # Fallback to ADB capture if the file is missing or unreadable.
+    # If an image path is provided via --image, load from disk.
+    # Otherwise (or if that file is missing/unreadable) capture a fresh lossless PNG.
     img = None
-    img_path = IMAGE_PATH_OVERRIDE or SOURCE_PATH
     try:
-        if img_path and os.path.exists(img_path):
-            img = cv2.imread(img_path)
+        if IMAGE_PATH_OVERRIDE and os.path.exists(IMAGE_PATH_OVERRIDE):
+            img = cv2.imread(IMAGE_PATH_OVERRIDE)
     except Exception:
         img = None
 
     if img is None:
-        # Try capturing via ADB as a fallback and use the returned BGR image.
-        img = capture_and_save_screenshot()
+        img = capture_and_save_screenshot(path=SOURCE_PATH)
     if img is None:
         raise RuntimeError("[ERROR] Could not load image or capture screenshot.")
     image = img
@@ -306,8 +304,8 @@ def handle_mouse(event, x, y, flags, param):
 def parse_args():
     p = argparse.ArgumentParser(description="Crop a region and save to clickmap + template.")
     p.add_argument("--overwrite", "-y", action="store_true", help="Overwrite existing clickmap entry without prompt.")
-    p.add_argument("--image", default=SOURCE_PATH,
-                   help="Path to source image to open (default: screenshots/latest.png). If missing, falls back to ADB capture.")
+    p.add_argument("--image", default=None,
+                   help=f"Path to a lossless source image to open (default: capture a fresh one to {SOURCE_PATH}). If missing, falls back to ADB capture.")
     return p.parse_args()
 
 def main():
@@ -5,13 +5,16 @@ import json
 import signal
 import atexit
 import subprocess
+import threading
 import time
+import queue
 import re
+from functools import lru_cache
 from pynput import mouse
 import cv2
 import numpy as np
 
-from core.adb_utils import adb_shell
+from core.adb_session import input_shell
 from core.ss_capture import capture_adb_screenshot
 
 # Global State Variables
@@ -21,6 +24,14 @@ SCRCPY_WIN_RECT = None
 # Global for cleanup
 SCRCPY_PROC = None
 
+# xwininfo output fields (compiled once; parsed on every click via ensure_scrcpy_window_rect).
+# Bytes patterns run on check_output() directly, so the output is never decoded.
+_RE_WIDTH = re.compile(rb"Width:\s+(\d+)")
+_RE_HEIGHT = re.compile(rb"Height:\s+(\d+)")
+_RE_ABS_X = re.compile(rb"Absolute upper-left X:\s+(\d+)")
+_RE_ABS_Y = re.compile(rb"Absolute upper-left Y:\s+(\d+)")
+_RE_WIN_ID = re.compile(rb"\b(0x[0-9a-fA-F]+)\b")
+
 # -------------------- Window lookup helpers --------------------
 
 def _lookup_scrcpy_window_id():
@@ -43,11 +54,11 @@ def _xwininfo_rect(win_id):
     Query geometry for a window id via xwininfo.
     Returns (x, y, width, height).
     """
-    geo = subprocess.check_output(["xwininfo", "-id", win_id]).decode()
-    width = int(re.search(r"Width:\s+(\d+)", geo).group(1))
-    height = int(re.search(r"Height:\s+(\d+)", geo).group(1))
-    x = int(re.search(r"Absolute upper-left X:\s+(\d+)", geo).group(1))
-    y = int(re.search(r"Absolute upper-left Y:\s+(\d+)", geo).group(1))
+    geo = subprocess.check_output(["xwininfo", "-id", win_id])
+    width = int(_RE_WIDTH.search(geo).group(1))
+    height = int(_RE_HEIGHT.search(geo).group(1))
+    x = int(_RE_ABS_X.search(geo).group(1))
+    y = int(_RE_ABS_Y.search(geo).group(1))
     return (x, y, width, height)
 
 
@@ -56,13 +67,13 @@ def _largest_child_rect(win_id):
     Parse xwininfo -tree for child windows and return the largest child's rect.
     Returns (x, y, w, h) or None if no child rect obtained.
     """
-    tree = subprocess.check_output(['xwininfo', '-tree', '-id', win_id]).decode()
+    tree = subprocess.check_output(['xwininfo', '-tree', '-id', win_id])
     # Extract potential child window ids (hex ids appear at line starts or after spaces)
     child_ids = []
     for line in tree.splitlines():
-        m = re.search(r"\b(0x[0-9a-fA-F]+)\b", line)
+        m = _RE_WIN_ID.search(line)
         if m:
-            cid = m.group(1)
+            cid = m.group(1).decode()
             if cid.lower() != win_id.lower():
                 child_ids.append(cid)
     best = None
@@ -124,13 +135,14 @@ def ensure_scrcpy_window_rect(rect_source='top', diagnose=False, android_size=No
 
     win_id = _ensure_id()
 
-    # Candidates
+    # Candidates (the child scan forks one xwininfo per child window; skip it when 'top' is all we use)
     top_rect = _stabilized_top_rect(win_id)
     child_rect = None
-    try:
-        child_rect = _largest_child_rect(win_id)
-    except subprocess.CalledProcessError:
-        child_rect = None
+    if rect_source != 'top' or diagnose:
+        try:
+            child_rect = _largest_child_rect(win_id)
+        except subprocess.CalledProcessError:
+            child_rect = None
 
     # Optional diagnostics
     if diagnose:
@@ -190,10 +202,12 @@ def ensure_scrcpy_window_rect(rect_source='top', diagnose=False, android_size=No
     return SCRCPY_WIN_RECT
 
 
+@lru_cache(maxsize=1)
 def get_android_screen_size():
     """
     Returns (width, height) of the current Android framebuffer.
     Uses centralized capture to avoid duplication and device drift.
+    Resolved once per run; the bridge assumes the device does not rotate.
     """
     img = capture_adb_screenshot()
     if img is None:
@@ -211,7 +225,12 @@ def get_scrcpy_window_rect(rect_source='top', diagnose=False, android_size=None)
     return win_rect
 
 
-def map_to_android(x, y, window_rect, android_size):
+@lru_cache(maxsize=8)
+def _content_box(window_rect, android_size):
+    """
+    Letterboxed device area inside the window: (left, top, width, height) in screen pixels.
+    Depends only on the window rect, so it is computed once per rect rather than per click.
+    """
     win_x, win_y, win_w, win_h = window_rect
     android_w, android_h = android_size
 
@@ -219,17 +238,17 @@ def map_to_android(x, y, window_rect, android_size):
     window_aspect = win_w / win_h
 
     if window_aspect > android_aspect:
-        scale = win_h / android_h
-        effective_w = android_w * scale
-        margin_x = (win_w - effective_w) / 2
-        rel_x = (x - win_x - margin_x) / effective_w
-        rel_y = (y - win_y) / win_h
-    else:
-        scale = win_w / android_w
-        effective_h = android_h * scale
-        margin_y = (win_h - effective_h) / 2
-        rel_x = (x - win_x) / win_w
-        rel_y = (y - win_y - margin_y) / effective_h
+        effective_w = android_w * (win_h / android_h)
+        return (win_x + (win_w - effective_w) / 2, win_y, effective_w, win_h)
+    effective_h = android_h * (win_w / android_w)
+    return (win_x, win_y + (win_h - effective_h) / 2, win_w, effective_h)
+
+
+def map_to_android(x, y, window_rect, android_size):
+    android_w, android_h = android_size
+    left, top, box_w, box_h = _content_box(tuple(window_rect), tuple(android_size))
+    rel_x = (x - left) / box_w
+    rel_y = (y - top) / box_h
 
     rel_x_clamped = max(0, min(1, rel_x))
     rel_y_clamped = max(0, min(1, rel_y))
@@ -241,12 +260,12 @@ def map_to_android(x, y, window_rect, android_size):
 
 def send_tap(x, y):
     print(f"[ADB] tap {x}, {y}")
-    adb_shell(["input", "tap", str(x), str(y)])
+    input_shell(["input", "tap", str(x), str(y)])
 
 
 def send_swipe(x1, y1, x2, y2, duration_ms):
     print(f"[ADB] swipe {x1},{y1} -> {x2},{y2} ({duration_ms}ms)")
-    adb_shell(["input", "swipe", str(x1), str(y1), str(x2), str(y2), str(duration_ms)])
+    input_shell(["input", "swipe", str(x1), str(y1), str(x2), str(y2), str(duration_ms)])
 
 
 def get_pixel_color_at_android_coords(x, y):
@@ -262,10 +281,28 @@ def get_pixel_color_at_android_coords(x, y):
 
 
 def start_mouse_listener(android_size, args):
+    """
+    Start the pynput listener plus one worker thread that handles its events; returns the listener.
+
+    The listener callback only queues (x, y, button, pressed, timestamp) and returns, so the
+    X event loop never waits on xwininfo or the adb round-trip; the worker processes clicks
+    in order using the timestamps taken at event time.
+    """
     press_pos = None
     press_time = None
+    events = queue.Queue()
 
     def on_click(x, y, button, pressed):
+        events.put((x, y, button, pressed, time.time()))
+
+    def worker():
+        while True:
+            try:
+                handle_click(*events.get())
+            except Exception as e:
+                print(f"[ERROR] Click handling failed: {e}")
+
+    def handle_click(x, y, button, pressed, event_time):
         nonlocal press_pos, press_time
 
         try:
@@ -288,14 +325,14 @@ def start_mouse_listener(android_size, args):
 
         if pressed:
             press_pos = (x, y)
-            press_time = time.time()
+            press_time = event_time
             return  # don't proceed further on press
 
         if press_time is None:
             print("[WARN] Mouse release detected but press_time is None — ignoring.")
             return
 
-        release_time = time.time()
+        release_time = event_time
         duration = int((release_time - press_time) * 1000)
 
         if button == mouse.Button.left:
@@ -324,13 +361,15 @@ def start_mouse_listener(android_size, args):
                 print("__GESTURE_JSON__" + json.dumps(gesture_data), flush=True)
 
         elif button == mouse.Button.right:
-            adb_shell(["input", "keyevent", "4"])  # BACK
+            input_shell(["input", "keyevent", "4"])  # BACK
 
         elif button == mouse.Button.middle:
-            adb_shell(["input", "keyevent", "3"])  # HOME
+            input_shell(["input", "keyevent", "3"])  # HOME
 
+    threading.Thread(target=worker, name="ClickWorker", daemon=True).start()
     listener = mouse.Listener(on_click=on_click)
     listener.start()
+    return listener
 
 
 def launch_scrcpy():
@@ -373,10 +412,9 @@ def main():
                                          android_size=android_size)
     print(f"[INFO] Android screen size: {android_size}")
     print(f"[INFO] scrcpy drawable window: {window_rect}")
-    start_mouse_listener(android_size, args)
+    listener = start_mouse_listener(android_size, args)
     print("Listening for clicks... Ctrl+C to quit.")
-    while True:
-        time.sleep(1)
+    listener.join()  # SIGINT/SIGTERM still reach cleanup_and_exit while the main thread is parked here
 
 
 if __name__ == "__main__":
@@ -10,7 +10,7 @@ import cv2
 import numpy as np
 
 from core.clickmap_access import resolve_dot_path, get_clickmap
-from utils.ocr_utils import preprocess_binary
+from utils.ocr_utils import preprocess_binary, is_blank
 
 # Use enough precision for big idle numbers
 getcontext().prec = 28
@@ -97,6 +97,8 @@ def _ocr_coins_bin(bin_img) -> Tuple[Optional[Decimal], float, str]:
     Use Tesseract word boxes to get a reasonable confidence and join tokens.
     We avoid strict whitelists so unit letters (M/B/T) survive.
     """
+    if is_blank(bin_img):
+        return None, -1.0, ""
     try:
         import pytesseract
     except Exception:
@@ -0,0 +1,104 @@
+# utils/csv_appender.py
+"""
+Append-only CSV writer that keeps file I/O off the caller's thread.
+
+spec_legend:
+  r: Return value (shape & invariants)
+  s: Side effects (project tags like [fs][thread][log])
+  e: Errors/exceptions behavior
+  notes: Usage guidance / invariants
+
+defaults:
+  flush: every FLUSH_ROWS rows or FLUSH_INTERVAL_S seconds, whichever comes first, and on close()
+  queue: bounded (QUEUE_MAX rows); rows offered while it is full are dropped with a rate-limited WARN
+"""
+
+import os
+import queue
+import threading
+import time
+
+from utils.logger import log_rate_limited
+
+FLUSH_ROWS = 10
+FLUSH_INTERVAL_S = 10.0
+QUEUE_MAX = 1000
+
+_STOP = object()
+
+
+class CsvAppender:
+    """
+    spec:
+      name: CsvAppender
+      constructor:
+        signature: CsvAppender(path:str, header:str) -> CsvAppender
+        p:
+          path: CSV file; parent directories are created, existing rows are kept (append mode)
+          header: Header line (without newline), written only when the file is empty
+      s: [fs][thread]
+      e:
+        - OSError from os.makedirs/open propagates from the constructor (bad path is a startup error)
+      notes:
+        - The file is opened once; callers queue pre-formatted lines and a daemon thread writes them.
+    """
+
+    def __init__(self, path: str, header: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._f = open(path, "a", encoding="utf-8")
+        if self._f.tell() == 0:
+            self._f.write(header + "\n")
+            self._f.flush()
+        self._q = queue.Queue(maxsize=QUEUE_MAX)
+        self._thread = threading.Thread(target=self._run, name="CsvAppender", daemon=True)
+        self._thread.start()
+
+    def append(self, line: str) -> bool:
+        """
+        spec:
+          name: CsvAppender.append
+          signature: append(line:str) -> bool
+          r: True when queued; False when the queue was full (row dropped)
+          s: [thread][log?]
+        """
+        try:
+            self._q.put_nowait(line)
+            return True
+        except queue.Full:
+            log_rate_limited("csv_appender_full", "[CSV] Writer queue full; dropping row", "WARN", 10.0)
+            return False
+
+    def _run(self) -> None:
+        pending = 0
+        last_flush = time.monotonic()
+        while True:
+            try:
+                line = self._q.get(timeout=FLUSH_INTERVAL_S)
+            except queue.Empty:
+                line = None
+            try:
+                if line is _STOP:
+                    self._f.flush()
+                    return
+                if line is not None:
+                    self._f.write(line + "\n")
+                    pending += 1
+                now = time.monotonic()
+                if pending and (pending >= FLUSH_ROWS or now - last_flush >= FLUSH_INTERVAL_S):
+                    self._f.flush()
+                    pending, last_flush = 0, now
+            except Exception as e:
+                log_rate_limited("csv_appender_write", lambda: f"[CSV] Write failed: {e}", "ERROR", 10.0)
+
+    def close(self) -> None:
+        """
+        spec:
+          name: CsvAppender.close
+          signature: close() -> None
+          s: [fs][thread]
+          notes:
+            - Writes everything queued so far, flushes and closes the file.
+        """
+        self._q.put(_STOP)
+        self._thread.join()
+        self._f.close()
@@ -1,27 +1,80 @@
 # utils/logger.py
 from datetime import datetime
 import os
+import threading
+import time
+
+_rate_lock = threading.Lock()
+_rate_state = {}  # key -> [last_emit_monotonic, suppressed_count]
+
+DEBUG_ENABLED = os.getenv("TOWER_LOG_DEBUG", "1") != "0"  # TOWER_LOG_DEBUG=0 drops DEBUG entries
+_log_dir_ready = False
+
 
 def log(msg, level="INFO"):
     """
     Write a timestamped log entry to stdout and append to logs/actions.log.
 
     Args:
-        msg (str): The log message text.
+        msg (str | Callable[[], str]): The log message text, or a zero-arg callable that builds it
+            (only called when the entry is actually written).
         level (str, optional): Log level label (e.g., "INFO", "ERROR"). Defaults to "INFO".
 
     Side effects:
         - Prints to stdout.
-        - Creates logs/ directory if missing.
+        - Creates logs/ directory if missing (checked once per process).
         - Appends entry to logs/actions.log.
+        - DEBUG entries are dropped without formatting when DEBUG_ENABLED is False.
 
     Raises:
         OSError: If unable to create logs/ directory or write to the log file.
     """
+    global _log_dir_ready
+    if level == "DEBUG" and not DEBUG_ENABLED:
+        return
+    if callable(msg):
+        msg = msg()
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     entry = f"[{level} {timestamp}] {msg}"
     print(entry)
 
-    os.makedirs("logs", exist_ok=True)
+    if not _log_dir_ready:
+        os.makedirs("logs", exist_ok=True)
+        _log_dir_ready = True
     with open("logs/actions.log", "a") as f:
         f.write(entry + "\n")
+
+
+def log_rate_limited(key, msg, level="INFO", interval_s=1.0):
+    """
+    Like log(), but emit at most once per `interval_s` for a given `key`.
+
+    Args:
+        key (str): Identity of the repeating message (e.g., "adb_shell_error").
+        msg (str | Callable[[], str]): Message text, or a zero-arg callable that builds it.
+            Use a callable on hot error paths so suppressed repeats skip string formatting.
+        level (str, optional): Log level label. Defaults to "INFO".
+        interval_s (float, optional): Minimum seconds between emitted entries per key.
+
+    Returns:
+        bool: True if an entry was written, False if it was suppressed.
+
+    Side effects:
+        - Same as log() when emitted; the entry notes how many repeats were suppressed.
+    """
+    if level == "DEBUG" and not DEBUG_ENABLED:
+        return False
+    now = time.monotonic()
+    with _rate_lock:
+        state = _rate_state.get(key)
+        if state is not None and now - state[0] < interval_s:
+            state[1] += 1
+            return False
+        suppressed = state[1] if state is not None else 0
+        _rate_state[key] = [now, 0]
+
+    text = msg() if callable(msg) else msg
+    if suppressed:
+        text = f"{text} (+{suppressed} suppressed)"
+    log(text, level)
+    return True
@@ -21,6 +21,14 @@ def _to_rgb(img: np.ndarray) -> np.ndarray:
     return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
 
 
+def is_blank(img: np.ndarray) -> bool:
+    """
+    True when a (binary) image holds a single value: there is nothing for OCR to read,
+    so callers can skip the Tesseract round-trip(s) outright.
+    """
+    return img is not None and img.size > 0 and int(img.min()) == int(img.max())
+
+
 def preprocess_binary(
     img_bgr: np.ndarray,
     *,
@@ -39,13 +47,14 @@ def preprocess_binary(
 
     thr = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
                                 cv2.THRESH_BINARY, block, C)
-    thr_inv = cv2.bitwise_not(thr)
 
     if choose_best:
-        use_inv = (np.count_nonzero(thr_inv == 0) > np.count_nonzero(thr == 0))
-        bin_img = thr_inv if use_inv else thr
+        # thr is 0/255, so "inverse has more black" == "thr has more white": one count, no temporaries
+        white = cv2.countNonZero(thr)
+        use_inv = white > thr.size - white
     else:
-        bin_img = thr_inv if invert else thr
+        use_inv = invert
+    bin_img = cv2.bitwise_not(thr) if use_inv else thr
 
     kernel = cv2.getStructuringElement(cv2.MORPH_RECT, close)
     bin_img = cv2.morphologyEx(bin_img, cv2.MORPH_CLOSE, kernel, iterations=1)
@@ -166,7 +175,10 @@ def ocr_number_with_fallback(
       C) If still none, run plain text OCR and regex the first integer
 
     Returns (value, conf, raw_text). conf=-1.0 on C) fallback.
+    Blank (single-valued) variants return (None, -1.0, "") without calling Tesseract.
     """
+    if is_blank(bin_img):
+        return None, -1.0, ""
     if _HAS_TESS:
         # A) generic token scan
         rgb = _to_rgb(bin_img)
@@ -0,0 +1,127 @@
+# utils/ui_wait.py
+"""
+Bounded "wait until the UI stops moving" helper, plus a cheap frame-change gate.
+
+Handlers used fixed sleeps (1.2–3s) after taps/swipes so menus and scroll
+animations could settle. wait_until_stable() keeps those values as the upper
+bound but returns as soon as consecutive frames stop changing.
+
+ChangeGate lets polling loops skip full template detection on frames that
+look like the last one they actually ran detection on.
+
+spec_legend:
+  r: Return value (shape & invariants)
+  s: Side effects (project tags like [adb][cv2][sleep])
+  e: Errors/exceptions behavior
+  p: Parameter notes beyond the signature
+  notes: Usage guidance / invariants
+
+defaults:
+  roi: centered 128x128 crop, grayscale
+  metric: mean absolute difference (0..255) between consecutive ROI crops
+  change_gate: CHANGE_GRID grayscale thumbnail; changed when any cell moves by > cell_thresh
+"""
+
+import time
+
+import cv2
+
+from core.ss_capture import capture_adb_screenshot_cached
+
+STABLE_ROI = 128  # side of the centered square compared between frames
+CHANGE_GRID = (32, 32)  # (w, h) area-averaged thumbnail compared by ChangeGate
+
+
+def _roi(img, size=STABLE_ROI):
+    h, w = img.shape[:2]
+    y0 = max(0, (h - size) // 2)
+    x0 = max(0, (w - size) // 2)
+    crop = img[y0:y0 + size, x0:x0 + size]
+    return cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+
+
+def wait_until_stable(poll=0.15, max_wait=1.5, diff_thresh=2.0, min_wait=0.3):
+    """
+    spec:
+      name: wait_until_stable
+      signature: wait_until_stable(poll:float=0.15, max_wait:float=1.5, diff_thresh:float=2.0, min_wait:float=0.3) -> bool
+      r: True once two consecutive ROI crops differ by < diff_thresh (MAD); False when max_wait elapsed first.
+      s: [adb][cv2][sleep]
+      e: none (failed captures just count as "not yet stable")
+      p:
+        poll: Seconds between captures (frames younger than this are reused from the capture cache).
+        max_wait: Hard upper bound; the fixed sleep this call replaces.
+        min_wait: Never return earlier than this, so a transition that has not started yet
+                  (tap just landed) is not mistaken for a settled screen.
+      notes:
+        - Timing uses time.monotonic().
+    """
+    start = time.monotonic()
+    deadline = start + max_wait
+    prev = None
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            return False
+        img = capture_adb_screenshot_cached(max_age_s=poll)
+        cur = _roi(img) if img is not None else None
+        if (
+            cur is not None
+            and prev is not None
+            and cur.shape == prev.shape
+            and now - start >= min_wait
+            and float(cv2.absdiff(cur, prev).mean()) < diff_thresh
+        ):
+            return True
+        prev = cur
+        time.sleep(max(0.0, min(poll, deadline - time.monotonic())))
+
+
+class ChangeGate:
+    """
+    spec:
+      name: ChangeGate
+      constructor:
+        signature: ChangeGate(cell_thresh:float=6.0, max_skip_s:float=10.0) -> ChangeGate
+        p:
+          cell_thresh: Max per-cell abs difference (0..255) of the CHANGE_GRID thumbnail still
+                       treated as "same frame". A per-cell max (not a mean) so a small button
+                       appearing in one corner still counts.
+          max_skip_s: Report a change at least this often, so a miss (e.g., a slow fade) is
+                      retried by full detection.
+      notes:
+        - The reference is the last frame changed() returned True for, so slow drift accumulates
+          instead of being compared away frame by frame.
+        - None frames always count as changed (callers keep their own failure handling).
+        - timed_out is True when the last True from changed() was only the max_skip_s re-check
+          (the frame itself looked the same), e.g. to keep a capture back-off from resetting.
+        - Timing uses time.monotonic().
+    """
+
+    def __init__(self, cell_thresh=6.0, max_skip_s=10.0):
+        self.cell_thresh = cell_thresh
+        self.max_skip_s = max_skip_s
+        self.timed_out = False
+        self._ref = None
+        self._ref_ts = 0.0
+
+    def changed(self, img):
+        """
+        spec:
+          name: ChangeGate.changed
+          signature: changed(img:ndarray|None) -> bool
+          r: True when img differs from the reference (or max_skip_s elapsed); the reference is then updated.
+          s: [cv2]
+        """
+        self.timed_out = False
+        if img is None:
+            return True
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        thumb = cv2.resize(gray, CHANGE_GRID, interpolation=cv2.INTER_AREA)
+        now = time.monotonic()
+        if self._ref is not None and int(cv2.absdiff(thumb, self._ref).max()) <= self.cell_thresh:
+            if now - self._ref_ts < self.max_skip_s:
+                return False
+            self.timed_out = True
+        self._ref, self._ref_ts = thumb, now
+        return True
@@ -290,10 +290,9 @@ def _detect_quick(
 
 # ----------------------------- HEAVY SWEEP (fallback/debug) -------------------
 
-def _bins_from_crop(crop_bgr: np.ndarray) -> List[Tuple[str, np.ndarray]]:
-    """Broader set of binarizations for difficult samples."""
-    gray = cv2.cvtColor(crop_bgr, cv2.COLOR_BGR2GRAY)
-    gray = cv2.convertScaleAbs(gray, alpha=1.6, beta=0)
+def _bins_from_crop(crop_gray: np.ndarray) -> List[Tuple[str, np.ndarray]]:
+    """Broader set of binarizations for difficult samples (input: grayscale crop)."""
+    gray = cv2.convertScaleAbs(crop_gray, alpha=1.6, beta=0)
 
     bins: List[Tuple[str, np.ndarray]] = []
 
@@ -366,7 +365,9 @@ def _detect_heavy(
     best_val, best_conf, best_tag, best_img = None, -1.0, None, None
     best_score = _score(None, -1.0, last_wave=last_wave, expected=expected, tolerance=tolerance, max_value=max_value)
 
-    for cname, crop in _make_crops(full):
+    # One grayscale conversion for the ROI; the trimmed crops are views into it
+    full_gray = cv2.cvtColor(full, cv2.COLOR_BGR2GRAY)
+    for cname, crop in _make_crops(full_gray):
         for bname, bimg in _bins_from_crop(crop):
             for sname, simg in _scaled_variants(bimg):
                 tag = f"{cname}_{bname}_{sname}"
@@ -390,8 +391,7 @@ def _detect_heavy(
 
     if verbose:
         print(f"[HEAVY] best={best_tag} -> value={best_val} conf={best_conf} score={best_score}")
-    if debug_out and best_img is not None:
-        cv2.imwrite(debug_out, best_img)
+    # debug_out is written once by the caller with the overall winner (best_img is returned for that)
     return best_val, best_conf, best_tag, best_img
 
 # ------------------------ PROGRAMMATIC API (with time-based scoring) ----------
@@ -424,6 +424,25 @@ def detect_wave_number_from_image(
         dt_min = max(0.0, (now - _LAST_WAVE_TS) / 60.0)
         expected = last_wave + rate_per_min * dt_min
 
+    # The heavy sweep (~100 OCR calls per ROI) can be requested twice for the same ROI below
+    # (missing value, then the plausibility gate); its result only depends on the frame, so run it once
+    heavy_results: Dict[str, Tuple[Optional[int], float, Optional[str], Optional[np.ndarray]]] = {}
+
+    def _heavy(roi: str):
+        if roi not in heavy_results:
+            heavy_results[roi] = _detect_heavy(
+                img_bgr,
+                roi,
+                verbose=verbose,
+                dump_dir=dump_dir,
+                debug_out=debug_out,
+                last_wave=last_wave,
+                expected=expected,
+                tolerance=tolerance,
+                max_value=max_value,
+            )
+        return heavy_results[roi]
+
     # Fast: primary
     val, conf, _tag, best_img = _detect_quick(
         img_bgr,
@@ -456,25 +475,11 @@ def detect_wave_number_from_image(
     # Heavy if asked or still None
     if use_heavy or val is None:
         for roi in (primary_dot_path, fallback_dot_path):
-            hv_val, hv_conf, _hv_tag, hv_img = _detect_heavy(
-                img_bgr,
-                roi,
-                verbose=verbose,
-                dump_dir=dump_dir,
-                debug_out=debug_out,
-                last_wave=last_wave,
-                expected=expected,
-                tolerance=tolerance,
-                max_value=max_value,
-            )
+            hv_val, hv_conf, _hv_tag, hv_img = _heavy(roi)
             if _score(hv_val, hv_conf, last_wave=last_wave, expected=expected, tolerance=tolerance, max_value=max_value) > \
                _score(val, conf, last_wave=last_wave, expected=expected, tolerance=tolerance, max_value=max_value):
                 val, conf, best_img, used = hv_val, hv_conf, hv_img, roi
 
-    # Save winner image if requested
-    if debug_out and best_img is not None:
-        cv2.imwrite(debug_out, best_img)
-
     # Plausibility gate: avoid poisoning hint with an outlier
     if val is not None and last_wave is not None and _LAST_WAVE_TS is not None:
         dt_min = max(0.0, (now - _LAST_WAVE_TS) / 60.0)
@@ -490,22 +495,14 @@ def detect_wave_number_from_image(
             # Try a heavy sweep on both ROIs before falling back to last_wave
             hv_best = (None, -1.0, None, None)
             for roi in (primary_dot_path, fallback_dot_path):
-                hv_val, hv_conf, _hv_tag, hv_img = _detect_heavy(
-                    img_bgr,
-                    roi,
-                    verbose=verbose,
-                    dump_dir=dump_dir,
-                    debug_out=debug_out,
-                    last_wave=last_wave,
-                    expected=expected,
-                    tolerance=tolerance,
-                    max_value=max_value,
-                )
+                hv_val, hv_conf, _hv_tag, hv_img = _heavy(roi)
                 if _score(hv_val, hv_conf, last_wave=last_wave, expected=expected, tolerance=tolerance, max_value=max_value) > \
                    _score(*hv_best[:2], last_wave=last_wave, expected=expected, tolerance=tolerance, max_value=max_value):
                     hv_best = (hv_val, hv_conf, roi, hv_img)
 
             hv_val, hv_conf, hv_used, hv_img = hv_best
+            if hv_img is not None:
+                best_img = hv_img  # debug_out shows the heavy-match winner, accepted or not
             # Only accept heavy result if it isn't suspicious under the same gate
             if hv_val is not None:
                 hv_near = True if expected is None else (abs(hv_val - expected) <= 2 * tolerance)
@@ -514,10 +511,15 @@ def detect_wave_number_from_image(
                 hv_suspicious = (not hv_near and (hv_massive_jump or hv_conf < 60.0)) or hv_too_short
                 if not hv_suspicious:
                     val, conf = hv_val, hv_conf
-                    best_img = hv_img if hv_img is not None else best_img
                 else:
+                    if debug_out and best_img is not None:
+                        cv2.imwrite(debug_out, best_img)
                     return (last_wave, conf)
 
+    # Save winner image if requested (once per call, after the gate may have swapped in the heavy winner)
+    if debug_out and best_img is not None:
+        cv2.imwrite(debug_out, best_img)
+
     # Update hint on success (monotonic already enforced in scoring)
     if val is not None:
         _LAST_WAVE_SEEN = val